@@ -0,0 +1,93 @@
+"""
+ERP 다운로드 엑셀 읽기 벤치마크
+
+기존 upload_excel_to_sheet 의 읽기 경로(확장자 기준: .xls 는 xlrd 시도 -> 실패 시 read_html)와
+bot.excel_reader.read_excel_file(파일 시그니처 판별 후 해당 엔진으로 바로 읽기)을 비교합니다.
+'str s' 는 타입 추론 없이 dtype=str 로 읽은 시간이고, 'str same' 은 그 결과가 시트에 올리는 문자열과 같은지입니다.
+(날짜 / 실수 / 천 단위 구분 기호 표기가 달라지므로 업로드 경로는 추론 후 문자열 변환을 유지)
+파일을 주지 않으면 저장소의 '데이터 비교.xlsx' 와, 그 내용을 늘려 만든 HTML 형식 .xls
+(Amaranth 다운로드와 같은 형태)를 사용합니다.
+
+사용 예:
+    python benchmarks/bench_excel_read.py downloads/*.xls
+    python benchmarks/bench_excel_read.py --html-rows 50000
+"""
+
+import argparse
+import html
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bot.excel_reader import read_excel_file, to_sheet_strings  # noqa: E402
+from logger import logger  # noqa: E402
+
+SAMPLE_XLSX = os.path.join(ROOT, '데이터 비교.xlsx')
+
+
+def legacy_read(path):
+    """기존 읽기 경로 (확장자 기준)"""
+    if path.endswith('.xlsx'):
+        return pd.read_excel(path, engine='openpyxl')
+    try:
+        return pd.read_excel(path, engine='xlrd')
+    except Exception:
+        return pd.read_html(path)[0]
+
+def write_html_xls(df, path):
+    """ERP 가 내려주는 형태의 HTML 표를 .xls 확장자로 저장"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<html><head><meta http-equiv="Content-Type" content="text/html; charset=utf-8"></head><body>\n')
+        f.write('<table border="1">\n<tr>' + ''.join(f'<td>{html.escape(str(c))}</td>' for c in df.columns) + '</tr>\n')
+        for row in df.itertuples(index=False, name=None):
+            cells = ('' if pd.isna(v) else html.escape(str(v)) for v in row)
+            f.write('<tr>' + ''.join(f'<td>{v}</td>' for v in cells) + '</tr>\n')
+        f.write('</table></body></html>\n')
+
+def sample_files(html_rows, workdir):
+    df = pd.read_excel(SAMPLE_XLSX, engine='openpyxl')
+    repeats = max(1, -(-html_rows // len(df)))
+    big = pd.concat([df] * repeats, ignore_index=True).head(html_rows)
+    html_path = os.path.join(workdir, f'html_{html_rows}.xls')
+    write_html_xls(big, html_path)
+    return [SAMPLE_XLSX, html_path]
+
+def timed(fn, path, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(path)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description='ERP 다운로드 엑셀 읽기 벤치마크')
+    parser.add_argument('files', nargs='*', help='비교할 다운로드 파일 (없으면 샘플 생성)')
+    parser.add_argument('--html-rows', type=int, default=20000, help='샘플 HTML .xls 행 수')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    logger.setLevel('WARNING')
+    with tempfile.TemporaryDirectory() as workdir:
+        files = args.files or sample_files(args.html_rows, workdir)
+        print(f'{"file":<28} {"rows":>8} {"legacy s":>9} {"sniffed s":>10} {"speedup":>8}  same  {"str s":>6}  str same')
+        for path in files:
+            legacy_seconds, legacy = timed(legacy_read, path, args.repeat)
+            new_seconds, current = timed(read_excel_file, path, args.repeat)
+            str_seconds, as_str = timed(lambda p: read_excel_file(p, dtype=str), path, args.repeat)
+            expected = to_sheet_strings(legacy).values.tolist()
+            same = expected == to_sheet_strings(current).values.tolist()
+            str_same = expected == to_sheet_strings(as_str).values.tolist()
+            print(f'{os.path.basename(path)[:28]:<28} {len(current):>8,} {legacy_seconds:>9.2f} {new_seconds:>10.2f} '
+                  f'{legacy_seconds / new_seconds:>7.1f}x  {str(same):<5} {str_seconds:>6.2f}  {str_same}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+계정별원장 행 보관 방식 마이크로 벤치마크
+
+기존 dict 행 목록 누적 + pd.DataFrame(list) 변환과
+bot.ledger_columns.LedgerColumns(필드별 배열 + 사전 인코딩) 누적 + to_frame() 변환을
+합성 원장 데이터로 비교합니다. (메모리는 tracemalloc 기준 누적 단계 할당량)
+
+사용 예:
+    python benchmarks/bench_ledger_columns.py --rows 300000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_ledger_transform import make_rows  # noqa: E402
+from bot.ledger_columns import LedgerColumns  # noqa: E402
+from ledger_bot import prepare_ledger_frame  # noqa: E402
+
+
+def decoded_pages(rows, page_rows):
+    """API 응답처럼 페이지마다 새로 디코딩된 dict 목록 생성 (키/값 문자열이 행마다 별도 객체)"""
+    for start in range(0, len(rows), page_rows):
+        yield json.loads(json.dumps(rows[start:start + page_rows], ensure_ascii=False))
+
+def accumulate_dicts(pages):
+    data = []
+    for page in pages:
+        data.extend(page)
+    return data
+
+def accumulate_columns(pages):
+    columns = LedgerColumns()
+    for k, page in enumerate(pages):
+        columns.extend(page, key=k)
+    return columns
+
+def measure(label, accumulate, to_frame, rows, page_rows):
+    tracemalloc.start()
+    started = time.perf_counter()
+    held = accumulate(decoded_pages(rows, page_rows))
+    accumulate_seconds = time.perf_counter() - started
+    held_mb = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    df = to_frame(held)
+    frame_seconds = time.perf_counter() - started
+    print(f'{label:<10} 누적 {accumulate_seconds:7.2f}s  보관 {held_mb:8.1f} MB  DataFrame 변환 {frame_seconds:6.2f}s')
+    return prepare_ledger_frame(df)
+
+def main():
+    parser = argparse.ArgumentParser(description='계정별원장 행 보관 방식 벤치마크')
+    parser.add_argument('--rows', type=int, default=300000)
+    parser.add_argument('--page-rows', type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f'합성 원장 {args.rows:,}행 생성 중...')
+    rows = make_rows(args.rows)
+
+    legacy = measure('dict', accumulate_dicts, pd.DataFrame, rows, args.page_rows)
+    columnar = measure('columnar', accumulate_columns, lambda columns: columns.to_frame(), rows, args.page_rows)
+
+    # 시트 업로드 직전 형태(문자열)로 동일성 확인
+    same = legacy.astype(str).values.tolist() == columnar.astype(str).values.tolist()
+    print(f'결과 일치: {same}')
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+계정별원장 전체 실행 벤치마크 (로컬 대역 서버)
+
+benchmarks/mock_amaranth.py 대역 서버를 띄우고, 데이터 크기별로 run_ledger_bot 을 별도 프로세스에서 실행하여
+처리량(rows/s), API 호출 속도(calls/s), 최대 메모리(peak RSS)를 비교합니다.
+시트 업로드는 메모리 안의 빈 워크시트로 대체하고, 캐시 / 저장소 / 체크포인트는 임시 디렉토리를 사용합니다.
+LEDGER_* 환경변수는 그대로 전달되므로 조회 전략별로 비교할 수 있습니다.
+
+사용 예:
+    python benchmarks/bench_ledger_run.py --sizes 1000,10000,50000
+    LEDGER_BULK=true python benchmarks/bench_ledger_run.py --sizes 10000 --latency 0.2
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import resource  # 최대 메모리 측정 (Windows 미지원)
+except ImportError:
+    resource = None
+
+
+class _NullSpreadsheet:
+    def batch_update(self, body):
+        return {}
+
+
+class NullWorksheet:
+    """시트 업로드 대체용 워크시트 (쓰기 요청을 버림)"""
+
+    id = 0
+    spreadsheet = _NullSpreadsheet()
+
+    def __init__(self, rows=1000, cols=26):
+        self.row_count = rows
+        self.col_count = cols
+
+    def resize(self, rows=None, cols=None):
+        self.row_count = rows or self.row_count
+        self.col_count = cols or self.col_count
+
+    def update(self, range_name=None, values=None, **kwargs):
+        return {}
+
+
+def peak_memory_mb():
+    """현재 프로세스 최대 RSS (MB, 측정 불가 시 None)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+def run_worker():
+    """자식 프로세스: run_ledger_bot 1회 실행 후 결과를 JSON 으로 출력"""
+    import ledger_bot
+
+    accounts = int(os.environ.get('BENCH_ACCOUNTS', '0'))
+    if accounts:
+        ledger_bot.SGA_ACCOUNTS = ledger_bot.SGA_ACCOUNTS[:accounts]
+    ledger_bot.open_ledger_worksheet = lambda rows=1000, tab_name=None: NullWorksheet(rows)
+
+    counts = []
+    collect = ledger_bot.collect_ledger
+
+    def counting_collect(*args, **kwargs):
+        result = collect(*args, **kwargs)
+        counts.append(result['count'])
+        return result
+
+    ledger_bot.collect_ledger = counting_collect
+    started = time.perf_counter()
+    ledger_bot.run_ledger_bot()
+    elapsed = time.perf_counter() - started
+    print(json.dumps({'seconds': elapsed, 'rows': sum(counts), 'peak_mb': peak_memory_mb()}))
+
+def run_size(server, size, args):
+    """데이터 크기 하나 측정"""
+    from urllib.request import urlopen
+
+    stats_url = f'http://127.0.0.1:{server.server_address[1]}/stats'
+    server.ledger.rows_per_account = size
+    server.ledger._cache.clear()
+    before = json.load(urlopen(stats_url))
+
+    with tempfile.TemporaryDirectory(prefix='ledger_bench_') as tmp:
+        env = dict(os.environ)
+        env.update({
+            'LEDGER_API_URL': f'http://127.0.0.1:{server.server_address[1]}',
+            'LEDGER_CACHE_DIR': os.path.join(tmp, 'ledger'),
+            'LEDGER_STORE_PATH': os.path.join(tmp, 'ledger.sqlite3'),
+            'LEDGER_CHECKPOINT_DIR': os.path.join(tmp, 'checkpoints'),
+            'BENCH_ACCOUNTS': str(args.accounts),
+            'LOG_LEVEL': env.get('LOG_LEVEL', 'WARNING')
+        })
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker'], env=env,
+                              capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        raise SystemExit(f'worker failed (size={size})')
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    after = json.load(urlopen(stats_url))
+    result.update({key: after[key] - before[key] for key in ('calls', 'rejected', 'errors')})
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='계정별원장 전체 실행 벤치마크 (로컬 대역 서버)')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--sizes', default='1000,10000,50000', help='데이터가 있는 계정당 행 수 (쉼표 구분)')
+    parser.add_argument('--accounts', type=int, default=0, help='조회할 계정 수 (0 이면 전체)')
+    parser.add_argument('--data-ratio', type=float, default=0.3, help='데이터가 있는 계정 비율')
+    parser.add_argument('--latency', type=float, default=0.05, help='요청당 기본 지연 (초)')
+    parser.add_argument('--latency-per-1k', type=float, default=0.02, help='응답 1000행당 추가 지연 (초)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='503 응답 비율')
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker()
+        return
+
+    from mock_amaranth import start_server
+
+    server = start_server(0, data_ratio=args.data_ratio, latency=args.latency,
+                          latency_per_1k=args.latency_per_1k, error_rate=args.error_rate)
+    print(f"{'rows/acct':>10} {'rows':>10} {'seconds':>8} {'rows/s':>10} {'calls':>7} {'calls/s':>8} "
+          f"{'peak MB':>8} {'rejected':>8} {'errors':>6}")
+    try:
+        for size in (int(s) for s in args.sizes.split(',') if s.strip()):
+            r = run_size(server, size, args)
+            peak = f"{r['peak_mb']:8.0f}" if r['peak_mb'] is not None else f"{'-':>8}"
+            print(f"{size:>10,} {r['rows']:>10,} {r['seconds']:8.1f} {r['rows'] / r['seconds']:10,.0f} "
+                  f"{r['calls']:>7,} {r['calls'] / r['seconds']:8.1f} {peak} {r['rejected']:>8} {r['errors']:>6}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+계정별원장 변환 단계 마이크로 벤치마크
+
+기존 행 단위 apply 변환(convert_drcr_fg / format_date_str)과
+bot.ledger_transform 의 벡터화 변환을 합성 원장 데이터로 비교합니다.
+
+사용 예:
+    python benchmarks/bench_ledger_transform.py --rows 500000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ledger_bot import COLUMNS_MAP, NUMERIC_COLUMNS, convert_drcr_fg, format_date_str  # noqa: E402
+from bot.ledger_transform import transform_ledger_frame  # noqa: E402
+
+
+def make_rows(n, seed=0):
+    """합성 원장 행 생성 (거래처/부서/프로젝트는 소수의 값이 반복)"""
+    rng = random.Random(seed)
+    vendors = [f'거래처{i:04d}' for i in range(2000)]
+    depts = [f'부서{i:02d}' for i in range(40)]
+    projects = [f'프로젝트{i:03d}' for i in range(150)]
+    rows = []
+    for k in range(n):
+        day = f'2025{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}'
+        vendor = rng.randrange(len(vendors))
+        dept = rng.randrange(len(depts))
+        project = rng.randrange(len(projects))
+        rows.append({
+            'coCd': '1000', 'divCd': '1000', 'acctCd': f'8{rng.randint(0, 51):02d}0000',
+            'drcrFg': rng.choice(['1', '2']), 'fillDt': day, 'fillNb': str(rng.randint(1, 500)),
+            'rmkDc': f'적요 {k}', 'trCd': f'{vendor:05d}', 'trNm': vendors[vendor], 'regNb': '',
+            'drAm': str(rng.randint(0, 10 ** 7)), 'crAm': '0', 'restAm': str(rng.randint(0, 10 ** 9)),
+            'isuDt': day, 'isuSq': str(k), 'dispSq': '1', 'lnSq': str(rng.randint(1, 5)),
+            'ctDeptCd': f'{dept:04d}', 'ctDeptNm': depts[dept], 'pjtCd': f'P{project:03d}',
+            'pjtNm': projects[project], 'ctEmpCd': '', 'ctEmpNm': ''
+        })
+    return rows
+
+def renamed_frame(rows):
+    df = pd.DataFrame(rows)
+    return df[list(COLUMNS_MAP)].rename(columns=COLUMNS_MAP)
+
+def transform_apply(df):
+    """기존 방식: 컬럼별 행 단위 apply + 숫자 컬럼 개별 변환"""
+    df['차대구분'] = df['차대구분'].apply(convert_drcr_fg)
+    df['승인일'] = df['승인일'].apply(format_date_str)
+    df['작성일'] = df['작성일'].apply(format_date_str)
+    for col in NUMERIC_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    return df
+
+def timed(label, func, base_df, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        df = base_df.copy()
+        started = time.perf_counter()
+        result = func(df)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    memory_mb = result.memory_usage(deep=True).sum() / 1024 / 1024
+    print(f'{label:<12} {best:8.3f}s  {len(base_df) / best:12,.0f} rows/s  {memory_mb:8.1f} MB')
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='계정별원장 변환 단계 벤치마크')
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f'합성 원장 {args.rows:,}행 생성 중...')
+    base_df = renamed_frame(make_rows(args.rows))
+
+    legacy = timed('apply', transform_apply, base_df, args.repeat)
+    vectorized = timed('vectorized', lambda df: transform_ledger_frame(df, NUMERIC_COLUMNS), base_df, args.repeat)
+
+    # 시트 업로드 직전 형태(문자열)로 동일성 확인
+    same = legacy.astype(str).values.tolist() == vectorized.astype(str).values.tolist()
+    print(f'결과 일치: {same}')
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
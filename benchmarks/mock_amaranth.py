@@ -0,0 +1,267 @@
+"""
+로컬 Amaranth API 프록시 대역 서버 (/apiproxy/api11A30)
+
+운영 API(portal.rapportlabs.kr) 없이 ledger_bot.py 를 실행해 보기 위한 서버입니다.
+요청마다 wehago-sign 서명(accessToken + transaction-id + timestamp + URL 경로)을 검증하고,
+조건(회사 / 계정 / 기간)으로 결정되는 합성 원장 데이터를 viewPage / viewCount 로 나눠 응답합니다.
+
+사용 예:
+    python benchmarks/mock_amaranth.py --port 8765 --rows 20000 --latency 0.05 --error-rate 0.02
+    LEDGER_API_URL=http://127.0.0.1:8765 python ledger_bot.py
+
+통계: GET /stats -> {"calls", "rows", "rejected", "errors"}
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.amaranth_api import generate_wehago_sign  # noqa: E402
+
+PROXY_PATH = '/apiproxy/api11A30'
+
+
+class MockLedger:
+    """
+    합성 원장 데이터 생성기
+
+    같은 조건이면 항상 같은 행을 돌려주므로 실행 간 결과를 비교할 수 있습니다.
+    data_ratio 비율의 계정에만 데이터가 있고(나머지는 빈 계정), 데이터가 있는 계정은
+    기간 전체에 걸쳐 rows_per_account 행을 날짜 순으로 고르게 배치합니다.
+
+    Args:
+        accounts (list): 일괄 조회(acctCd 빈 값) 시 포함할 계정 목록
+        rows_per_account (int): 데이터가 있는 계정의 전체 기간 행 수
+        data_ratio (float): 데이터가 있는 계정 비율
+        date_from (str): 데이터 시작일 (yyyymmdd)
+        date_to (str): 데이터 종료일 (yyyymmdd)
+    """
+
+    def __init__(self, accounts, rows_per_account=5000, data_ratio=0.3,
+                 date_from='20250101', date_to=None):
+        self.accounts = list(accounts)
+        self.rows_per_account = rows_per_account
+        self.data_ratio = data_ratio
+        self.start = datetime.strptime(date_from, '%Y%m%d')
+        self.days = (datetime.strptime(date_to or datetime.now().strftime('%Y%m%d'), '%Y%m%d') - self.start).days + 1
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _has_data(self, acct_cd):
+        digest = hashlib.md5(acct_cd.encode('utf-8')).digest()
+        return digest[0] / 256 < self.data_ratio
+
+    def _account_rows(self, co_cd, acct_cd):
+        key = (co_cd, acct_cd)
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+
+        rows = []
+        if self._has_data(acct_cd):
+            rng = random.Random(f'{co_cd}:{acct_cd}')
+            for k in range(self.rows_per_account):
+                day = (self.start + timedelta(days=k * self.days // self.rows_per_account)).strftime('%Y%m%d')
+                vendor = rng.randrange(300)
+                dept = rng.randrange(30)
+                amount = rng.randrange(1000, 5000000, 10)
+                rows.append({
+                    'coCd': co_cd, 'divCd': co_cd, 'acctCd': acct_cd, 'drcrFg': '1',
+                    'fillDt': day, 'fillNb': k + 1, 'rmkDc': f'적요 {k}',
+                    'trCd': f'{vendor:05d}', 'trNm': f'거래처{vendor:03d}', 'regNb': '',
+                    'drAm': amount, 'crAm': 0, 'restAm': 0, 'isuDt': day, 'isuSq': k + 1,
+                    'dispSq': 1, 'lnSq': 1, 'ctDeptCd': f'{dept:04d}', 'ctDeptNm': f'부서{dept:02d}',
+                    'pjtCd': '', 'pjtNm': '', 'ctEmpCd': '', 'ctEmpNm': ''
+                })
+        with self._lock:
+            self._cache[key] = rows
+        return rows
+
+    def query(self, co_cd, acct_cd, fill_dt_from, fill_dt_to):
+        """조건에 맞는 행 목록 (acctCd 가 빈 값이면 전체 계정)"""
+        accounts = self.accounts if not acct_cd else [acct_cd]
+        result = []
+        for acct in accounts:
+            result.extend(r for r in self._account_rows(co_cd, acct) if fill_dt_from <= r['fillDt'] <= fill_dt_to)
+        return result
+
+
+class MockAmaranthServer(ThreadingHTTPServer):
+    """
+    Amaranth API 프록시 대역 서버
+
+    Args:
+        address (tuple): (host, port)
+        ledger (MockLedger): 데이터 생성기
+        access_token (str): 허용할 Access Token
+        hash_key (str): 서명 검증용 Hash Key
+        latency (float): 요청당 기본 지연 (초)
+        latency_per_1k (float): 응답 1000행당 추가 지연 (초)
+        error_rate (float): 503 응답 비율
+        max_skew (float): 허용 timestamp 오차 (초)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, ledger, access_token, hash_key, latency=0.0, latency_per_1k=0.0,
+                 error_rate=0.0, max_skew=300):
+        super().__init__(address, MockAmaranthHandler)
+        self.ledger = ledger
+        self.access_token = access_token
+        self.hash_key = hash_key
+        self.latency = latency
+        self.latency_per_1k = latency_per_1k
+        self.error_rate = error_rate
+        self.max_skew = max_skew
+        self.stats = {'calls': 0, 'rows': 0, 'rejected': 0, 'errors': 0}
+        self.stats_lock = threading.Lock()
+
+    def handle_error(self, request, client_address):
+        # 클라이언트가 keep-alive 연결을 먼저 닫는 경우는 무시
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+    def count(self, **deltas):
+        with self.stats_lock:
+            for key, value in deltas.items():
+                self.stats[key] += value
+
+    def verify(self, headers, url_path):
+        """서명 헤더 검증 (실패 사유 반환, 정상이면 None)"""
+        if headers.get('Authorization') != 'Bearer ' + self.access_token:
+            return 'invalid access token'
+        transaction_id = headers.get('transaction-id') or ''
+        timestamp = headers.get('timestamp') or ''
+        if len(transaction_id) != 30:
+            return 'invalid transaction-id'
+        try:
+            if abs(time.time() - int(timestamp)) > self.max_skew:
+                return 'timestamp out of range'
+        except ValueError:
+            return 'invalid timestamp'
+        expected = generate_wehago_sign(self.hash_key, self.access_token + transaction_id + timestamp + url_path)
+        if headers.get('wehago-sign') != expected:
+            return 'invalid wehago-sign'
+        return None
+
+
+class MockAmaranthHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=5)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/stats':
+            with self.server.stats_lock:
+                self._send_json(200, dict(self.server.stats))
+        else:
+            self._send_json(404, {'resultCode': -1, 'resultMsg': 'not found'})
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length)
+        if self.path != PROXY_PATH:
+            self._send_json(404, {'resultCode': -1, 'resultMsg': 'not found'})
+            return
+
+        reason = server.verify(self.headers, self.path)
+        if reason:
+            server.count(calls=1, rejected=1)
+            self._send_json(401, {'resultCode': -1, 'resultMsg': reason})
+            return
+        if server.error_rate and random.random() < server.error_rate:
+            server.count(calls=1, errors=1)
+            self._send_json(503, {'resultCode': -1, 'resultMsg': 'Service Unavailable'})
+            return
+
+        body = json.loads(raw)
+        rows = server.ledger.query(body.get('coCd'), body.get('acctCd') or '',
+                                   body.get('fillDtFrom'), body.get('fillDtTo'))
+        count = int(body.get('viewCount') or 100000)
+        page = int(body.get('viewPage') or 1)
+        datas = rows[(page - 1) * count:page * count]
+
+        time.sleep(server.latency + server.latency_per_1k * len(datas) / 1000)
+        server.count(calls=1, rows=len(datas))
+        self._send_json(200, {
+            'resultCode': 0,
+            'resultMsg': 'SUCCESS',
+            'resultData': {'totalPage': max(1, -(-len(rows) // count)), 'totalCount': len(rows), 'datas': datas}
+        })
+
+
+def start_server(port=0, **options):
+    """
+    백그라운드 스레드로 대역 서버 실행
+
+    Args:
+        port (int): 포트 (0 이면 빈 포트)
+        options: MockLedger / MockAmaranthServer 설정 (rows_per_account, data_ratio, latency,
+                 latency_per_1k, error_rate, accounts, access_token, hash_key)
+
+    Returns:
+        MockAmaranthServer: server.server_address 로 포트 확인, server.shutdown() 으로 종료
+    """
+    from ledger_bot import CONFIG, SGA_ACCOUNTS
+
+    ledger = MockLedger(options.get('accounts') or SGA_ACCOUNTS,
+                        rows_per_account=options.get('rows_per_account', 5000),
+                        data_ratio=options.get('data_ratio', 0.3))
+    server = MockAmaranthServer(
+        ('127.0.0.1', port), ledger,
+        access_token=options.get('access_token') or CONFIG['accessToken'],
+        hash_key=options.get('hash_key') or CONFIG['hashKey'],
+        latency=options.get('latency', 0.0),
+        latency_per_1k=options.get('latency_per_1k', 0.0),
+        error_rate=options.get('error_rate', 0.0)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 Amaranth API 프록시 대역 서버')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--rows', type=int, default=5000, help='데이터가 있는 계정의 전체 기간 행 수')
+    parser.add_argument('--data-ratio', type=float, default=0.3, help='데이터가 있는 계정 비율')
+    parser.add_argument('--latency', type=float, default=0.05, help='요청당 기본 지연 (초)')
+    parser.add_argument('--latency-per-1k', type=float, default=0.02, help='응답 1000행당 추가 지연 (초)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='503 응답 비율')
+    args = parser.parse_args()
+
+    server = start_server(args.port, rows_per_account=args.rows, data_ratio=args.data_ratio,
+                          latency=args.latency, latency_per_1k=args.latency_per_1k, error_rate=args.error_rate)
+    print(f'Mock Amaranth API: http://127.0.0.1:{server.server_address[1]}{PROXY_PATH} (Ctrl+C 로 종료)')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+import base64
+import hashlib
+import hmac
+import json
+import random
+import string
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.exceptions import HTTPError as Urllib3Error, ReadTimeoutError
+
+from logger import logger
+
+try:
+    import httpx  # HTTP/2 사용 시에만 필요 (pip install "httpx[http2]")
+except ImportError:
+    httpx = None
+
+try:
+    import ijson  # 대용량 응답 점진적 파싱
+    from ijson.common import ObjectBuilder
+except ImportError:
+    ijson = None
+
+try:
+    import orjson  # 빠른 JSON 디코더 (선택)
+except ImportError:
+    orjson = None
+
+
+def generate_transaction_id(length=30):
+    """30자리 랜덤 문자열 생성"""
+    chars = string.ascii_lowercase + string.digits
+    return ''.join(random.choice(chars) for _ in range(length))
+
+def generate_wehago_sign(hash_key, value):
+    """Wehago 서명 생성 (HMAC-SHA256 -> Base64)"""
+    # Python의 hmac은 bytes 타입을 요구합니다.
+    key_bytes = hash_key.encode('utf-8')
+    value_bytes = value.encode('utf-8')
+
+    signature = hmac.new(key_bytes, value_bytes, hashlib.sha256).digest()
+    return base64.b64encode(signature).decode('utf-8')
+
+
+def _decode_json(content):
+    """응답 본문 전체 디코딩 (orjson 이 있으면 사용)"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+def _requests_response(response):
+    """httpx 응답 -> requests.Response (HTTP/2 오류도 e.response.status_code 로 재시도 여부를 판단하도록)"""
+    converted = requests.Response()
+    converted.status_code = response.status_code
+    converted.reason = response.reason_phrase
+    converted.headers = CaseInsensitiveDict(response.headers)
+    converted.url = str(response.url)
+    converted._content = response.content
+    return converted
+
+def _iter_items(events, items_prefix, meta):
+    """
+    ijson 이벤트 스트림에서 items_prefix 배열의 항목을 하나씩 생성
+
+    항목 외의 스칼라 값(resultCode, resultData.totalPage 등)은 meta 에 채워 넣습니다.
+    JSON 키 순서가 보장되지 않으므로 meta 는 생성기를 끝까지 소비한 뒤에 완성됩니다.
+    """
+    builder = None
+    for prefix, event, value in events:
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == items_prefix and event in ('end_map', 'end_array'):
+                yield builder.value
+                builder = None
+            continue
+
+        if prefix == items_prefix and event in ('start_map', 'start_array'):
+            builder = ObjectBuilder()
+            builder.event(event, value)
+        elif prefix == items_prefix and event in ('string', 'number', 'boolean', 'null'):
+            yield value
+        elif event in ('string', 'number', 'boolean', 'null'):
+            # 중첩 경로를 dict 로 복원 (배열 항목 경로는 제외)
+            keys = prefix.split('.')
+            if 'item' in keys:
+                continue
+            target = meta
+            for key in keys[:-1]:
+                target = target.setdefault(key, {})
+            target[keys[-1]] = value
+
+
+class AmaranthApiClient:
+    """
+    Amaranth API 프록시 호출용 재사용 클라이언트
+
+    커넥션 풀(keep-alive)을 유지하는 세션 하나로 모든 호출을 처리하므로
+    매 호출마다 TCP+TLS 핸드셰이크를 반복하지 않습니다.
+    요청마다 transaction-id / timestamp / wehago-sign 헤더를 새로 생성합니다.
+
+    Args:
+        base_url (str): Amaranth 서버 주소 (예: https://portal.rapportlabs.kr)
+        access_token (str): API Access Token
+        hash_key (str): 서명용 Hash Key
+        caller_name (str): callerName 헤더 값
+        group_seq (str): groupSeq 헤더 값
+        pool_size (int): 커넥션 풀 크기 (동시 워커 수 이상 권장)
+        http2 (bool): httpx가 설치되어 있으면 HTTP/2 사용
+        timeout (float): 요청 타임아웃 (초)
+        rate_limiter: acquire()를 제공하는 속도 제한기 (선택)
+    """
+
+    def __init__(self, base_url, access_token, hash_key, caller_name, group_seq,
+                 pool_size=16, http2=False, timeout=120, rate_limiter=None):
+        self.base_url = base_url
+        self.access_token = access_token
+        self.hash_key = hash_key
+        self.caller_name = caller_name
+        self.group_seq = group_seq
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.http2 = False
+
+        if http2:
+            if httpx is None:
+                logger.warning('⚠️ httpx가 설치되지 않아 HTTP/1.1 세션을 사용합니다.')
+            else:
+                try:
+                    limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+                    self._client = httpx.Client(http2=True, limits=limits, timeout=timeout,
+                                                headers={'Accept-Encoding': 'gzip, deflate'})
+                    self.http2 = True
+                except ImportError:
+                    # http2=True 는 h2 패키지가 필요합니다
+                    logger.warning('⚠️ h2 패키지가 없어 HTTP/1.1 세션을 사용합니다.')
+
+        if not self.http2:
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self._session.mount('https://', adapter)
+            self._session.mount('http://', adapter)
+            self._session.headers.update({'Accept-Encoding': 'gzip, deflate'})
+
+    def build_headers(self, url_path):
+        """요청마다 새 transaction-id / timestamp 로 서명 헤더 생성"""
+        transaction_id = generate_transaction_id()
+        timestamp = str(int(time.time()))
+
+        # 서명 생성 값: accessToken + transactionId + timestamp + url
+        sign_value = self.access_token + transaction_id + timestamp + url_path
+        wehago_sign = generate_wehago_sign(self.hash_key, sign_value)
+
+        return {
+            'callerName': self.caller_name,
+            'Authorization': 'Bearer ' + self.access_token,
+            'transaction-id': transaction_id,
+            'timestamp': timestamp,
+            'groupSeq': self.group_seq,
+            'wehago-sign': wehago_sign,
+            'Content-Type': 'application/json'
+        }
+
+    def post(self, url_path, body, items_prefix=None):
+        """
+        서명된 POST 요청 후 JSON 응답 반환
+
+        items_prefix (예: 'resultData.datas.item')를 주면 ijson 으로 응답을 점진적으로 파싱하여
+        본문 전체를 메모리에 올리지 않고 같은 구조의 dict 를 만듭니다. (ijson 미설치 시 일반 디코딩)
+        전송 방식(HTTP/1.1, HTTP/2)과 관계없이 실패는 requests 예외로 통일합니다.
+        (requests.exceptions.Timeout / requests.exceptions.RequestException)
+        """
+        if items_prefix and ijson is not None and not self.http2:
+            meta, items = self.iter_post(url_path, body, items_prefix)
+            datas = list(items)
+            target = meta
+            keys = items_prefix.split('.')[:-1]  # 마지막 'item' 제외
+            for key in keys[:-1]:
+                target = target.setdefault(key, {})
+                if not isinstance(target, dict):
+                    # 상위 값이 null 인 응답 (예: 오류 시 resultData: null)
+                    return meta
+            target[keys[-1]] = datas
+            return meta
+
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
+        url = self.base_url + url_path
+        headers = self.build_headers(url_path)
+
+        if not self.http2:
+            response = self._session.post(url, headers=headers, json=body, verify=True, timeout=self.timeout)
+            response.raise_for_status()
+            try:
+                return _decode_json(response.content)
+            except ValueError as e:
+                raise requests.exceptions.RequestException(f'Invalid JSON response: {e}') from e
+
+        try:
+            response = self._client.post(url, headers=headers, json=body)
+            response.raise_for_status()
+            return _decode_json(response.content)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except httpx.HTTPStatusError as e:
+            # 4xx / 5xx 는 상태 코드를 유지 (HTTP/1.1 경로의 raise_for_status 와 같은 예외)
+            raise requests.exceptions.HTTPError(str(e), response=_requests_response(e.response)) from e
+        except httpx.HTTPError as e:
+            raise requests.exceptions.RequestException(str(e)) from e
+        except ValueError as e:
+            raise requests.exceptions.RequestException(f'Invalid JSON response: {e}') from e
+
+    def iter_post(self, url_path, body, items_prefix='resultData.datas.item'):
+        """
+        서명된 POST 요청 후 응답 배열 항목을 도착하는 대로 생성 (ijson 필요)
+
+        Returns:
+            tuple: (meta dict, 항목 생성기) - meta 는 생성기를 모두 소비한 뒤 완성됩니다.
+        """
+        if ijson is None:
+            raise RuntimeError('ijson is not installed')
+
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
+        url = self.base_url + url_path
+        headers = self.build_headers(url_path)
+        response = self._session.post(url, headers=headers, json=body, verify=True,
+                                      timeout=self.timeout, stream=True)
+        try:
+            response.raise_for_status()
+        except requests.exceptions.RequestException:
+            response.close()
+            raise
+        # gzip/deflate 응답도 풀어서 읽도록 설정
+        response.raw.decode_content = True
+
+        meta = {}
+
+        def generate():
+            try:
+                events = ijson.parse(response.raw, use_float=True)
+                yield from _iter_items(events, items_prefix, meta)
+            except ijson.JSONError as e:
+                raise requests.exceptions.RequestException(f'Invalid JSON response: {e}') from e
+            except ReadTimeoutError as e:
+                # 본문 수신 중 타임아웃
+                raise requests.exceptions.Timeout(str(e)) from e
+            except (Urllib3Error, OSError) as e:
+                # 본문 수신 중 연결 끊김
+                raise requests.exceptions.RequestException(str(e)) from e
+            finally:
+                response.close()
+
+        return meta, generate()
+
+    def close(self):
+        """커넥션 풀 정리"""
+        if self.http2:
+            self._client.close()
+        else:
+            self._session.close()
@@ -0,0 +1,112 @@
+import os
+import time
+
+import pandas as pd
+from logger import logger
+from bot.html_table import read_html_table
+
+try:
+    import python_calamine  # noqa: F401  (pandas engine='calamine')
+except ImportError:
+    python_calamine = None
+
+# File signatures
+OLE2_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'   # legacy .xls (BIFF in an OLE2 container)
+ZIP_MAGIC = b'PK\x03\x04'                           # .xlsx (Office Open XML)
+HTML_MARKERS = (b'<html', b'<table', b'<!doctype html', b'<meta', b'<head', b'<body')
+
+SNIFF_BYTES = 4096
+
+
+def _decode_head(head: bytes) -> bytes:
+    """Normalizes the file head for marker checks (UTF-16 / UTF-8 BOMs, case, leading whitespace)."""
+    if head.startswith((b'\xff\xfe', b'\xfe\xff')):
+        head = head.decode('utf-16', errors='ignore').encode('utf-8')
+    elif head.startswith(b'\xef\xbb\xbf'):
+        head = head[3:]
+    return head.lstrip().lower()
+
+def sniff_excel_format(path: str) -> str:
+    """
+    Detects the real format of a downloaded spreadsheet from its first bytes.
+
+    Returns:
+        str: 'xls', 'xlsx', 'html' or 'unknown'. The file extension is ignored,
+        since ERP exports are often HTML tables saved as .xls.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_BYTES)
+
+    if head.startswith(OLE2_MAGIC):
+        return 'xls'
+    if head.startswith(ZIP_MAGIC):
+        return 'xlsx'
+    text = _decode_head(head)
+    if text.startswith(b'<') and any(marker in text for marker in HTML_MARKERS):
+        return 'html'
+    return 'unknown'
+
+def excel_engine(file_format: str) -> str:
+    """pandas read_excel engine for a binary format (calamine when installed)."""
+    if python_calamine is not None:
+        return 'calamine'
+    return 'xlrd' if file_format == 'xls' else 'openpyxl'
+
+def _read_html(path: str, dtype=None) -> pd.DataFrame:
+    # First table only, streamed row by row instead of building the whole DOM
+    return read_html_table(path, dtype=dtype)
+
+def _read_by_extension(path: str, usecols=None, dtype=None) -> pd.DataFrame:
+    """Previous behaviour for files that could not be sniffed: guess from the extension, then try HTML."""
+    if path.endswith('.xlsx'):
+        return pd.read_excel(path, engine='openpyxl', usecols=usecols, dtype=dtype)
+    try:
+        return pd.read_excel(path, engine='xlrd', usecols=usecols, dtype=dtype)
+    except Exception:
+        logger.warning('⚠️ Failed to read as standard XLS. Trying as HTML...')
+        return _read_html(path, dtype=dtype)
+
+def read_excel_file(path: str, usecols=None, dtype=None) -> pd.DataFrame:
+    """
+    Reads the first sheet / table of a downloaded spreadsheet, dispatching on its sniffed format.
+
+    Binary workbooks go straight to the matching engine (calamine if installed,
+    otherwise xlrd / openpyxl) and HTML tables straight to the HTML parser, so
+    no run pays for a failed parse first.
+
+    Args:
+        path (str): Downloaded file path.
+        usecols (optional): Columns to read (read_excel usecols). HTML tables are read whole
+            and trimmed afterwards.
+        dtype (optional): Explicit dtype(s), skipping type inference for those columns.
+    """
+    started = time.perf_counter()
+    file_format = sniff_excel_format(path)
+
+    if file_format in ('xls', 'xlsx'):
+        engine = excel_engine(file_format)
+        df = pd.read_excel(path, engine=engine, usecols=usecols, dtype=dtype)
+    elif file_format == 'html':
+        engine = 'lxml iterparse'
+        df = _read_html(path, dtype=dtype)
+    else:
+        engine = 'extension'
+        logger.warning(f'⚠️ Unrecognized file signature, guessing from the extension: {os.path.basename(path)}')
+        df = _read_by_extension(path, usecols=usecols, dtype=dtype)
+
+    if file_format == 'html' and usecols is not None and not callable(usecols) and not isinstance(usecols, str):
+        df = df[[c for c in usecols if c in df.columns]]
+
+    elapsed = time.perf_counter() - started
+    logger.info(f'📖 Read {len(df)} rows x {len(df.columns)} cols ({file_format} via {engine}) in {elapsed:.2f}s')
+    return df
+
+def to_sheet_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converts every cell to its string form for a RAW upload, with missing values as ''.
+
+    Same output as astype(str) + replacing 'nan', but also blanks None / NaT and
+    works with pandas' string dtype (where astype(str) keeps NaN as NaN).
+    """
+    missing = df.isna()
+    return df.astype(str).astype(object).mask(missing, '')
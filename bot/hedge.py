@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from logger import logger
+
+
+class LatencyTracker:
+    """
+    최근 응답 시간 분위수 추적기 (스레드 안전)
+
+    Args:
+        window (int): 보관할 최근 응답 수
+        min_samples (int): 분위수를 계산하기 위한 최소 응답 수
+    """
+
+    def __init__(self, window=200, min_samples=20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q):
+        """최근 응답 시간의 q 분위수 (표본이 부족하면 None)"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class HedgedCaller:
+    """
+    헤지 요청 실행기
+
+    첫 요청이 최근 응답 시간의 percentile 분위수 안에 끝나지 않으면 같은 요청을 한 번 더 보내고
+    먼저 성공한 응답을 사용합니다. 늦은 쪽 응답은 버립니다.
+    추가 요청 수는 전체 요청의 max_extra_ratio 비율 이하로 제한합니다.
+
+    Args:
+        max_workers (int): 요청 실행 스레드 수 (동시 요청 수 x 2 권장)
+        percentile (float): 헤지 기준 분위수
+        max_extra_ratio (float): 전체 요청 대비 추가 요청 상한 비율
+        min_delay (float): 헤지까지 최소 대기 시간 (초)
+    """
+
+    def __init__(self, max_workers=32, percentile=0.95, max_extra_ratio=0.05, min_delay=1.0):
+        self.percentile = percentile
+        self.max_extra_ratio = max_extra_ratio
+        self.min_delay = min_delay
+        self.latency = LatencyTracker()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hedge')
+
+    def _hedge_delay(self):
+        threshold = self.latency.percentile(self.percentile)
+        return None if threshold is None else max(threshold, self.min_delay)
+
+    def _take_hedge(self):
+        with self._lock:
+            if self.hedges + 1 > self.max_extra_ratio * self.calls:
+                return False
+            self.hedges += 1
+            return True
+
+    def _timed(self, fn):
+        started = time.monotonic()
+        result = fn()
+        self.latency.record(time.monotonic() - started)
+        return result
+
+    def call(self, fn):
+        """
+        fn() 실행 (필요 시 헤지)
+
+        fn 은 매 시도마다 새로 호출되므로 요청 헤더(transaction-id / 서명)도 시도마다 새로 만들어집니다.
+        두 시도가 모두 실패하면 먼저 끝난 시도의 예외를 올립니다.
+        """
+        with self._lock:
+            self.calls += 1
+
+        delay = self._hedge_delay()
+        if delay is None:
+            return self._timed(fn)
+
+        primary = self._executor.submit(self._timed, fn)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._take_hedge():
+            return primary.result()
+
+        logger.info(f"🪁 응답 지연 {delay:.1f}초 초과 → 헤지 요청")
+        hedge = self._executor.submit(self._timed, fn)
+        pending = {primary, hedge}
+        first_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+                first_error = first_error or future.exception()
+        raise first_error
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,225 @@
+import re
+
+from lxml import etree
+from pandas.errors import EmptyDataError
+from pandas.io.parsers import TextParser
+
+# Same whitespace folding as pandas.read_html
+_RE_WHITESPACE = re.compile(r'[\r\n]+|\s{2,}')
+SECTION_TAGS = ('thead', 'tbody', 'tfoot')
+
+
+def _is_hidden(el) -> bool:
+    return 'display:none' in (el.get('style') or '').replace(' ', '')
+
+def _drop(el):
+    """Removes an element but keeps its tail text (lxml.html drop_tree for plain etree)."""
+    parent = el.getparent()
+    if el.tail:
+        previous = el.getprevious()
+        if previous is not None:
+            previous.tail = (previous.tail or '') + el.tail
+        else:
+            parent.text = (parent.text or '') + el.tail
+    parent.remove(el)
+
+def _fold_whitespace(text: str) -> str:
+    text = text.strip()
+    if '\n' in text or '\r' in text or '  ' in text or '\t' in text:
+        return _RE_WHITESPACE.sub(' ', text)
+    return text
+
+def _cell_text(td) -> str:
+    if not len(td):
+        text = td.text or ''
+    else:
+        # read_html(displayed_only=True) ignores <style> and display:none content
+        for el in [e for e in td.iterdescendants() if isinstance(e.tag, str) and (e.tag == 'style' or _is_hidden(e))]:
+            if el.getparent() is not None:
+                _drop(el)
+        # <br> counts as a line break (folded to a space below)
+        for br in td.iter('br'):
+            br.tail = '\n' + (br.tail or '')
+        text = td.xpath('string()')
+    return _fold_whitespace(text)
+
+def _parse_cells(tr):
+    """
+    Cell texts of the visible <td>/<th> of a row.
+
+    Returns:
+        tuple: (texts, spans, all_th) where spans is a (rowspan, colspan) list,
+        or None when no cell of the row spans.
+    """
+    texts, spans, all_th = [], None, True
+    for td in tr:
+        tag = td.tag
+        if tag != 'td' and tag != 'th':
+            continue
+        attrib = td.attrib
+        rowspan = colspan = 1
+        if attrib:
+            if _is_hidden(td):
+                continue
+            rowspan, colspan = int(attrib.get('rowspan') or 1), int(attrib.get('colspan') or 1)
+        if rowspan != 1 or colspan != 1:
+            if spans is None:
+                spans = [(1, 1)] * len(texts)
+        if spans is not None:
+            spans.append((rowspan, colspan))
+        all_th = all_th and tag == 'th'
+        texts.append(_cell_text(td))
+    return texts, spans, all_th
+
+
+class _SpanExpander:
+    """Copies rowspan / colspan cell text into the covered cells, row by row (as pandas.read_html does)."""
+
+    def __init__(self):
+        self.remainder = []
+
+    def expand(self, cells, spans=None) -> list:
+        if spans is None and not self.remainder:
+            return cells
+        texts, next_remainder, remainder = [], [], self.remainder
+        index = 0
+        for text, (rowspan, colspan) in zip(cells, spans or [(1, 1)] * len(cells)):
+            while remainder and remainder[0][0] <= index:
+                prev_i, prev_text, prev_rowspan = remainder.pop(0)
+                texts.append(prev_text)
+                if prev_rowspan > 1:
+                    next_remainder.append((prev_i, prev_text, prev_rowspan - 1))
+                index += 1
+            for _ in range(colspan):
+                texts.append(text)
+                if rowspan > 1:
+                    next_remainder.append((index, text, rowspan - 1))
+                index += 1
+        for prev_i, prev_text, prev_rowspan in remainder:
+            texts.append(prev_text)
+            if prev_rowspan > 1:
+                next_remainder.append((prev_i, prev_text, prev_rowspan - 1))
+        self.remainder = next_remainder
+        return texts
+
+    def flush(self) -> list:
+        """Rows that only exist because of rowspans reaching past the last row."""
+        rows = []
+        while self.remainder:
+            rows.append(self.expand([]))
+        return rows
+
+
+def iter_html_table_rows(path: str, encoding: str = None):
+    """
+    Streams the rows of the first non-empty HTML table in a file.
+
+    Uses lxml iterparse, so only the current row is kept as elements: each
+    <tr> is reduced to its cell texts and then freed along with its finished
+    siblings. Parsing stops at the end of that table.
+
+    Yields:
+        tuple: (section, texts) where section is 'head', 'body' or 'foot' and texts
+        is the row's cell texts with rowspan / colspan expanded. Footer rows come last.
+    """
+    depth = 0
+    section = None
+    hidden_table = False
+    expander = _SpanExpander()
+    body_started = has_thead = False
+    foot_cells = []
+    seen_rows = False
+
+    with open(path, 'rb') as f:
+        events = etree.iterparse(f, events=('start', 'end'), tag=('table',) + SECTION_TAGS + ('tr',),
+                                 html=True, recover=True, encoding=encoding)
+        for event, el in events:
+            tag = el.tag
+            if tag == 'table':
+                if event == 'start':
+                    depth += 1
+                    if depth == 1:
+                        hidden_table = _is_hidden(el)
+                    continue
+                depth -= 1
+                if depth == 0:
+                    if seen_rows:
+                        break
+                    # empty or hidden table: move on to the next one
+                    expander, foot_cells = _SpanExpander(), []
+                    body_started = has_thead = hidden_table = False
+                    el.clear()
+                continue
+            if depth != 1:
+                continue
+            if tag in SECTION_TAGS:
+                section = tag if event == 'start' else None
+                continue
+            if event != 'end':
+                continue
+
+            hidden = hidden_table or _is_hidden(el)
+            cells, spans, all_th = ([], None, False) if hidden else _parse_cells(el)
+            # free the row and every finished row before it
+            el.clear()
+            parent = el.getparent()
+            while el.getprevious() is not None:
+                del parent[0]
+            if hidden or not cells and not expander.remainder:
+                continue
+
+            seen_rows = True
+            if section == 'tfoot':
+                foot_cells.append((cells, spans))
+                continue
+            if section == 'thead':
+                has_thead = True
+                yield 'head', expander.expand(cells, spans)
+            elif not has_thead and not body_started and cells and all_th:
+                yield 'head', expander.expand(cells, spans)
+            else:
+                body_started = True
+                yield 'body', expander.expand(cells, spans)
+
+    if foot_cells:
+        for cells, spans in foot_cells:
+            yield 'foot', expander.expand(cells, spans)
+        for texts in expander.flush():
+            yield 'foot', texts
+    else:
+        for texts in expander.flush():
+            yield 'body', texts
+
+def read_html_table(path: str, encoding: str = None, dtype=None, thousands: str = ','):
+    """
+    Reads the first HTML table of a file into a DataFrame, like pd.read_html(path)[0].
+
+    Header rows (<thead>, or leading all-<th> rows) become the columns and the
+    values are type-inferred the same way, unless dtype is given
+    (e.g. dtype=str keeps every cell as text).
+
+    Raises:
+        ValueError: No table rows found.
+    """
+    head, body = [], []
+    for section, texts in iter_html_table_rows(path, encoding=encoding):
+        (head if section == 'head' else body).append(texts)
+    if not head and not body:
+        raise ValueError('No tables found in HTML-based Excel file')
+
+    header = None
+    if head:
+        header = 0 if len(head) == 1 else [i for i, row in enumerate(head) if any(text for text in row)]
+    rows = head + body
+
+    # fill out ragged rows
+    width = max(len(row) for row in rows)
+    for row in rows:
+        if len(row) < width:
+            row.extend([''] * (width - len(row)))
+
+    try:
+        with TextParser(rows, header=header, thousands=thousands, dtype=dtype) as parser:
+            return parser.read()
+    except EmptyDataError:
+        raise ValueError('No tables found in HTML-based Excel file')
@@ -0,0 +1,228 @@
+import calendar
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+
+
+def month_partitions(date_from, date_to):
+    """
+    조회 기간을 월 단위 파티션으로 분할
+
+    Args:
+        date_from (str): 시작일 (yyyymmdd)
+        date_to (str): 종료일 (yyyymmdd)
+
+    Returns:
+        list[dict]: [{'month': 'yyyymm', 'fillDtFrom': 'yyyymmdd', 'fillDtTo': 'yyyymmdd'}, ...]
+    """
+    start = datetime.strptime(date_from, '%Y%m%d')
+    end = datetime.strptime(date_to, '%Y%m%d')
+
+    partitions = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        last_day = calendar.monthrange(year, month)[1]
+        first = max(start, datetime(year, month, 1))
+        last = min(end, datetime(year, month, last_day))
+        partitions.append({
+            'month': f'{year:04d}{month:02d}',
+            'fillDtFrom': first.strftime('%Y%m%d'),
+            'fillDtTo': last.strftime('%Y%m%d')
+        })
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    return partitions
+
+def split_window(date_from, date_to, parts):
+    """
+    기간을 parts 개의 연속된 일 단위 구간으로 분할
+
+    Returns:
+        list[tuple]: [(yyyymmdd, yyyymmdd), ...] (날짜 순, 빈 구간 없음)
+    """
+    start = datetime.strptime(date_from, '%Y%m%d')
+    days = (datetime.strptime(date_to, '%Y%m%d') - start).days + 1
+    parts = max(1, min(parts, days))
+
+    windows = []
+    offset = 0
+    for k in range(parts):
+        length = days // parts + (1 if k < days % parts else 0)
+        first = start + timedelta(days=offset)
+        last = first + timedelta(days=length - 1)
+        windows.append((first.strftime('%Y%m%d'), last.strftime('%Y%m%d')))
+        offset += length
+    return windows
+
+def plan_windows(partition, estimated_rows=None, target_rows=20000, min_parts=1):
+    """
+    월 파티션의 조회 구간 계획
+
+    이전 실행에서 관측한 행 수(estimated_rows)가 target_rows 를 넘으면 그만큼 일 단위로 나눕니다.
+    추정치가 없으면 min_parts 개로 나눕니다. (대용량 계정 기본 분할 수)
+    """
+    if estimated_rows:
+        parts = -(-estimated_rows // target_rows)
+    else:
+        parts = min_parts
+    return split_window(partition['fillDtFrom'], partition['fillDtTo'], parts)
+
+def is_closed_month(month, today=None, reopen_days=0):
+    """
+    마감된 월인지 판단
+
+    월말 이후 reopen_days 일이 지나야 마감으로 간주합니다.
+    (마감 직후 늦게 들어오는 전표를 반영하기 위한 재조회 기간)
+    """
+    today = today or datetime.now()
+    year, mon = int(month[:4]), int(month[4:6])
+    month_end = datetime(year, mon, calendar.monthrange(year, mon)[1])
+    return today.date() > (month_end + timedelta(days=reopen_days)).date()
+
+
+class PartitionCache:
+    """
+    마감월 파티션 로컬 캐시
+
+    {cache_dir}/{조회조건}/{acctCd}/{yyyymm}.json.gz 형태로 저장합니다.
+    빈 파티션도 저장하여 "데이터 없음"과 "캐시 없음"을 구분합니다.
+
+    Args:
+        cache_dir (str): 캐시 루트 디렉토리
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def scope(params):
+        """조회 조건 디렉토리명 (회사 / 사업장 / 출력구분 / 0원 표시)"""
+        return '_'.join([
+            str(params.get('coCd')),
+            str(params.get('divCds', '')).strip('|').replace('|', '-'),
+            str(params.get('prtFg')),
+            str(params.get('zeroDisp'))
+        ])
+
+    def _path(self, params, month):
+        return os.path.join(self.cache_dir, self.scope(params), str(params.get('acctCd')), f'{month}.json.gz')
+
+    def exists(self, params, month):
+        """캐시 파일 존재 여부"""
+        return os.path.exists(self._path(params, month))
+
+    def load(self, params, month):
+        """캐시된 파티션 행 목록 반환 (없으면 None)"""
+        path = self._path(params, month)
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                return json.load(f)['rows']
+        except (OSError, ValueError, KeyError):
+            # 손상된 캐시는 없는 것으로 취급하고 다시 조회
+            return None
+
+    def save(self, params, month, rows):
+        """파티션 저장 (임시 파일에 쓴 뒤 교체하여 중간 상태가 남지 않도록 함)"""
+        path = self._path(params, month)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump({'fetchedAt': datetime.now().isoformat(timespec='seconds'), 'rows': rows}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+# 체크포인트 키에 포함하는 조회 조건 (조회 기간이 바뀌면 키가 달라져 이전 체크포인트는 만료)
+CHECKPOINT_KEYS = ['coCd', 'divCds', 'fillDtFrom', 'fillDtTo', 'prtFg', 'zeroDisp']
+
+def params_hash(params, keys=CHECKPOINT_KEYS):
+    """조회 조건 해시 (12자리)"""
+    payload = json.dumps({k: params.get(k) for k in keys}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+
+class RunCheckpoint(PartitionCache):
+    """
+    실행 체크포인트 (완료된 계정 x 월 파티션 저장)
+
+    {root}/{조회조건}-{조회조건 해시}/ 아래에 마감 여부와 관계없이 완료된 파티션을 저장합니다.
+    실행이 중간에 끊기면 다음 실행은 같은 해시의 체크포인트에 없는 파티션만 조회하고,
+    모든 계정이 성공하면 clear() 로 삭제합니다.
+    조회 기간이 바뀐 실행은 해시가 달라지므로 같은 조회조건의 이전 체크포인트는 expire_stale() 로 정리합니다.
+    같은 날 안에서도 첫 저장 후 max_age_hours 가 지난 체크포인트는 버립니다.
+    (실패 계정이 계속 남아도 다른 계정의 당월 데이터를 오래된 값으로 재사용하지 않도록)
+
+    Args:
+        root (str): 체크포인트 루트 디렉토리
+        params (dict): 계정 미지정 조회 파라미터
+        max_age_hours (float, optional): 첫 저장 후 이어서 조회에 사용할 최대 시간
+    """
+
+    MARKER = 'checkpoint.json'
+
+    def __init__(self, root, params, max_age_hours=None):
+        self.root = root
+        self.prefix = self.scope(params) + '-'
+        self.key = params_hash(params)
+        self.max_age_hours = max_age_hours
+        super().__init__(os.path.join(root, self.prefix + self.key))
+
+    def count(self):
+        """저장된 파티션 수"""
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        return sum(
+            1 for _, _, files in os.walk(self.cache_dir) for name in files if name.endswith('.json.gz')
+        )
+
+    def created_at(self):
+        """첫 파티션 저장 시각 (epoch 초, 기록이 없으면 None)"""
+        try:
+            with open(os.path.join(self.cache_dir, self.MARKER), encoding='utf-8') as f:
+                return float(json.load(f)['createdAt'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, params, month, rows):
+        """파티션 저장 (첫 저장 시 생성 시각 기록)"""
+        marker = os.path.join(self.cache_dir, self.MARKER)
+        if not os.path.exists(marker):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(marker, 'w', encoding='utf-8') as f:
+                json.dump({'createdAt': time.time()}, f)
+        super().save(params, month, rows)
+
+    def is_expired(self, now=None):
+        """첫 저장 후 max_age_hours 가 지났는지 (생성 시각 기록이 없는 체크포인트도 만료로 취급)"""
+        if self.max_age_hours is None or not os.path.isdir(self.cache_dir):
+            return False
+        created_at = self.created_at()
+        return created_at is None or (now or time.time()) - created_at > self.max_age_hours * 3600
+
+    def expire_stale(self):
+        """같은 조회조건이지만 조회 기간이 다른 이전 체크포인트와 max_age_hours 가 지난 체크포인트 삭제
+
+        Returns:
+            int: 삭제한 체크포인트 수
+        """
+        if not os.path.isdir(self.root):
+            return 0
+        stale = [
+            name for name in os.listdir(self.root)
+            if name.startswith(self.prefix) and name != self.prefix + self.key
+        ]
+        for name in stale:
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+        if self.is_expired():
+            self.clear()
+            stale.append(self.prefix + self.key)
+        return len(stale)
+
+    def clear(self):
+        """체크포인트 삭제 (실행 완료 시)"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
@@ -0,0 +1,115 @@
+from array import array
+
+import numpy as np
+import pandas as pd
+
+from bot.ledger_store import LEDGER_FIELDS, NUMERIC_FIELDS
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+class LedgerColumns:
+    """
+    필드별 배열로 보관하는 원장 행 버퍼
+
+    행마다 dict 를 유지하지 않고 필드별로 나눠 담습니다.
+    - 문자열 등 일반 필드: 사전 인코딩 (값 목록 + int32 코드 배열, 같은 값은 한 번만 보관)
+    - drAm / crAm / restAm: float64 배열
+    to_frame() 은 코드 배열로 값 목록을 한 번에 펼치거나(take) 숫자 배열을 그대로 감싸므로
+    필드마다 최대 한 번만 복사합니다.
+
+    파티션 완료 순서와 관계없이 원래 순서(계정 / 월)로 내보낼 수 있도록 extend() 에 key 를 주면
+    구간을 기록해 두고 to_frame(keys) 로 해당 순서대로 꺼냅니다.
+
+    Args:
+        fields (list): 보관할 필드 (API 응답 키)
+        numeric_fields (set): 숫자 배열로 보관할 필드
+    """
+
+    def __init__(self, fields=LEDGER_FIELDS, numeric_fields=NUMERIC_FIELDS):
+        self.fields = list(fields)
+        self.numeric_fields = set(numeric_fields) & set(self.fields)
+        self.row_count = 0
+        self._numbers = {f: array('d') for f in self.fields if f in self.numeric_fields}
+        self._codes = {f: array('i') for f in self.fields if f not in self.numeric_fields}
+        self._values = {f: [] for f in self._codes}
+        self._lookup = {f: {} for f in self._codes}
+        self._seen = set()
+        self._segments = {}
+
+    def __len__(self):
+        return self.row_count
+
+    def extend(self, rows, key=None):
+        """API 행 목록 추가 (key 를 주면 구간을 기록)"""
+        start = self.row_count
+        for field in self.fields:
+            if field not in self._seen and any(field in row for row in rows):
+                self._seen.add(field)
+
+            if field in self._numbers:
+                self._numbers[field].extend(_to_float(row.get(field)) for row in rows)
+                continue
+
+            lookup, values, codes = self._lookup[field], self._values[field], self._codes[field]
+            for row in rows:
+                value = row.get(field)
+                # 1 == 1.0 이므로 실수는 따로 구분하여 원래 값(표기)을 유지
+                lookup_key = (float, value) if type(value) is float else value
+                code = lookup.get(lookup_key)
+                if code is None:
+                    code = lookup[lookup_key] = len(values)
+                    values.append(value)
+                codes.append(code)
+        self.row_count += len(rows)
+        if key is not None:
+            self._segments[key] = (start, self.row_count)
+
+    def _order(self, keys):
+        ranges = [self._segments[k] for k in keys if k in self._segments]
+        if not ranges:
+            return np.arange(0, dtype=np.intp)
+        return np.concatenate([np.arange(start, stop, dtype=np.intp) for start, stop in ranges])
+
+    def _numeric_column(self, field, order):
+        values = np.frombuffer(self._numbers[field], dtype=np.float64) if self.row_count else np.empty(0)
+        if order is not None:
+            values = values[order]
+        # JSON 정수 값은 기존(dict -> DataFrame)과 같이 정수 컬럼으로 유지
+        if len(values) and not np.isnan(values).any() and np.array_equal(values, np.floor(values)) \
+                and np.abs(values).max() < 2 ** 53:
+            return values.astype(np.int64)
+        return values
+
+    def _value_column(self, field, order):
+        codes = np.frombuffer(self._codes[field], dtype=np.int32) if self.row_count else np.empty(0, np.int32)
+        if order is not None:
+            codes = codes[order]
+        values = np.empty(len(self._values[field]), dtype=object)
+        values[:] = self._values[field]
+        return values[codes]
+
+    def to_frame(self, keys=None):
+        """
+        DataFrame 변환 (API 응답 키 컬럼)
+
+        어떤 행에도 없던 필드는 dict 목록으로 만든 DataFrame 과 같이 컬럼에서 제외합니다.
+
+        Args:
+            keys (list, optional): extend() 에 준 key 순서 (없으면 추가한 순서 전체)
+        """
+        order = None if keys is None else self._order(keys)
+        data = {}
+        for field in self.fields:
+            if field not in self._seen:
+                continue
+            if field in self._numbers:
+                data[field] = self._numeric_column(field, order)
+            else:
+                data[field] = self._value_column(field, order)
+        return pd.DataFrame(data, copy=False)
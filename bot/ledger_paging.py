@@ -0,0 +1,70 @@
+import threading
+
+
+class AdaptivePageSizer:
+    """
+    응답 시간 기반 viewCount 자동 조정
+
+    관측한 행당 응답 시간(EWMA)으로 타임아웃의 target_ratio 안에 끝날 만한 페이지 크기를 고릅니다.
+    페이지 크기는 max_count 를 반씩 줄인 단계(100000, 50000, 25000 ...)에서만 고르므로,
+    타임아웃 난 페이지 p(크기 c)는 크기 c/2 의 페이지 2p-1, 2p 로 정확히 나눠 다시 조회할 수 있습니다.
+
+    Args:
+        max_count (int): 최대 viewCount
+        min_count (int): 최소 viewCount (이보다 작게는 나누지 않음)
+        timeout (float): 요청 타임아웃 (초)
+        target_ratio (float): 페이지 하나가 타임아웃 대비 차지할 목표 비율
+        alpha (float): EWMA 가중치
+    """
+
+    def __init__(self, max_count=100000, min_count=3000, timeout=120, target_ratio=0.25, alpha=0.3):
+        self.max_count = max_count
+        self.min_count = min_count
+        self.timeout = timeout
+        self.target_ratio = target_ratio
+        self.alpha = alpha
+        self._seconds_per_row = None
+        self._lock = threading.Lock()
+
+    def ladder(self):
+        """선택 가능한 페이지 크기 목록 (큰 순서)"""
+        sizes = [self.max_count]
+        while sizes[-1] % 2 == 0 and sizes[-1] // 2 >= self.min_count:
+            sizes.append(sizes[-1] // 2)
+        return sizes
+
+    def observe(self, rows, seconds):
+        """응답 관측 기록 (행 수가 적은 응답은 고정 지연이 대부분이라 제외)"""
+        if rows < 1000 or seconds <= 0:
+            return
+        sample = seconds / rows
+        with self._lock:
+            if self._seconds_per_row is None:
+                self._seconds_per_row = sample
+            else:
+                self._seconds_per_row = self.alpha * sample + (1 - self.alpha) * self._seconds_per_row
+
+    def observe_timeout(self, count):
+        """타임아웃 관측: 해당 크기가 타임아웃을 넘긴 것으로 간주하여 추정치를 올림"""
+        with self._lock:
+            floor = self.timeout / max(count, 1)
+            self._seconds_per_row = max(self._seconds_per_row or 0, floor)
+
+    def page_count(self):
+        """현재 추정치로 고른 viewCount"""
+        with self._lock:
+            seconds_per_row = self._seconds_per_row
+        if not seconds_per_row:
+            return self.max_count
+
+        budget_rows = self.target_ratio * self.timeout / seconds_per_row
+        for size in self.ladder():
+            if size <= budget_rows:
+                return size
+        return self.ladder()[-1]
+
+    def split(self, count):
+        """타임아웃 난 페이지 크기의 절반 (더 나눌 수 없으면 None)"""
+        if count % 2 or count // 2 < self.min_count:
+            return None
+        return count // 2
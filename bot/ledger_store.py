@@ -0,0 +1,221 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+# API 응답 필드 (ledger_bot.upload_to_google_sheet 의 columns_map 순서)
+LEDGER_FIELDS = [
+    'coCd', 'divCd', 'acctCd', 'drcrFg', 'fillDt', 'fillNb', 'rmkDc', 'trCd',
+    'trNm', 'regNb', 'drAm', 'crAm', 'restAm', 'isuDt', 'isuSq', 'dispSq',
+    'lnSq', 'ctDeptCd', 'ctDeptNm', 'pjtCd', 'pjtNm', 'ctEmpCd', 'ctEmpNm'
+]
+NUMERIC_FIELDS = {'drAm', 'crAm', 'restAm'}
+
+# 전표 라인 자연키 (회사 + 작성일 + 작성순번 + 라인순번)
+KEY_FIELDS = ['coCd', 'isuDt', 'isuSq', 'lnSq']
+
+# 집계 기준으로 허용하는 컬럼 (이름 -> SQL 식)
+GROUP_COLUMNS = {
+    'acct': 'acctCd',
+    'dept': 'ctDeptCd, ctDeptNm',
+    'project': 'pjtCd, pjtNm',
+    'vendor': 'trCd, trNm',
+    'month': "substr(fillDt, 1, 6) AS month"
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS ledger (
+    {', '.join(f'{f} REAL' if f in NUMERIC_FIELDS else f'{f} TEXT' for f in LEDGER_FIELDS)},
+    syncedAt TEXT,
+    PRIMARY KEY ({', '.join(KEY_FIELDS)})
+);
+CREATE INDEX IF NOT EXISTS idx_ledger_acct_fill ON ledger (acctCd, fillDt);
+CREATE INDEX IF NOT EXISTS idx_ledger_dept ON ledger (ctDeptCd);
+CREATE INDEX IF NOT EXISTS idx_ledger_pjt ON ledger (pjtCd);
+CREATE INDEX IF NOT EXISTS idx_ledger_tr ON ledger (trCd);
+CREATE TABLE IF NOT EXISTS account_activity (
+    coCd TEXT,
+    acctCd TEXT,
+    firstCheckedAt TEXT,
+    lastCheckedAt TEXT,
+    lastSeenAt TEXT,
+    lastRowCount INTEGER,
+    PRIMARY KEY (coCd, acctCd)
+);
+"""
+
+
+def _to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class LedgerStore:
+    """
+    계정별원장 로컬 저장소 (SQLite)
+
+    (acctCd, fillDt), ctDeptCd, pjtCd, trCd 인덱스를 두고
+    전표 라인 자연키(coCd, isuDt, isuSq, lnSq) 기준으로 upsert 합니다.
+
+    Args:
+        path (str): SQLite 파일 경로
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+
+    def _row_values(self, row, synced_at):
+        values = [
+            _to_number(row.get(f)) if f in NUMERIC_FIELDS else (None if row.get(f) is None else str(row.get(f)))
+            for f in LEDGER_FIELDS
+        ]
+        return values + [synced_at]
+
+    def _upsert(self, rows):
+        columns = LEDGER_FIELDS + ['syncedAt']
+        updates = ', '.join(f'{c}=excluded.{c}' for c in columns if c not in KEY_FIELDS)
+        sql = (
+            f"INSERT INTO ledger ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT ({', '.join(KEY_FIELDS)}) DO UPDATE SET {updates}"
+        )
+        synced_at = datetime.now().isoformat(timespec='seconds')
+        self._conn.executemany(sql, (self._row_values(row, synced_at) for row in rows))
+
+    def replace_range(self, co_cd, acct_cd, fill_dt_from, fill_dt_to, rows):
+        """
+        계정의 기간 데이터를 원천 기준으로 교체 (삭제된 전표 반영)
+
+        삭제와 upsert를 하나의 트랜잭션에서 처리합니다.
+        """
+        self.replace_ranges([(co_cd, acct_cd, fill_dt_from, fill_dt_to, rows)])
+
+    def replace_ranges(self, ranges):
+        """여러 (coCd, acctCd, 시작일, 종료일, 행 목록) 구간을 한 트랜잭션으로 교체"""
+        with self._lock, self._conn:
+            for co_cd, acct_cd, fill_dt_from, fill_dt_to, rows in ranges:
+                self._conn.execute(
+                    'DELETE FROM ledger WHERE coCd = ? AND acctCd = ? AND fillDt BETWEEN ? AND ?',
+                    (co_cd, acct_cd, fill_dt_from, fill_dt_to)
+                )
+                self._upsert(rows)
+
+    def totals(self, by=('acct', 'month'), fill_dt_from=None, fill_dt_to=None, acct_cd=None, co_cd=None):
+        """
+        기준별 차변/대변 합계
+
+        Args:
+            by (iterable): 집계 기준 ('acct', 'dept', 'project', 'vendor', 'month')
+            fill_dt_from (str, optional): 승인일 시작 (yyyymmdd)
+            fill_dt_to (str, optional): 승인일 종료 (yyyymmdd)
+            acct_cd (str, optional): 계정과목 필터
+            co_cd (str, optional): 회사코드 필터
+
+        Returns:
+            list[dict]: 기준 컬럼 + count, drAm, crAm
+        """
+        unknown = [b for b in by if b not in GROUP_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown group column(s): {', '.join(unknown)}")
+
+        select_cols = ', '.join(GROUP_COLUMNS[b] for b in by)
+        group_cols = ', '.join(
+            'month' if b == 'month' else GROUP_COLUMNS[b] for b in by
+        )
+        where, params = self._filters(fill_dt_from, fill_dt_to, acct_cd, co_cd)
+        sql = (
+            f"SELECT {select_cols}, COUNT(*) AS count, SUM(drAm) AS drAm, SUM(crAm) AS crAm "
+            f"FROM ledger {where} GROUP BY {group_cols} ORDER BY {group_cols}"
+        )
+        with self._lock:
+            return [dict(r) for r in self._conn.execute(sql, params)]
+
+    def partition_counts(self, co_cd):
+        """(acctCd, yyyymm) 별 저장된 행 수 (조회 구간 분할 계획용)"""
+        sql = (
+            "SELECT acctCd, substr(fillDt, 1, 6) AS month, COUNT(*) AS count "
+            "FROM ledger WHERE coCd = ? GROUP BY acctCd, month"
+        )
+        with self._lock:
+            return {(r['acctCd'], r['month']): r['count'] for r in self._conn.execute(sql, (co_cd,))}
+
+    def record_account_check(self, co_cd, acct_cd, row_count, checked_at=None):
+        """계정 전체 기간 조회 결과 기록 (행이 있으면 lastSeenAt 갱신)"""
+        checked_at = (checked_at or datetime.now()).isoformat(timespec='seconds')
+        sql = (
+            "INSERT INTO account_activity (coCd, acctCd, firstCheckedAt, lastCheckedAt, lastSeenAt, lastRowCount) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (coCd, acctCd) DO UPDATE SET lastCheckedAt = excluded.lastCheckedAt, "
+            "lastRowCount = excluded.lastRowCount, "
+            "lastSeenAt = COALESCE(excluded.lastSeenAt, account_activity.lastSeenAt)"
+        )
+        with self._lock, self._conn:
+            self._conn.execute(sql, (co_cd, acct_cd, checked_at, checked_at,
+                                     checked_at if row_count else None, row_count))
+
+    def skip_list(self, co_cd=None, dormant_days=7, recheck_hours=24, now=None):
+        """
+        계정별 빈 계정 건너뛰기 상태
+
+        dormant_days 이상 데이터가 없던 계정(마지막으로 데이터를 본 시점, 본 적이 없으면 첫 확인 시점 기준)은
+        마지막 확인 후 recheck_hours 가 지날 때까지 건너뜁니다.
+
+        Returns:
+            list[dict]: account_activity 컬럼 + status ('active', 'skip', 'recheck'), nextCheckAt
+        """
+        now = now or datetime.now()
+        where, params = ('WHERE coCd = ?', [co_cd]) if co_cd else ('', [])
+        with self._lock:
+            rows = [dict(r) for r in self._conn.execute(
+                f"SELECT * FROM account_activity {where} ORDER BY coCd, acctCd", params)]
+
+        for row in rows:
+            since = datetime.fromisoformat(row['lastSeenAt'] or row['firstCheckedAt'])
+            if row['lastRowCount'] or now - since < timedelta(days=dormant_days):
+                row['status'], row['nextCheckAt'] = 'active', None
+                continue
+            next_check = datetime.fromisoformat(row['lastCheckedAt']) + timedelta(hours=recheck_hours)
+            row['status'] = 'skip' if now < next_check else 'recheck'
+            row['nextCheckAt'] = next_check.isoformat(timespec='seconds')
+        return rows
+
+    def vendor_rows(self, vendor, fill_dt_from=None, fill_dt_to=None, co_cd=None):
+        """거래처(코드 또는 거래처명 일부)의 전표 라인 조회"""
+        where, params = self._filters(fill_dt_from, fill_dt_to, None, co_cd)
+        clause = '(trCd = ? OR trNm LIKE ?)'
+        where = f'{where} AND {clause}' if where else f'WHERE {clause}'
+        params += [vendor, f'%{vendor}%']
+        sql = f"SELECT {', '.join(LEDGER_FIELDS)} FROM ledger {where} ORDER BY fillDt, fillNb"
+        with self._lock:
+            return [dict(r) for r in self._conn.execute(sql, params)]
+
+    def _filters(self, fill_dt_from, fill_dt_to, acct_cd, co_cd):
+        conditions, params = [], []
+        if fill_dt_from:
+            conditions.append('fillDt >= ?')
+            params.append(fill_dt_from)
+        if fill_dt_to:
+            conditions.append('fillDt <= ?')
+            params.append(fill_dt_to)
+        if acct_cd:
+            conditions.append('acctCd = ?')
+            params.append(acct_cd)
+        if co_cd:
+            conditions.append('coCd = ?')
+            params.append(co_cd)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return where, params
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
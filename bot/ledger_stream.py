@@ -0,0 +1,149 @@
+import heapq
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+def _sort_value(value):
+    """병합 정렬 키 (결측값은 sort_values 와 같이 맨 뒤로)"""
+    if value is None or (isinstance(value, float) and value != value):
+        return (1, 0)
+    return (0, value)
+
+
+class SpillBuffer:
+    """
+    정렬된 청크 스트림 버퍼 (메모리 상한 초과 시 임시 파일로 분할 저장)
+
+    변환된 DataFrame 청크를 받아 spill_rows 행까지만 메모리에 보관하고,
+    초과하면 정렬된 런(run)으로 임시 파일에 기록합니다.
+    pyarrow 가 설치되어 있으면 Parquet(열 기반), 없으면 pickle 블록으로 저장합니다.
+    iter_blocks() 는 런들을 k-way 병합하여 block_rows 단위 DataFrame 으로 돌려줍니다.
+
+    Args:
+        columns (list): 출력 컬럼 순서
+        sort_by (list): 정렬 기준 컬럼
+        spill_rows (int): 메모리에 보관할 최대 행 수
+        block_rows (int): 파일 기록/출력 블록 크기
+    """
+
+    def __init__(self, columns, sort_by, spill_rows=200000, block_rows=20000):
+        self.columns = list(columns)
+        self.sort_by = [c for c in sort_by if c in self.columns]
+        self.spill_rows = spill_rows
+        self.block_rows = block_rows
+        self.row_count = 0
+        self._chunks = []
+        self._buffered = 0
+        self._runs = []
+        self._spill_dir = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.row_count
+
+    @property
+    def spilled(self):
+        return len(self._runs)
+
+    def add(self, df):
+        """변환된 청크 추가 (여러 수집 스레드에서 동시에 호출 가능)"""
+        if df is None or df.empty:
+            return
+        chunk = df.reindex(columns=self.columns)
+        with self._lock:
+            self._chunks.append(chunk)
+            self._buffered += len(chunk)
+            self.row_count += len(chunk)
+            if self._buffered >= self.spill_rows:
+                self._spill()
+
+    def _sorted_buffer(self):
+        df = pd.concat(self._chunks, ignore_index=True) if len(self._chunks) > 1 else self._chunks[0]
+        self._chunks = []
+        self._buffered = 0
+        if self.sort_by:
+            df = df.sort_values(by=self.sort_by, kind='stable')
+        return df
+
+    def _spill(self):
+        if not self._chunks:
+            return
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix='ledger_spill_')
+
+        df = self._sorted_buffer()
+        path = os.path.join(self._spill_dir, f'run_{len(self._runs):04d}')
+        if pq is not None:
+            # Parquet 은 열마다 단일 타입이 필요하므로 문자열 컬럼을 정규화 (업로드 시 어차피 str 변환)
+            for col in df.columns:
+                if df[col].dtype == object:
+                    df[col] = df[col].astype(str)
+            pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path + '.parquet',
+                           row_group_size=self.block_rows)
+            self._runs.append(path + '.parquet')
+        else:
+            with open(path + '.pkl', 'wb') as f:
+                for start in range(0, len(df), self.block_rows):
+                    pickle.dump(df.iloc[start:start + self.block_rows], f, protocol=pickle.HIGHEST_PROTOCOL)
+            self._runs.append(path + '.pkl')
+
+    def _read_run(self, path):
+        if path.endswith('.parquet'):
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=self.block_rows):
+                yield batch.to_pandas()
+        else:
+            with open(path, 'rb') as f:
+                while True:
+                    try:
+                        yield pickle.load(f)
+                    except EOFError:
+                        return
+
+    def _iter_run_rows(self, path):
+        for block in self._read_run(path):
+            yield from block.itertuples(index=False, name=None)
+
+    def iter_blocks(self):
+        """정렬된 순서로 block_rows 단위 DataFrame 생성"""
+        if not self._runs:
+            # 메모리 상한을 넘지 않은 경우: 한 번 정렬 후 블록 단위로 출력
+            if not self._chunks:
+                return
+            df = self._sorted_buffer()
+            for start in range(0, len(df), self.block_rows):
+                yield df.iloc[start:start + self.block_rows]
+            return
+
+        self._spill()
+        key_idx = [self.columns.index(c) for c in self.sort_by]
+        merged = heapq.merge(
+            *(self._iter_run_rows(path) for path in self._runs),
+            key=lambda row: tuple(_sort_value(row[i]) for i in key_idx)
+        )
+        batch = []
+        for row in merged:
+            batch.append(row)
+            if len(batch) >= self.block_rows:
+                yield pd.DataFrame.from_records(batch, columns=self.columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame.from_records(batch, columns=self.columns)
+
+    def close(self):
+        """임시 파일 정리"""
+        self._chunks = []
+        if self._spill_dir:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+        self._runs = []
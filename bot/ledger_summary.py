@@ -0,0 +1,76 @@
+import pandas as pd
+
+# 요약 탭 이름 -> 묶음 기준 컬럼 (시트 업로드용 헤더명)
+SUMMARY_DIMENSIONS = {
+    '계정과목': ['계정과목'],
+    '사용부서': ['사용부서코드', '사용부서명'],
+    '프로젝트': ['프로젝트코드', '프로젝트명']
+}
+AMOUNT_COLUMNS = ['차변', '대변']
+
+
+class LedgerSummary:
+    """
+    월별 요약 집계 누적기
+
+    변환된 원장 DataFrame(전체 또는 스트리밍 블록)을 add() 로 받아
+    기준 컬럼 x 월(승인일 yyyy-mm) 별 차변 / 대변 / 건수 합계를 부분 집계로 보관합니다.
+    합계는 더해도 같으므로 블록마다 groupby 한 결과만 남기고 원본 행은 보관하지 않습니다.
+    tables() 는 기준별로 월을 컬럼으로 펼친 순액(차변 - 대변) 표를 돌려줍니다.
+
+    Args:
+        dimensions (dict): 요약 이름 -> 기준 컬럼 목록
+        group_keys (list): 모든 요약 앞에 붙일 기준 컬럼 (통합 탭의 회사코드 등)
+    """
+
+    def __init__(self, dimensions=SUMMARY_DIMENSIONS, group_keys=()):
+        self.dimensions = {name: list(group_keys) + list(columns) for name, columns in dimensions.items()}
+        self._partials = {name: [] for name in self.dimensions}
+
+    def add(self, df):
+        """변환된 원장 블록의 부분 집계 추가"""
+        if df is None or df.empty or '승인일' not in df.columns:
+            return
+        month = df['승인일'].astype(str).str.slice(0, 7)
+        amounts = {col: pd.to_numeric(df[col], errors='coerce').fillna(0) if col in df.columns else 0
+                   for col in AMOUNT_COLUMNS}
+
+        for name, keys in self.dimensions.items():
+            keys = [k for k in keys if k in df.columns]
+            if not keys:
+                continue
+            # 블록마다 category 값 목록이 다르므로 문자열로 맞춰서 묶음
+            frame = pd.DataFrame({k: df[k].astype(str) for k in keys})
+            frame['월'] = month
+            for col, values in amounts.items():
+                frame[col] = values
+            frame['건수'] = 1
+            self._partials[name].append(frame.groupby(keys + ['월'], sort=False).sum())
+
+    def tables(self):
+        """
+        요약 이름 -> 월별 순액 표
+
+        컬럼: 기준 컬럼 + 월(yyyy-mm, 순액) + 차변 / 대변 / 순액 / 건수 합계
+        """
+        result = {}
+        for name, partials in self._partials.items():
+            if not partials:
+                continue
+            totals = pd.concat(partials)
+            keys = list(totals.index.names)
+            totals = totals.groupby(level=keys).sum()
+            group = keys[:-1]
+
+            net = (totals['차변'] - totals['대변']).unstack('월', fill_value=0)
+            net = net.reindex(columns=sorted(net.columns))
+            by_group = totals.groupby(level=group).sum()
+            net['차변합계'] = by_group['차변']
+            net['대변합계'] = by_group['대변']
+            net['순액합계'] = by_group['차변'] - by_group['대변']
+            net['건수'] = by_group['건수']
+
+            table = net.reset_index()
+            table.columns.name = None
+            result[name] = table.sort_values(by=group, kind='stable').reset_index(drop=True)
+        return result
@@ -0,0 +1,113 @@
+import pandas as pd
+
+# 차대구분 코드 -> 표시명
+DRCR_LABELS = {'1': '차변', '2': '대변'}
+
+# 반복 값이 많은 문자열 컬럼 (category dtype 으로 보관)
+CATEGORY_COLUMNS = [
+    '회사코드', '사업장코드', '계정과목', '차대구분', '거래처코드', '거래처명',
+    '사용부서코드', '사용부서명', '프로젝트코드', '프로젝트명', '사용사원코드', '사용사원명'
+]
+
+
+def map_drcr_fg(series):
+    """차대구분 코드 변환 (convert_drcr_fg 의 벡터화 버전, 그 외 값은 그대로 유지)"""
+    return series.map(DRCR_LABELS).where(series.isin(list(DRCR_LABELS)), series)
+
+def format_date_series(series):
+    """yyyymmdd -> yyyy-mm-dd 변환 (format_date_str 의 벡터화 버전, 8자리가 아니면 그대로 유지)"""
+    text = series.astype(str)
+    mask = series.notna() & (series != '') & (text.str.len() == 8)
+    if not mask.any():
+        return series
+    formatted = text.str.slice(0, 4) + '-' + text.str.slice(4, 6) + '-' + text.str.slice(6)
+    return formatted.where(mask, series).astype(object)
+
+def _to_number(series):
+    """숫자 변환 (정수 문자열은 int64 로 바로 변환, 그 외는 pd.to_numeric 으로 처리)"""
+    if pd.api.types.is_string_dtype(series):
+        try:
+            # 대부분 정수 문자열이므로 파싱 비용이 큰 to_numeric 보다 빠른 경로를 먼저 시도
+            return series.astype('int64')
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return pd.to_numeric(series, errors='coerce').fillna(0)
+
+def coerce_numeric(df, columns):
+    """숫자형 변환 (NaN -> 0)"""
+    for col in columns:
+        if col in df.columns:
+            df[col] = _to_number(df[col])
+    return df
+
+def categorize(df, columns=CATEGORY_COLUMNS):
+    """
+    반복 문자열 컬럼을 category dtype 으로 변환
+
+    시트 업로드 시 astype(str) 결과가 기존과 같도록 먼저 문자열로 바꾼 뒤 변환합니다.
+    (None -> 'None', NaN -> 'nan')
+    """
+    for col in columns:
+        if col in df.columns:
+            df[col] = df[col].astype(str).astype('category')
+    return df
+
+def transform_ledger_frame(df, numeric_columns):
+    """
+    컬럼명이 변경된 원장 DataFrame 을 컬럼 단위로 일괄 변환
+
+    차대구분 코드 매핑, 승인일/작성일 날짜 포맷, 숫자형 변환, 반복 문자열 category 변환
+    """
+    if '차대구분' in df.columns:
+        df['차대구분'] = map_drcr_fg(df['차대구분'])
+    for col in ('승인일', '작성일'):
+        if col in df.columns:
+            df[col] = format_date_series(df[col])
+
+    coerce_numeric(df, numeric_columns)
+    return categorize(df)
+
+def _amount(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0
+    return int(number) if number.is_integer() else number
+
+def opening_balance(rows):
+    """API 행 목록(조회 순서)의 기초잔액: 첫 행 restAm - (drAm - crAm)"""
+    first = rows[0]
+    return _amount(first.get('restAm')) - (_amount(first.get('drAm')) - _amount(first.get('crAm')))
+
+
+class RunningBalance:
+    """
+    계정별 누적 잔액(잔액 컬럼) 재계산기
+
+    월 파티션 / 조회 구간마다 따로 조회하면 API 의 restAm 은 조회 단위로 계산되므로
+    (조회마다 기초잔액 처리가 반복되거나 다시 시작) 기간 전체를 한 번에 조회했을 때의 잔액과 달라집니다.
+    그래서 시트의 잔액은 회계연도(1월 시작)별 기초잔액 + 차변 - 대변 누계로 다시 계산합니다.
+    판관비는 손익 계정이라 연도가 바뀌면 잔액이 다시 시작하므로, 연도마다 그 해 첫 조회 행의
+    API 잔액에서 구한 기초잔액(opening_balance)부터 누계합니다. (연도를 넘겨 누계를 잇지 않음)
+    정렬된 블록을 순서대로 apply() 하면 블록 경계를 넘어 누계가 이어집니다.
+
+    Args:
+        openings (dict): (회사코드, 계정과목, 연도 yyyy) -> 기초잔액 (없는 계정 / 연도는 0)
+    """
+
+    def __init__(self, openings=None):
+        self.balances = {f'{co_cd}|{acct_cd}|{year}': value for (co_cd, acct_cd, year), value in (openings or {}).items()}
+
+    def apply(self, df):
+        """정렬된 변환 DataFrame(또는 블록)의 잔액 컬럼을 누계로 바꾼 DataFrame 반환"""
+        if df.empty or not all(col in df.columns for col in ('회사코드', '계정과목', '승인일', '차변', '대변', '잔액')):
+            return df
+        # 승인일은 yyyy-mm-dd (또는 yyyymmdd) 문자열
+        key = (df['회사코드'].astype(str) + '|' + df['계정과목'].astype(str) + '|'
+               + df['승인일'].astype(str).str.slice(0, 4))
+        running = (df['차변'] - df['대변']).groupby(key, sort=False).cumsum()
+        balance = key.map(self.balances).fillna(0) + running
+        if pd.api.types.is_integer_dtype(df['잔액']) and (balance % 1 == 0).all():
+            balance = balance.astype('int64')
+        self.balances.update(balance.groupby(key, sort=False).last().to_dict())
+        return df.assign(잔액=balance)
@@ -0,0 +1,139 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from logger import logger
+
+
+class RateLimiter:
+    """
+    전역 초당 요청 수 제한기 (스레드 안전)
+
+    고정 sleep 대신 모든 워커가 하나의 슬롯 스케줄을 공유하므로,
+    동시에 몇 개의 계정/페이지를 조회하든 전체 호출 속도는 rate 이하로 유지됩니다.
+
+    Args:
+        rate (float): 초당 최대 요청 수. 0 이하이면 제한하지 않습니다.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def acquire(self):
+        """다음 요청 슬롯까지 대기"""
+        if not self.interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class AdaptiveRateController(RateLimiter):
+    """
+    AIMD 방식 API 호출 속도 / 동시성 제어기 (스레드 안전)
+
+    응답이 latency_limit 안에 정상으로 돌아오는 동안 초당 요청 수와 동시 요청 수를 조금씩 올리고(additive increase),
+    타임아웃 / 429 / 5xx 가 나면 곱셈으로 줄입니다(multiplicative decrease).
+    한 번의 과부하로 동시에 실패한 요청들이 연달아 줄이지 않도록 cooldown 동안은 한 번만 줄입니다.
+
+    사용법:
+        with controller.slot():        # 동시 요청 수 제한
+            controller.acquire()       # 요청 간격 (AmaranthApiClient 가 호출)
+            ...
+            controller.on_success(latency) / controller.on_overload(reason)
+
+    Args:
+        rate (float): 시작 초당 요청 수
+        min_rate (float): 최소 초당 요청 수
+        max_rate (float): 최대 초당 요청 수
+        concurrency (int): 시작 동시 요청 수
+        max_concurrency (int): 최대 동시 요청 수
+        increase (float): 정상 구간마다 올릴 초당 요청 수
+        decrease (float): 과부하 시 곱할 비율
+        latency_limit (float): 이 시간(초)을 넘는 응답은 증가 근거로 쓰지 않음
+        cooldown (float): 연속 감소 사이 최소 간격 (초)
+        log_interval (float): 현재 속도 로그 간격 (초)
+    """
+
+    def __init__(self, rate, min_rate=0.5, max_rate=20.0, concurrency=4, max_concurrency=32,
+                 increase=1.0, decrease=0.5, latency_limit=30.0, cooldown=2.0, log_interval=30.0):
+        super().__init__(rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.concurrency = concurrency
+        self.max_concurrency = max_concurrency
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_limit = latency_limit
+        self.cooldown = cooldown
+        self.log_interval = log_interval
+        self._in_flight = 0
+        self._healthy = 0
+        self._last_cut = 0.0
+        self._last_log = time.monotonic()
+        self._slots = threading.Condition(self._lock)
+        self._set_rate(rate or max_rate)  # 0 이하(무제한)이면 최대 속도에서 시작
+
+    def _set_rate(self, rate):
+        self.rate = min(self.max_rate, max(self.min_rate, rate))
+        self.interval = 1.0 / self.rate
+
+    @contextmanager
+    def slot(self):
+        """동시 요청 수 제한 (현재 concurrency 만큼만 동시에 진입)"""
+        with self._slots:
+            while self._in_flight >= self.concurrency:
+                self._slots.wait()
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._slots:
+                self._in_flight -= 1
+                self._slots.notify()
+
+    def on_success(self, latency):
+        """정상 응답: 현재 속도로 1초 분량이 연속 정상이면 속도 / 동시성 증가"""
+        with self._lock:
+            if latency > self.latency_limit:
+                self._healthy = 0
+                return
+            self._healthy += 1
+            if self._healthy < max(1, self.rate):
+                return
+            self._healthy = 0
+            self._set_rate(self.rate + self.increase)
+            if self.concurrency < self.max_concurrency:
+                self.concurrency += 1
+                self._slots.notify()
+        self._maybe_log()
+
+    def on_overload(self, reason):
+        """타임아웃 / 429 / 5xx: 속도와 동시성을 곱셈으로 감소"""
+        with self._lock:
+            now = time.monotonic()
+            self._healthy = 0
+            if now - self._last_cut < self.cooldown:
+                return
+            self._last_cut = now
+            self._set_rate(self.rate * self.decrease)
+            self.concurrency = max(1, int(self.concurrency * self.decrease))
+            rate, concurrency = self.rate, self.concurrency
+        logger.warning(f"🐢 API 과부하 감지 ({reason}) → {rate:.1f} req/s, 동시 {concurrency}개로 감소")
+
+    def _maybe_log(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_log < self.log_interval:
+                return
+            self._last_log = now
+            rate, concurrency = self.rate, self.concurrency
+        logger.info(f"🚦 API 호출 속도 {rate:.1f} req/s, 동시 {concurrency}개")
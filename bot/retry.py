@@ -0,0 +1,82 @@
+import random
+import threading
+import time
+
+from logger import logger
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """
+    지수 백오프 + 지터 대기 시간 (초)
+
+    attempt 번째 재시도의 상한 base * 2^attempt (최대 cap) 의 절반~전체 구간에서 무작위로 고릅니다.
+    여러 워커가 같은 순간에 실패해도 재시도가 한꺼번에 몰리지 않습니다.
+    """
+    ceiling = min(cap, base * (2 ** attempt))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+class CircuitBreaker:
+    """
+    연속 실패 기반 서킷 브레이커 (스레드 안전)
+
+    failure_threshold 번 연속으로 실패하면 열림(open) 상태가 되어 reset_timeout 동안 호출을 막습니다.
+    그 뒤에는 한 번의 시험 호출만 허용(half-open)하고, 성공하면 닫히고 실패하면 다시 열립니다.
+
+    Args:
+        failure_threshold (int): 열림 전환 연속 실패 횟수
+        reset_timeout (float): 열림 유지 시간 (초)
+    """
+
+    def __init__(self, failure_threshold=8, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def allow(self):
+        """호출 허용 여부 (열림 상태에서는 reset_timeout 이후 시험 호출 하나만 허용)"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._probing = True
+            return True
+
+    def retry_after(self):
+        """다음 시험 호출까지 남은 시간 (초)"""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self):
+        with self._lock:
+            was_open = self._opened_at is not None
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+        if was_open:
+            logger.info("🔌 API 서킷 복구 (호출 재개)")
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._opened_at is not None:
+                # 시험 호출 실패: 다시 reset_timeout 동안 차단
+                if self._probing:
+                    self._opened_at = time.monotonic()
+                    self._probing = False
+                return
+            if self._failures < self.failure_threshold:
+                return
+            self._opened_at = time.monotonic()
+            failures = self._failures
+        logger.error(f"🔌 API 연속 실패 {failures}회 → {self.reset_timeout:g}초간 호출 중단")
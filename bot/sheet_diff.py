@@ -0,0 +1,162 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from collections import Counter
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+from logger import logger
+
+# Above this many equal (old, new) row pairs, skip SequenceMatcher (repeated rows make it quadratic)
+MAX_MATCH_PAIRS = 5_000_000
+
+
+class SheetSnapshot:
+    """
+    Local copy of what was last written to a worksheet tab (header + data rows).
+
+    Stored as gzipped JSON under root, one file per spreadsheet + tab, so the next
+    upload can diff against it instead of rewriting the whole tab. A small
+    fingerprint file next to it holds the digests of the uploaded download.
+
+    Args:
+        root (str): Snapshot directory.
+        sheet (str): Spreadsheet key or URL.
+        tab (str): Worksheet title.
+    """
+
+    def __init__(self, root: str, sheet: str, tab: str):
+        name = hashlib.sha1(f'{sheet}|{tab}'.encode('utf-8')).hexdigest()[:16]
+        self.path = os.path.join(root, f'{name}.json.gz')
+        self.fingerprint_path = os.path.join(root, f'{name}.fingerprint.json')
+        self.sheet = sheet
+        self.tab = tab
+
+    def load(self, max_age_hours: float = None):
+        """
+        Returns (headers, rows) of the last upload, or None if missing, unreadable,
+        for another tab, or older than max_age_hours.
+        """
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('sheet') != self.sheet or data.get('tab') != self.tab:
+            return None
+        if max_age_hours is not None and time.time() - data.get('written_at', 0) > max_age_hours * 3600:
+            return None
+        return data['headers'], [tuple(row) for row in data['rows']]
+
+    def save(self, headers: list, rows: list):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=5) as f:
+            json.dump({'sheet': self.sheet, 'tab': self.tab, 'written_at': time.time(),
+                       'headers': [str(h) for h in headers], 'rows': [list(row) for row in rows]},
+                      f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def load_fingerprint(self, max_age_hours: float = None):
+        """
+        Returns {'file', 'content', 'uploaded_at'} digests of the last upload, or None if
+        missing, for another tab, or uploaded more than max_age_hours ago.
+        """
+        try:
+            with open(self.fingerprint_path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('sheet') != self.sheet or data.get('tab') != self.tab:
+            return None
+        if max_age_hours is not None and time.time() - data.get('uploaded_at', 0) > max_age_hours * 3600:
+            return None
+        return data
+
+    def save_fingerprint(self, file_digest: str, content_digest: str, uploaded_at: float = None):
+        os.makedirs(os.path.dirname(self.fingerprint_path) or '.', exist_ok=True)
+        tmp_path = f'{self.fingerprint_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'sheet': self.sheet, 'tab': self.tab, 'file': file_digest, 'content': content_digest,
+                       'uploaded_at': uploaded_at or time.time()}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.fingerprint_path)
+
+    def discard(self):
+        """Forgets the snapshot and fingerprint (the tab's state is unknown while an upload is in progress or after it fails)."""
+        for path in (self.path, self.fingerprint_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f'⚠️ Could not remove sheet snapshot {path}: {e}')
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def content_digest(df: pd.DataFrame, ignore_columns=()) -> str:
+    """
+    Order-insensitive SHA-256 of a table's content.
+
+    Covers the column names and the multiset of rows, leaving out ignore_columns
+    (e.g. an export timestamp), so a re-export with the same rows in another
+    order still matches.
+    """
+    columns = [c for c in df.columns if str(c) not in set(ignore_columns)]
+    digest = hashlib.sha256(json.dumps([str(c) for c in columns], ensure_ascii=False).encode('utf-8'))
+    row_hashes = pd.util.hash_pandas_object(df[columns], index=False).to_numpy(dtype=np.uint64)
+    digest.update(np.sort(row_hashes).tobytes())
+    return digest.hexdigest()
+
+
+def diff_row_ops(old_rows: list, new_rows: list) -> list:
+    """
+    Row operations turning old_rows into new_rows, ordered bottom-up.
+
+    Rows are matched with difflib.SequenceMatcher. A changed run is rewritten in
+    place, its surplus old rows are deleted and its extra new rows inserted.
+    Applying the operations in the returned order keeps every earlier row index
+    valid. Indexes are 0-based data row positions.
+
+    Returns:
+        list: ('update', start, rows), ('insert', start, rows) or ('delete', start, end) tuples.
+    """
+    # Unchanged head / tail rows are skipped before matching the rest
+    head = 0
+    limit = min(len(old_rows), len(new_rows))
+    while head < limit and old_rows[head] == new_rows[head]:
+        head += 1
+    tail = 0
+    while tail < limit - head and old_rows[len(old_rows) - 1 - tail] == new_rows[len(new_rows) - 1 - tail]:
+        tail += 1
+    old_mid, new_mid = old_rows[head:len(old_rows) - tail], new_rows[head:len(new_rows) - tail]
+
+    new_counts = Counter(new_mid)
+    if sum(new_counts.get(row, 0) for row in old_mid) > MAX_MATCH_PAIRS:
+        # Too many repeated rows to match cheaply: rewrite the middle positionally
+        opcodes = [('replace', 0, len(old_mid), 0, len(new_mid))]
+    else:
+        opcodes = SequenceMatcher(None, old_mid, new_mid, autojunk=False).get_opcodes()
+
+    ops = []
+    for tag, i1, i2, j1, j2 in reversed(opcodes):
+        i1, i2, j1, j2 = i1 + head, i2 + head, j1 + head, j2 + head
+        if tag == 'equal':
+            continue
+        common = min(i2 - i1, j2 - j1)
+        if i2 - i1 > common:
+            ops.append(('delete', i1 + common, i2))
+        if j2 - j1 > common:
+            ops.append(('insert', i1 + common, new_rows[j1 + common:j2]))
+        if common:
+            ops.append(('update', i1, new_rows[j1:j1 + common]))
+    return ops
@@ -1,8 +1,286 @@
 import gspread
-import pandas as pd
+import numbers
 import os
+import random
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
 from config import Config
 from logger import logger
+from bot.rate_limit import RateLimiter
+from bot.excel_reader import read_excel_file, to_sheet_strings
+from bot.sheets_client import get_sheets_client
+from bot.sheet_diff import SheetSnapshot, content_digest, diff_row_ops, file_digest
+
+# HTTP status codes worth retrying (quota exceeded / transient server errors)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Google Sheets serial dates count days from 1899-12-30
+SHEETS_EPOCH = datetime(1899, 12, 30)
+
+
+def grid_range(sheet_id: int, start_row: int = None, end_row: int = None,
+               start_col: int = None, end_col: int = None) -> dict:
+    """
+    Builds a zero-based, end-exclusive GridRange. Omitted bounds are unbounded.
+    """
+    grid = {'sheetId': sheet_id}
+    for key, value in (('startRowIndex', start_row), ('endRowIndex', end_row),
+                       ('startColumnIndex', start_col), ('endColumnIndex', end_col)):
+        if value is not None:
+            grid[key] = value
+    return grid
+
+def clear_values_request(sheet_id: int, **bounds) -> dict:
+    """batchUpdate request that clears cell values (not formats) in a range."""
+    return {
+        'updateCells': {
+            'range': grid_range(sheet_id, **bounds),
+            'fields': 'userEnteredValue'
+        }
+    }
+
+def string_rows_request(sheet_id: int, rows: list, start_row: int = 0, start_col: int = 0) -> dict:
+    """batchUpdate request that writes rows as plain strings (same as a RAW values update)."""
+    return {
+        'updateCells': {
+            'start': {'sheetId': sheet_id, 'rowIndex': start_row, 'columnIndex': start_col},
+            'rows': [
+                {'values': [{'userEnteredValue': {'stringValue': str(v)}} for v in row]}
+                for row in rows
+            ],
+            'fields': 'userEnteredValue'
+        }
+    }
+
+def value_rows_request(sheet_id: int, rows: list, start_row: int = 0, start_col: int = 0) -> dict:
+    """batchUpdate request that writes rows keeping numbers as numbers (NaN/None become blank strings)."""
+    def cell(v):
+        if isinstance(v, numbers.Number) and not isinstance(v, bool):
+            return {'numberValue': float(v)} if v == v else {'stringValue': ''}
+        return {'stringValue': '' if v is None else str(v)}
+
+    return {
+        'updateCells': {
+            'start': {'sheetId': sheet_id, 'rowIndex': start_row, 'columnIndex': start_col},
+            'rows': [{'values': [{'userEnteredValue': cell(v)} for v in row]} for row in rows],
+            'fields': 'userEnteredValue'
+        }
+    }
+
+def number_format_request(sheet_id: int, number_format: dict, **bounds) -> dict:
+    """batchUpdate request that applies a numberFormat to a range."""
+    return {
+        'repeatCell': {
+            'range': grid_range(sheet_id, **bounds),
+            'cell': {'userEnteredFormat': {'numberFormat': number_format}},
+            'fields': 'userEnteredFormat.numberFormat'
+        }
+    }
+
+def datetime_cell_request(sheet_id: int, row: int, col: int, value: datetime,
+                          pattern: str = 'yyyy-mm-dd hh:mm:ss') -> dict:
+    """
+    batchUpdate request that writes a real date-time cell, matching what a
+    USER_ENTERED 'yyyy-mm-dd hh:mm:ss' string would produce.
+    """
+    serial = (value - SHEETS_EPOCH).total_seconds() / 86400
+    return {
+        'updateCells': {
+            'start': {'sheetId': sheet_id, 'rowIndex': row, 'columnIndex': col},
+            'rows': [{'values': [{
+                'userEnteredValue': {'numberValue': serial},
+                'userEnteredFormat': {'numberFormat': {'type': 'DATE_TIME', 'pattern': pattern}}
+            }]}],
+            'fields': 'userEnteredValue,userEnteredFormat.numberFormat'
+        }
+    }
+
+def apply_batch_update(worksheet, requests: list) -> dict:
+    """
+    Sends batchUpdate requests for a worksheet and mirrors any append / insert /
+    delete dimension changes onto the handle, as gspread's resize() does, so a cached handle's
+    row_count / col_count stay current.
+    """
+    result = worksheet.spreadsheet.batch_update({'requests': requests})
+    grid = worksheet._properties.setdefault('gridProperties', {})
+    for request in requests:
+        if 'appendDimension' in request:
+            change = request['appendDimension']
+            dimension, length = change['dimension'], change['length']
+        elif 'insertDimension' in request or 'deleteDimension' in request:
+            change = request.get('insertDimension') or request['deleteDimension']
+            dimension = change['range']['dimension']
+            length = change['range']['endIndex'] - change['range']['startIndex']
+            if 'deleteDimension' in request:
+                length = -length
+            change = change['range']
+        else:
+            continue
+        if change.get('sheetId') == worksheet.id:
+            key = 'rowCount' if dimension == 'ROWS' else 'columnCount'
+            grid[key] = grid.get(key, 0) + length
+    return result
+
+def row_diff_requests(sheet_id: int, ops: list, header_rows: int = 1) -> list:
+    """batchUpdate requests applying diff_row_ops() operations below the header rows, in the given order."""
+    requests = []
+    for op in ops:
+        kind, start = op[0], header_rows + op[1]
+        if kind == 'delete':
+            end = header_rows + op[2]
+            requests.append({'deleteDimension': {'range': {'sheetId': sheet_id, 'dimension': 'ROWS',
+                                                           'startIndex': start, 'endIndex': end}}})
+        elif kind == 'insert':
+            requests.append({'insertDimension': {'range': {'sheetId': sheet_id, 'dimension': 'ROWS',
+                                                           'startIndex': start, 'endIndex': start + len(op[2])},
+                                                 'inheritFromBefore': True}})
+            requests.append(string_rows_request(sheet_id, op[2], start_row=start))
+        else:
+            requests.append(string_rows_request(sheet_id, op[2], start_row=start))
+    return requests
+
+def upload_row_diff(worksheet, old_rows: list, new_rows: list) -> bool:
+    """
+    Updates a tab that currently holds old_rows (below its header) to new_rows
+    with one batchUpdate carrying only the changed, inserted and deleted rows.
+
+    Returns:
+        bool: False if the delta is larger than Config.SHEETS_DIFF_MAX_CELLS
+        (nothing is sent; the caller should rewrite the tab instead).
+    """
+    ops = diff_row_ops(old_rows, new_rows)
+    if not ops:
+        logger.info('✅ No row changes since the last upload. Nothing to send.')
+        return True
+
+    counts = {'update': 0, 'insert': 0, 'delete': 0}
+    cells = 0
+    for op in ops:
+        rows = op[2] - op[1] if op[0] == 'delete' else len(op[2])
+        counts[op[0]] += rows
+        if op[0] != 'delete':
+            cells += sum(len(row) for row in op[2])
+    if cells > Config.SHEETS_DIFF_MAX_CELLS:
+        logger.info(f'📤 Delta of {cells} cells exceeds SHEETS_DIFF_MAX_CELLS, rewriting the tab instead.')
+        return False
+
+    apply_batch_update(worksheet, row_diff_requests(worksheet.id, ops))
+    logger.info(f'📤 Diff upload: {counts["update"]} updated, {counts["insert"]} inserted, '
+                f'{counts["delete"]} deleted rows ({len(new_rows) - counts["update"] - counts["insert"]} unchanged)')
+    return True
+
+def rewrite_worksheet(worksheet, data: list):
+    """
+    Writes header + rows in parallel row blocks, then clears whatever the
+    previous content left below and to the right (the tab is never blank).
+    """
+    RangeWriter(worksheet).write(data)
+    width = max(len(row) for row in data)
+    apply_batch_update(worksheet, [clear_values_request(worksheet.id, start_row=len(data)),
+                                   clear_values_request(worksheet.id, end_row=len(data), start_col=width)])
+
+class RangeWriter:
+    """
+    Writes large row sets to a worksheet in row blocks, several blocks at a time.
+
+    Each block is its own values update starting at column A, so a failure only
+    costs that block: it is retried with exponential backoff while the others
+    proceed. Requests are paced by a shared per-minute write quota.
+
+    Args:
+        worksheet (gspread.Worksheet): Target worksheet.
+        block_rows (int, optional): Rows per request. Defaults to Config.SHEETS_WRITE_BLOCK_ROWS.
+        max_workers (int, optional): Parallel requests. Defaults to Config.SHEETS_WRITE_WORKERS.
+        writes_per_minute (int, optional): Write quota. Defaults to Config.SHEETS_WRITES_PER_MINUTE.
+        max_retries (int): Retries per block before giving up.
+    """
+
+    def __init__(self, worksheet, block_rows: int = None, max_workers: int = None,
+                 writes_per_minute: int = None, max_retries: int = 4):
+        self.worksheet = worksheet
+        self.block_rows = block_rows or Config.SHEETS_WRITE_BLOCK_ROWS
+        self.max_workers = max_workers or Config.SHEETS_WRITE_WORKERS
+        self.max_retries = max_retries
+        self.rate_limiter = RateLimiter((writes_per_minute or Config.SHEETS_WRITES_PER_MINUTE) / 60)
+
+    def ensure_rows(self, total_rows: int):
+        """Grows the grid up front so parallel blocks never write past its end."""
+        if self.worksheet.row_count < total_rows:
+            self.worksheet.resize(rows=total_rows)
+
+    def write(self, rows: list, start_row: int = 1) -> int:
+        """
+        Writes rows starting at start_row (1-based).
+
+        Returns:
+            int: Number of rows written.
+        """
+        self.ensure_rows(start_row - 1 + len(rows))
+        blocks = (rows[i:i + self.block_rows] for i in range(0, len(rows), self.block_rows))
+        return self.write_blocks(blocks, start_row=start_row, total_rows=len(rows))
+
+    def write_blocks(self, blocks, start_row: int = 1, total_rows: int = None) -> int:
+        """
+        Writes an iterable of row blocks in order of their row offsets.
+
+        At most 2 x max_workers blocks are held in memory at once, so a lazy
+        block generator keeps memory bounded. Raises RuntimeError listing the
+        failed ranges if any block still fails after retries.
+        """
+        started = time.monotonic()
+        written = 0
+        failures = []
+        in_flight = set()
+
+        def collect(done):
+            nonlocal written
+            for future in done:
+                row, count, error = future.result()
+                if error:
+                    failures.append(f'A{row}:{count} rows ({error})')
+                else:
+                    written += count
+                    progress = f'{written}/{total_rows}' if total_rows else str(written)
+                    logger.debug(f'📤 {progress} rows written')
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            row = start_row
+            for block in blocks:
+                if not block:
+                    continue
+                if len(in_flight) >= self.max_workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                in_flight.add(executor.submit(self._write_block, row, block))
+                row += len(block)
+            done, _ = wait(in_flight)
+            collect(done)
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        logger.info(f'📤 Wrote {written} rows in {elapsed:.1f}s ({written / elapsed:,.0f} rows/s)')
+        if failures:
+            raise RuntimeError(f'{len(failures)} block(s) failed: {"; ".join(failures)}')
+        return written
+
+    def _write_block(self, row: int, block: list):
+        """Writes one block with retries. Returns (row, count, error message or None)."""
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            try:
+                self.worksheet.update(range_name=f'A{row}', values=block)
+                return row, len(block), None
+            except gspread.exceptions.APIError as e:
+                status = getattr(e.response, 'status_code', None)
+                if status not in RETRYABLE_STATUS or attempt == self.max_retries:
+                    return row, len(block), f'HTTP {status}: {e}'
+            except requests.exceptions.RequestException as e:
+                if attempt == self.max_retries:
+                    return row, len(block), str(e)
+            delay = min(2 ** attempt, 32) + random.uniform(0, 1)
+            logger.warning(f'⚠️ Block A{row} ({len(block)} rows) failed, retrying in {delay:.1f}s...')
+            time.sleep(delay)
 
 def upload_excel_to_sheet(excel_path: str, tab_name: str = None) -> bool:
     """
@@ -27,52 +305,46 @@ def upload_excel_to_sheet(excel_path: str, tab_name: str = None) -> bool:
             logger.warning(f'⚠️ Google Credentials file not found at: {Config.GOOGLE_CREDENTIALS_PATH}. Skipping upload.')
             return False
 
-        # 1. Read Excel
+        target_tab = tab_name if tab_name else Config.GOOGLE_SHEET_TAB
+        snapshot = SheetSnapshot(Config.SHEETS_SNAPSHOT_DIR, Config.GOOGLE_SHEET_URL, target_tab)
+
+        # Same bytes as the last upload to this tab: nothing to parse or send
+        fingerprint = snapshot.load_fingerprint(Config.SHEETS_SNAPSHOT_MAX_AGE_HOURS) if Config.SHEETS_SKIP_UNCHANGED else None
+        downloaded_digest = file_digest(excel_path)
+        if fingerprint is None and Config.SHEETS_SKIP_UNCHANGED:
+            logger.info(f'🗂️ No recent upload fingerprint for "{target_tab}" in {Config.SHEETS_SNAPSHOT_DIR}. Uploading without the change check.')
+        if fingerprint and fingerprint['file'] == downloaded_digest:
+            logger.info(f'⏭️ Download is identical to the last upload to "{target_tab}". Skipping parse and upload.')
+            return True
+
+        # 1. Read Excel (format sniffed from the file header, not the extension)
         logger.debug(f'Reading Excel file: {excel_path}')
-        df = None
         try:
-            # Try reading as standard Excel (xlsx/xls)
-            # engine='openpyxl' for xlsx, 'xlrd' for xls
-            if excel_path.endswith('.xlsx'):
-                df = pd.read_excel(excel_path, engine='openpyxl')
-            else:
-                # For .xls, try xlrd first
-                try:
-                    df = pd.read_excel(excel_path, engine='xlrd')
-                except Exception:
-                    # If xlrd fails, it might be an HTML file with .xls extension (common in ERPs)
-                    logger.warning('⚠️ Failed to read as standard XLS. Trying as HTML...')
-                    dfs = pd.read_html(excel_path)
-                    if dfs:
-                        df = dfs[0]  # Assume first table is the data
-                    else:
-                        raise ValueError('No tables found in HTML-based Excel file')
-
-            if df is None:
-                raise ValueError('DataFrame is empty after reading')
-
+            # Every column is uploaded, and the sheet keeps pandas' inferred-then-stringified text
+            # ('2025-11-12', '9005.0', HTML '1,000' -> '1000.0'), so no usecols / dtype=str here
+            df = read_excel_file(excel_path)
             # Convert all data to string to avoid JSON serialization issues with dates/NaNs
-            df = df.astype(str)
-            # Replace 'nan' strings with empty string
-            df = df.replace('nan', '')
+            df = to_sheet_strings(df)
         except Exception as read_error:
             logger.error(f'❌ Failed to read Excel file: {str(read_error)}')
             return False
 
+        # Same rows (any order, volatile columns ignored) as the last upload: nothing to send
+        rows_digest = content_digest(df, Config.SHEETS_VOLATILE_COLUMNS)
+        if fingerprint and fingerprint['content'] == rows_digest:
+            logger.info(f'⏭️ No content change since the last upload to "{target_tab}". Skipping upload.')
+            snapshot.save_fingerprint(downloaded_digest, rows_digest, uploaded_at=fingerprint['uploaded_at'])
+            return True
+
         # 2. Authenticate and Open Sheet
         logger.debug('Authenticating with Google...')
         try:
-            gc = gspread.service_account(filename=Config.GOOGLE_CREDENTIALS_PATH)
-            sh = gc.open_by_url(Config.GOOGLE_SHEET_URL)
+            # Shared client: one token exchange and one spreadsheet/tab lookup per process
+            sheets = get_sheets_client(Config.GOOGLE_CREDENTIALS_PATH)
+            sh = sheets.spreadsheet(url=Config.GOOGLE_SHEET_URL)
             
-            target_tab = tab_name if tab_name else Config.GOOGLE_SHEET_TAB
             logger.info(f'📑 Selecting Worksheet: {target_tab}')
-            
-            try:
-                worksheet = sh.worksheet(target_tab)
-            except gspread.WorksheetNotFound:
-                logger.warning(f'⚠️ Worksheet "{target_tab}" not found. Creating it...')
-                worksheet = sh.add_worksheet(title=target_tab, rows=1000, cols=26)
+            worksheet = sheets.worksheet(sh, target_tab)
                 
         except Exception as auth_error:
             logger.error(f'❌ Google Authentication/Sheet Open Failed: {str(auth_error)}')
@@ -80,13 +352,31 @@ def upload_excel_to_sheet(excel_path: str, tab_name: str = None) -> bool:
 
         # 3. Update Sheet
         logger.info(f'📤 Uploading {len(df)} rows to Google Sheets...')
-        
-        # Clear existing content
-        worksheet.clear()
-        
-        # Update with new data (headers + values)
-        data = [df.columns.values.tolist()] + df.values.tolist()
-        worksheet.update(range_name='A1', values=data)
+        headers = df.columns.values.tolist()
+        rows = [tuple(row) for row in df.values.tolist()]
+
+        # Diff against the snapshot of the last upload to this tab when it is recent and still fits the grid
+        previous = snapshot.load(Config.SHEETS_SNAPSHOT_MAX_AGE_HOURS) if Config.SHEETS_DIFF_UPLOAD else None
+        if previous is None and Config.SHEETS_DIFF_UPLOAD:
+            logger.info(f'🗂️ No recent snapshot of "{target_tab}" in {Config.SHEETS_SNAPSHOT_DIR}. Rewriting the whole tab.')
+        # The tab's state is unknown until the write finishes (failed or killed run): drop the stored copy first
+        snapshot.discard()
+        try:
+            diffed = (previous is not None
+                      and previous[0] == [str(h) for h in headers]
+                      and worksheet.row_count >= len(previous[1]) + 1
+                      and upload_row_diff(worksheet, previous[1], rows))
+            if not diffed:
+                # Update with new data (headers + values) in parallel row blocks
+                rewrite_worksheet(worksheet, [headers] + [list(row) for row in rows])
+        except Exception:
+            # The tab may have been deleted or resized elsewhere since its handle was cached: look it up again next time
+            sheets.forget(worksheet)
+            raise
+        if Config.SHEETS_DIFF_UPLOAD:
+            snapshot.save(headers, rows)
+        if Config.SHEETS_SKIP_UNCHANGED:
+            snapshot.save_fingerprint(downloaded_digest, rows_digest)
         
         logger.info('✅ Google Sheets Upload Completed Successfully!')
         return True
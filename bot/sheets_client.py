@@ -0,0 +1,150 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+import gspread
+from google.oauth2.service_account import Credentials
+from config import Config
+from logger import logger
+
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+]
+
+# Reuse a cached token only if it stays valid at least this long
+TOKEN_MIN_REMAINING = timedelta(minutes=5)
+
+
+class _PersistentCredentials(Credentials):
+    """Service account credentials that write each freshly issued access token to a cache file."""
+
+    token_cache_path = None
+
+    def refresh(self, request):
+        super().refresh(request)
+        if self.token_cache_path:
+            save_cached_token(self.token_cache_path, self)
+
+
+def load_cached_token(path: str, credentials: Credentials) -> bool:
+    """
+    Puts a still-valid access token from the cache file onto the credentials.
+
+    The token is only reused for the same service account and scopes. Returns
+    True if it was applied (no token exchange needed).
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            cached = json.load(f)
+        expiry = datetime.fromisoformat(cached['expiry'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+
+    if cached.get('client_email') != credentials.service_account_email:
+        return False
+    if sorted(cached.get('scopes') or []) != sorted(credentials.scopes or []):
+        return False
+    # google-auth compares naive UTC datetimes
+    if expiry - datetime.now(timezone.utc).replace(tzinfo=None) < TOKEN_MIN_REMAINING:
+        return False
+
+    credentials.token = cached['token']
+    credentials.expiry = expiry
+    return True
+
+def save_cached_token(path: str, credentials: Credentials):
+    """Writes the current access token and its expiry to the cache file (owner-only permissions)."""
+    if not credentials.token or not credentials.expiry:
+        return
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({
+                'client_email': credentials.service_account_email,
+                'scopes': list(credentials.scopes or []),
+                'token': credentials.token,
+                'expiry': credentials.expiry.isoformat()
+            }, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f'⚠️ Could not cache Google access token: {e}')
+
+
+class SheetsClient:
+    """
+    One authorized gspread client per service account, with cached handles.
+
+    Spreadsheets are opened once (open_by_key / open_by_url fetch metadata) and
+    worksheets are looked up once per title, so repeated uploads in the same
+    process reuse them. The access token is persisted to token_cache_path and
+    reused by later runs on the same machine until it is about to expire.
+
+    Args:
+        credentials_path (str): Service account JSON file.
+        token_cache_path (str, optional): Access token cache file. Defaults to Config.GOOGLE_TOKEN_CACHE_PATH.
+    """
+
+    def __init__(self, credentials_path: str, token_cache_path: str = None):
+        self.credentials_path = credentials_path
+        self.token_cache_path = token_cache_path or Config.GOOGLE_TOKEN_CACHE_PATH
+        self._client = None
+        self._spreadsheets = {}
+        self._worksheets = {}
+        self._lock = threading.RLock()
+
+    @property
+    def client(self) -> gspread.Client:
+        with self._lock:
+            if self._client is None:
+                credentials = _PersistentCredentials.from_service_account_file(self.credentials_path, scopes=SCOPES)
+                credentials.token_cache_path = self.token_cache_path
+                if self.token_cache_path and load_cached_token(self.token_cache_path, credentials):
+                    logger.debug('🔑 Reusing cached Google access token')
+                self._client = gspread.Client(auth=credentials)
+            return self._client
+
+    def spreadsheet(self, key: str = None, url: str = None) -> gspread.Spreadsheet:
+        """Opens a spreadsheet by key or URL once and returns the cached handle afterwards."""
+        cache_key = key or url
+        with self._lock:
+            if cache_key not in self._spreadsheets:
+                self._spreadsheets[cache_key] = self.client.open_by_key(key) if key else self.client.open_by_url(url)
+            return self._spreadsheets[cache_key]
+
+    def worksheet(self, spreadsheet: gspread.Spreadsheet, title: str, rows: int = 1000, cols: int = 26) -> gspread.Worksheet:
+        """Returns the cached worksheet handle for a title, creating the tab if it does not exist."""
+        cache_key = (spreadsheet.id, title)
+        with self._lock:
+            if cache_key not in self._worksheets:
+                try:
+                    self._worksheets[cache_key] = spreadsheet.worksheet(title)
+                except gspread.WorksheetNotFound:
+                    logger.warning(f'⚠️ Worksheet "{title}" not found. Creating it...')
+                    self._worksheets[cache_key] = spreadsheet.add_worksheet(title=title, rows=rows, cols=cols)
+            return self._worksheets[cache_key]
+
+    def forget(self, worksheet: gspread.Worksheet = None):
+        """Drops a cached worksheet handle (or every cached handle) so the next lookup refetches it."""
+        with self._lock:
+            if worksheet is None:
+                self._spreadsheets.clear()
+                self._worksheets.clear()
+            else:
+                self._worksheets.pop((worksheet.spreadsheet_id, worksheet.title), None)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_sheets_client(credentials_path: str = None) -> SheetsClient:
+    """Process-wide SheetsClient for a service account file (defaults to Config.GOOGLE_CREDENTIALS_PATH)."""
+    path = os.path.abspath(credentials_path or Config.GOOGLE_CREDENTIALS_PATH)
+    with _clients_lock:
+        if path not in _clients:
+            _clients[path] = SheetsClient(path)
+        return _clients[path]
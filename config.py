@@ -24,6 +24,21 @@ class Config:
     # Remove query params and fragments to get clean URL
     GOOGLE_SHEET_URL = _raw_url.split('?')[0].split('#')[0] if _raw_url else None
     GOOGLE_SHEET_TAB = os.getenv('GOOGLE_SHEET_TAB', 'Sheet1')
+    # Access token reused across runs on the same machine until it expires (CI runs start without it:
+    # schedule.yml only caches cache/sheet_snapshots, keeping the bearer token out of the Actions cache)
+    GOOGLE_TOKEN_CACHE_PATH = os.getenv('GOOGLE_TOKEN_CACHE_PATH', './cache/google_token.json')
+    # Diff uploads: send only changed / inserted / deleted rows against a local snapshot of the last upload
+    SHEETS_DIFF_UPLOAD = os.getenv('SHEETS_DIFF_UPLOAD', 'true').lower() == 'true'
+    SHEETS_SNAPSHOT_DIR = os.getenv('SHEETS_SNAPSHOT_DIR', './cache/sheet_snapshots')  # kept between CI runs by schedule.yml's cache step
+    SHEETS_SNAPSHOT_MAX_AGE_HOURS = float(os.getenv('SHEETS_SNAPSHOT_MAX_AGE_HOURS', '24'))  # full rewrite after this
+    SHEETS_DIFF_MAX_CELLS = int(os.getenv('SHEETS_DIFF_MAX_CELLS', '100000'))  # larger deltas are rewritten in full
+    # Skip the upload when the download matches the last upload to the tab (same bytes, or same rows in any order)
+    SHEETS_SKIP_UNCHANGED = os.getenv('SHEETS_SKIP_UNCHANGED', 'true').lower() == 'true'
+    SHEETS_VOLATILE_COLUMNS = [c.strip() for c in os.getenv('SHEETS_VOLATILE_COLUMNS', '').split(',') if c.strip()]
+    # Chunked range writes (rows per request, parallel requests, write quota per minute)
+    SHEETS_WRITE_BLOCK_ROWS = int(os.getenv('SHEETS_WRITE_BLOCK_ROWS', '5000'))
+    SHEETS_WRITE_WORKERS = int(os.getenv('SHEETS_WRITE_WORKERS', '4'))
+    SHEETS_WRITES_PER_MINUTE = int(os.getenv('SHEETS_WRITES_PER_MINUTE', '60'))
     
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
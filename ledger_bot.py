@@ -1,17 +1,25 @@
 import os
+import sys
 import time
-import hmac
-import hashlib
-import base64
-import random
-import string
-import json
 import requests
 import pandas as pd
-import gspread
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from google.oauth2.service_account import Credentials
 from logger import logger  # 기존 로거 사용
+from bot.rate_limit import AdaptiveRateController
+from bot.retry import CircuitBreaker, backoff_delay
+from bot.hedge import HedgedCaller
+from bot.amaranth_api import AmaranthApiClient, generate_transaction_id, generate_wehago_sign  # noqa: F401  (기존 import 경로 유지)
+from bot.ledger_cache import PartitionCache, RunCheckpoint, month_partitions, is_closed_month, plan_windows
+from bot.ledger_store import LedgerStore
+from bot.ledger_stream import SpillBuffer
+from bot.ledger_paging import AdaptivePageSizer
+from bot.ledger_transform import RunningBalance, opening_balance, transform_ledger_frame
+from bot.ledger_columns import LedgerColumns
+from bot.ledger_summary import LedgerSummary
+from bot.sheets_client import get_sheets_client
+from bot.sheets import (RangeWriter, apply_batch_update, clear_values_request, datetime_cell_request, number_format_request,
+                        string_rows_request, value_rows_request)
 
 # === 설정값 (보안을 위해 .env 관리를 권장합니다) ===
 CONFIG = {
@@ -20,12 +28,113 @@ CONFIG = {
     'accessToken': 'roifHrayJttms27ufGiqVa8grv6Sk0',
     'hashKey': '88761859188784596178355689527478836553536918',
     'proxyUrl': '/apiproxy/api11A30',
-    'amaranthUrl': 'https://portal.rapportlabs.kr',
+    'amaranthUrl': os.getenv('LEDGER_API_URL', 'https://portal.rapportlabs.kr'),  # 로컬 대역 서버: benchmarks/mock_amaranth.py
     'coCd': '1000',
     'sheetId': '1jcO4dHExbdwT6sZejj2Z22pycvZ6dRsyqPZ62zgUk-Y',
-    'sheetTabName': '계정별원장_RAW'
+    'sheetTabName': '계정별원장_RAW',
+    # 동시 조회 설정 (고정 sleep 대신 응답 상태에 따라 조정되는 전역 호출 속도로 제한)
+    'maxWorkers': int(os.getenv('LEDGER_MAX_WORKERS', '8')),        # 동시에 조회할 계정 수
+    'pageWorkers': int(os.getenv('LEDGER_PAGE_WORKERS', '4')),      # 계정당 동시에 조회할 페이지 수
+    'requestsPerSecond': float(os.getenv('LEDGER_RPS', '5')),       # 시작 API 호출 속도
+    'minRequestsPerSecond': float(os.getenv('LEDGER_MIN_RPS', '0.5')),  # 과부하 시 최저 속도
+    'maxRequestsPerSecond': float(os.getenv('LEDGER_MAX_RPS', '20')),   # 정상 시 최고 속도
+    # 페이지 재시도 / 서킷 브레이커 (일시 오류로 계정 전체가 빠지지 않도록)
+    'maxRetries': int(os.getenv('LEDGER_MAX_RETRIES', '4')),              # 페이지당 최대 재시도 횟수
+    'retryBaseDelay': float(os.getenv('LEDGER_RETRY_BASE_DELAY', '1')),   # 첫 재시도 대기 (초, 이후 2배씩)
+    'circuitFailures': int(os.getenv('LEDGER_CIRCUIT_FAILURES', '8')),    # 연속 실패 시 호출 중단
+    'circuitResetSeconds': float(os.getenv('LEDGER_CIRCUIT_RESET', '30')),  # 호출 중단 유지 시간 (초)
+    # 헤지 요청 (느린 응답이 최근 분위수를 넘으면 같은 요청을 한 번 더 보내 먼저 온 응답 사용)
+    'hedge': os.getenv('LEDGER_HEDGE', 'false').lower() == 'true',
+    'hedgePercentile': float(os.getenv('LEDGER_HEDGE_PERCENTILE', '0.95')),  # 헤지 기준 응답 시간 분위수
+    'hedgeMaxRatio': float(os.getenv('LEDGER_HEDGE_MAX_RATIO', '0.05')),     # 전체 요청 대비 추가 요청 상한
+    'http2': os.getenv('LEDGER_HTTP2', 'false').lower() == 'true',  # httpx[http2] 설치 시 HTTP/2 사용
+    # 월 파티션 캐시 설정 (마감월은 로컬 캐시 재사용, 당월은 매번 새로 조회)
+    'cacheDir': os.getenv('LEDGER_CACHE_DIR', './cache/ledger'),
+    'reopenDays': int(os.getenv('LEDGER_REOPEN_DAYS', '10')),           # 월말 이후 이 기간까지는 재조회
+    'refreshCache': os.getenv('LEDGER_REFRESH_CACHE', 'false').lower() == 'true',  # 마감월 강제 재조회
+    # 로컬 원장 저장소 (SQLite, ledger_query.py 로 조회)
+    'storePath': os.getenv('LEDGER_STORE_PATH', './cache/ledger.sqlite3'),
+    # 스트리밍 모드 (최대 메모리를 전체 행 수가 아닌 청크 크기로 제한)
+    'streamMode': os.getenv('LEDGER_STREAM', 'false').lower() == 'true',
+    'chunkRows': int(os.getenv('LEDGER_CHUNK_ROWS', '20000')),       # 시트 기록 / 임시 파일 블록 크기
+    'spillRows': int(os.getenv('LEDGER_SPILL_ROWS', '200000')),      # 메모리 보관 최대 행 수 (초과 시 임시 파일)
+    # 대용량 계정 조회 구간 분할 (월 파티션을 일 단위 구간으로 나눠 동시 조회)
+    'shardRows': int(os.getenv('LEDGER_SHARD_ROWS', '20000')),       # 구간당 목표 행 수 (이전 실행 행 수 기준)
+    'heavyAccounts': [a for a in os.getenv('LEDGER_HEAVY_ACCOUNTS', '8110000,8310000').split(',') if a],
+    'heavyShards': int(os.getenv('LEDGER_HEAVY_SHARDS', '4')),       # 행 수 정보가 없을 때 대용량 계정 분할 수
+    # 일괄 조회 모드 (월 파티션별로 여러 계정을 한 번에 조회한 뒤 acctCd 로 나눔, 미지원 시 계정별 조회)
+    'bulkMode': os.getenv('LEDGER_BULK', 'false').lower() == 'true',
+    'bulkAcctCd': os.getenv('LEDGER_BULK_ACCT_CD', ''),              # 일괄 조회 시 acctCd 값 (빈 값 = 전체 계정)
+    # 빈 계정 건너뛰기 (오래 비어 있던 계정은 재확인 주기마다만 조회, 상태는 ledger_query.py skiplist 로 확인)
+    'dormantDays': int(os.getenv('LEDGER_DORMANT_DAYS', '7')),       # 이 기간(일) 이상 데이터가 없으면 건너뛰기 대상
+    'recheckHours': float(os.getenv('LEDGER_RECHECK_HOURS', '24')),  # 건너뛰기 대상 계정 재확인 주기 (시간)
+    'fullRefresh': os.getenv('LEDGER_FULL_REFRESH', 'false').lower() == 'true',  # 건너뛰기 없이 전체 계정 조회
+    # 실행 체크포인트 (중간에 끊긴 실행은 다음 실행에서 완료된 파티션을 건너뛰고 이어서 조회)
+    'resume': os.getenv('LEDGER_RESUME', 'true').lower() == 'true',
+    'checkpointDir': os.getenv('LEDGER_CHECKPOINT_DIR', './cache/checkpoints'),
+    'checkpointMaxAge': float(os.getenv('LEDGER_CHECKPOINT_MAX_AGE', '2')),  # 첫 저장 후 이어서 조회할 최대 시간 (시간)
+    # 월별 요약 탭 (계정과목 / 사용부서 / 프로젝트별 월 합계)
+    'summaryTabs': os.getenv('LEDGER_SUMMARY_TABS', 'true').lower() == 'true'
 }
 
+def parse_companies(spec):
+    """
+    조회 대상 회사 목록 파싱
+
+    LEDGER_COMPANIES 형식: '회사코드[:사업장코드[:시트탭]]' 을 쉼표로 구분 (예: '1000,2000:2000|:계정별원장_RPST')
+    값이 없으면 coCd / sheetTabName 단일 회사, 사업장코드를 생략하면 '{회사코드}|',
+    시트탭을 생략한 추가 회사는 '{sheetTabName}_{회사코드}' 탭을 사용합니다.
+    """
+    companies = []
+    for i, entry in enumerate(e.strip() for e in spec.split(',') if e.strip()):
+        co_cd, _, rest = entry.partition(':')
+        div_cds, _, tab = rest.partition(':')
+        default_tab = CONFIG['sheetTabName'] if i == 0 else f"{CONFIG['sheetTabName']}_{co_cd}"
+        companies.append({'coCd': co_cd, 'divCds': div_cds or f'{co_cd}|', 'tabName': tab or default_tab})
+    return companies or [{'coCd': CONFIG['coCd'], 'divCds': '1000|', 'tabName': CONFIG['sheetTabName']}]
+
+# 여러 회사 동시 조회 (API 호출 속도 제어기는 공유, 회사별 탭 또는 회사코드 컬럼이 있는 통합 탭에 기록)
+CONFIG['companies'] = parse_companies(os.getenv('LEDGER_COMPANIES', ''))
+CONFIG['combinedTab'] = os.getenv('LEDGER_COMBINED_TAB', 'false').lower() == 'true'
+
+# 모든 워커가 공유하는 API 호출 속도 / 동시성 제어기 (정상 응답 시 증가, 타임아웃 / 429 / 5xx 시 감소)
+_rate_controller = AdaptiveRateController(
+    CONFIG['requestsPerSecond'],
+    min_rate=CONFIG['minRequestsPerSecond'],
+    max_rate=CONFIG['maxRequestsPerSecond'],
+    concurrency=CONFIG['maxWorkers'],
+    max_concurrency=CONFIG['maxWorkers'] * CONFIG['pageWorkers']
+)
+
+# 프록시 장애 시 호출을 잠시 멈추는 서킷 브레이커
+_circuit_breaker = CircuitBreaker(CONFIG['circuitFailures'], CONFIG['circuitResetSeconds'])
+
+# 느린 응답 헤지 실행기 (LEDGER_HEDGE=true 일 때만 사용)
+_hedger = HedgedCaller(
+    max_workers=CONFIG['maxWorkers'] * CONFIG['pageWorkers'] * 2,
+    percentile=CONFIG['hedgePercentile'],
+    max_extra_ratio=CONFIG['hedgeMaxRatio']
+) if CONFIG['hedge'] else None
+
+# 모든 워커가 공유하는 API 클라이언트 (keep-alive 커넥션 풀)
+api_client = AmaranthApiClient(
+    base_url=CONFIG['amaranthUrl'],
+    access_token=CONFIG['accessToken'],
+    hash_key=CONFIG['hashKey'],
+    caller_name=CONFIG['callerName'],
+    group_seq=CONFIG['groupSeq'],
+    pool_size=CONFIG['maxWorkers'] * CONFIG['pageWorkers'],
+    http2=CONFIG['http2'],
+    timeout=120,
+    rate_limiter=_rate_controller
+)
+
+# 마감월 파티션 캐시
+_partition_cache = PartitionCache(CONFIG['cacheDir'])
+
+# 응답 시간 기반 viewCount 조정기 (Apps Script 기본값 10만건이 상한)
+_page_sizer = AdaptivePageSizer(max_count=100000, timeout=120)
+
 # 판관비 계정과목 목록
 SGA_ACCOUNTS = [
     '8000000', '8010000', '8020000', '8020001', '8030000', '8040000', '8050000',
@@ -42,20 +151,6 @@ SGA_ACCOUNTS = [
     '8480003', '8490000', '8500000', '8510000'
 ]
 
-def generate_transaction_id(length=30):
-    """30자리 랜덤 문자열 생성"""
-    chars = string.ascii_lowercase + string.digits
-    return ''.join(random.choice(chars) for _ in range(length))
-
-def generate_wehago_sign(hash_key, value):
-    """Wehago 서명 생성 (HMAC-SHA256 -> Base64)"""
-    # Python의 hmac은 bytes 타입을 요구합니다.
-    key_bytes = hash_key.encode('utf-8')
-    value_bytes = value.encode('utf-8')
-    
-    signature = hmac.new(key_bytes, value_bytes, hashlib.sha256).digest()
-    return base64.b64encode(signature).decode('utf-8')
-
 def get_today_string():
     """오늘 날짜 yyyymmdd"""
     return datetime.now().strftime('%Y%m%d')
@@ -74,17 +169,7 @@ def convert_drcr_fg(fg):
     return fg
 
 def call_account_ledger_api(params):
-    """API 호출 함수"""
-    transaction_id = generate_transaction_id()
-    timestamp = str(int(time.time()))
-    url_path = CONFIG['proxyUrl']
-    
-    # 서명 생성 값: accessToken + transactionId + timestamp + url
-    sign_value = CONFIG['accessToken'] + transaction_id + timestamp + url_path
-    wehago_sign = generate_wehago_sign(CONFIG['hashKey'], sign_value)
-    
-    api_url = CONFIG['amaranthUrl'] + url_path
-    
+    """API 호출 함수 (재시도 가능한 실패는 retryable 표시, 서킷이 열려 있으면 호출하지 않음)"""
     request_body = {
         "header": {
             "groupSeq": CONFIG['groupSeq'],
@@ -103,155 +188,681 @@ def call_account_ledger_api(params):
         "viewCount": params.get('viewCount')
     }
     
-    headers = {
-        'callerName': CONFIG['callerName'],
-        'Authorization': 'Bearer ' + CONFIG['accessToken'],
-        'transaction-id': transaction_id,
-        'timestamp': timestamp,
-        'groupSeq': CONFIG['groupSeq'],
-        'wehago-sign': wehago_sign,
-        'Content-Type': 'application/json'
-    }
-    
-    try:
-        # timeout=120 (2분 - 대용량 데이터 대응)
-        response = requests.post(api_url, headers=headers, json=request_body, verify=True, timeout=120)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.Timeout:
-        logger.error(f"API Request Timeout (120s)")
-        return {"resultCode": -1, "resultMsg": "Timeout"}
-    except requests.exceptions.RequestException as e:
-        logger.error(f"API Request Failed: {e}")
-        return {"resultCode": -1, "resultMsg": str(e)}
+    if not _circuit_breaker.allow():
+        return {"resultCode": -1, "resultMsg": "Circuit open", "retryable": True, "circuitOpen": True}
+
+    with _rate_controller.slot():
+        started = time.monotonic()
+        try:
+            # timeout=120 (2분 - 대용량 데이터 대응)
+            # resultData.datas 는 도착하는 대로 점진 파싱 (응답 본문 전체를 메모리에 올리지 않음)
+            # 헤지 요청도 post 를 새로 호출하므로 transaction-id / 서명은 시도마다 새로 생성됩니다.
+            post = lambda: api_client.post(CONFIG['proxyUrl'], request_body, items_prefix='resultData.datas.item')
+            result = _hedger.call(post) if _hedger else post()
+        except requests.exceptions.Timeout:
+            _rate_controller.on_overload('timeout')
+            _circuit_breaker.record_failure()
+            logger.error(f"API Request Timeout ({api_client.timeout:g}s)")
+            return {"resultCode": -1, "resultMsg": "Timeout", "timeout": True, "retryable": True}
+        except requests.exceptions.RequestException as e:
+            status = getattr(e.response, 'status_code', None)
+            # 연결 실패 / 429 / 5xx 는 서버 과부하로 간주 (그 외 4xx 는 요청 자체의 문제라 재시도하지 않음)
+            retryable = status is None or status == 429 or status >= 500
+            if retryable:
+                _rate_controller.on_overload(status or type(e).__name__)
+                _circuit_breaker.record_failure()
+            else:
+                _circuit_breaker.record_success()
+            logger.error(f"API Request Failed: {e}")
+            return {"resultCode": -1, "resultMsg": str(e), "retryable": retryable}
+
+    _rate_controller.on_success(time.monotonic() - started)
+    _circuit_breaker.record_success()
+    return result
+
+def fetch_page(base_params, page, count=None):
+    """특정 계정의 단일 페이지 조회 (일시 오류는 지수 백오프로 maxRetries 회까지 재시도, 실패 결과에 attempts 기록)"""
+    params = base_params.copy()
+    params['viewPage'] = page
+    if count:
+        params['viewCount'] = count
+
+    for attempt in range(CONFIG['maxRetries'] + 1):
+        started = time.monotonic()
+        result = call_account_ledger_api(params)
+        if result.get('resultCode') == 0:
+            datas = (result.get('resultData') or {}).get('datas') or []
+            _page_sizer.observe(len(datas), time.monotonic() - started)
+            return result
+        if result.get('timeout'):
+            _page_sizer.observe_timeout(params['viewCount'])
+            # 더 작게 나눌 수 있으면 재시도하지 않음 (호출측에서 분할 재조회)
+            if _page_sizer.split(params['viewCount']):
+                return result
+        if not result.get('retryable') or attempt == CONFIG['maxRetries']:
+            break
+
+        delay = backoff_delay(attempt, CONFIG['retryBaseDelay'])
+        if result.get('circuitOpen'):
+            delay = max(delay, _circuit_breaker.retry_after())
+        logger.warning(f"🔁 {params.get('acctCd')} page {page} 재시도 {attempt + 1}/{CONFIG['maxRetries']} "
+                       f"({delay:.1f}초 후): {result.get('resultMsg')}")
+        time.sleep(delay)
+
+    result['attempts'] = attempt + 1
+    return result
+
+def _fetch_span(base_params, page, count):
+    """페이지 조회 (타임아웃 시 절반 크기의 두 페이지로 나눠 재조회)"""
+    result = fetch_page(base_params, page, count)
+    if result.get('timeout'):
+        half = _page_sizer.split(count)
+        if half:
+            logger.warning(f"⏱️ {base_params['acctCd']} page {page} (viewCount {count}) 타임아웃 → {half}건 단위로 나눠 재조회")
+            return _fetch_span(base_params, 2 * page - 1, half) + _fetch_span(base_params, 2 * page, half)
+
+    if result.get('resultCode') != 0:
+        raise RuntimeError(f"API Error for {base_params['acctCd']} (page {page}, {result.get('attempts', 1)}회 시도): "
+                           f"{result.get('resultMsg')}")
+    return (result.get('resultData') or {}).get('datas', []) or []
 
 def fetch_all_pages_for_account(base_params):
-    """특정 계정의 전체 페이지 데이터 수집"""
-    all_data = []
-    current_page = 1
-    total_page = 1
-    
-    while current_page <= total_page:
-        base_params['viewPage'] = current_page
-        result = call_account_ledger_api(base_params)
-        
-        if result.get('resultCode') != 0:
-            logger.error(f"API Error for {base_params['acctCd']}: {result.get('resultMsg')}")
-            return []
-            
-        result_data = result.get('resultData', {})
-        if not result_data:
-            return all_data
-            
-        total_page = result_data.get('totalPage', 1)
-        datas = result_data.get('datas', [])
-        
-        if datas:
-            all_data.extend(datas)
-            
-        current_page += 1
-        # API 과부하 방지를 위해 대기 (Apps Script와 동일: 200ms)
-        if current_page <= total_page:
-            time.sleep(0.2)
-            
+    """특정 계정의 전체 페이지 데이터 수집 (재시도 후에도 실패한 페이지가 있으면 RuntimeError)"""
+    # viewCount 는 관측된 응답 시간으로 선택
+    count = min(_page_sizer.page_count(), base_params.get('viewCount') or _page_sizer.max_count)
+
+    # 첫 페이지: 타임아웃 시 페이지 크기를 줄여 재시도
+    while True:
+        result = fetch_page(base_params, 1, count)
+        half = _page_sizer.split(count) if result.get('timeout') else None
+        if not half:
+            break
+        logger.warning(f"⏱️ {base_params['acctCd']} (viewCount {count}) 타임아웃 → {half}건으로 재시도")
+        count = half
+
+    if result.get('resultCode') != 0:
+        raise RuntimeError(f"API Error for {base_params['acctCd']} (page 1, {result.get('attempts', 1)}회 시도): "
+                           f"{result.get('resultMsg')}")
+
+    result_data = result.get('resultData', {})
+    if not result_data:
+        return []
+
+    all_data = list(result_data.get('datas', []) or [])
+    total_page = result_data.get('totalPage', 1)
+    if total_page <= 1:
+        return all_data
+
+    # 나머지 페이지 동시 조회 (결과는 페이지 순서대로 병합)
+    pages = {}
+    with ThreadPoolExecutor(max_workers=CONFIG['pageWorkers']) as executor:
+        futures = {executor.submit(_fetch_span, base_params, page, count): page for page in range(2, total_page + 1)}
+        for future in as_completed(futures):
+            pages[futures[future]] = future.result()
+
+    for page in sorted(pages):
+        all_data.extend(pages[page])
+
     return all_data
 
-def upload_to_google_sheet(data_list):
-    """데이터프레임을 구글 시트에 업로드"""
-    if not data_list:
-        logger.warning("업로드할 데이터가 없습니다.")
+def fetch_window(base_params, partition, window, cache=None):
+    """파티션의 조회 구간 하나 조회 (window 가 None 이면 cache(기본: 마감월 캐시)에서 읽음)
+
+    Returns:
+        tuple: (행 목록, 캐시 사용 여부)
+    """
+    params = base_params.copy()
+    if window is None:
+        cached = (cache or _partition_cache).load(params, partition['month'])
+        if cached is not None:
+            return cached, True
+        # 계획 이후 캐시가 사라졌거나 손상된 경우: 월 전체를 새로 조회
+        window = (partition['fillDtFrom'], partition['fillDtTo'])
+
+    params['fillDtFrom'], params['fillDtTo'] = window
+    return fetch_all_pages_for_account(params), False
+
+def _fill_nb_key(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+def stitch_windows(window_rows):
+    """구간별 조회 결과를 (fillDt, fillNb) 순서로 병합
+
+    Args:
+        window_rows (list): 구간 시작일 순서의 행 목록들
+    """
+    if len(window_rows) == 1:
+        return window_rows[0]
+    rows = [row for chunk in window_rows for row in chunk]
+    rows.sort(key=lambda row: (str(row.get('fillDt') or ''), _fill_nb_key(row.get('fillNb'))))
+    return rows
+
+def supports_bulk_query(base_params):
+    """일괄 조회 지원 여부 (bulkAcctCd 로 1건 조회해 행마다 acctCd 가 있으면 지원)"""
+    params = base_params.copy()
+    params['acctCd'] = CONFIG['bulkAcctCd']
+    result = fetch_page(params, 1, 1)
+    if result.get('resultCode') != 0:
+        return False
+    datas = (result.get('resultData') or {}).get('datas') or []
+    return bool(datas) and all(row.get('acctCd') for row in datas)
+
+def plan_fetch_units(base_params, accounts, partitions, estimates=None, bulk=False, checkpoint=None):
+    """계정 x 월 파티션 x 조회 구간 작업 계획 ({'index', 'acctCd', 'params', 'partition', 'window', 'cache'} 목록)"""
+    estimates = estimates or {}
+    account_params = {}
+    for acct_cd in accounts:
+        account_params[acct_cd] = base_params.copy()
+        account_params[acct_cd]['acctCd'] = acct_cd
+
+    # 파티션별 읽어 올 캐시 (체크포인트 우선, 마감월 캐시), 둘 다 없는 계정은 새로 조회
+    caches = {}
+    for partition in partitions:
+        for acct_cd in accounts:
+            params = account_params[acct_cd]
+            if checkpoint and checkpoint.exists(params, partition['month']):
+                caches[(acct_cd, partition['month'])] = checkpoint
+            elif partition['closed'] and not CONFIG['refreshCache'] and _partition_cache.exists(params, partition['month']):
+                caches[(acct_cd, partition['month'])] = _partition_cache
+    to_fetch = {
+        partition['month']: [acct_cd for acct_cd in accounts if (acct_cd, partition['month']) not in caches]
+        for partition in partitions
+    }
+
+    units = []
+    bulk_months = set()
+    # 일괄 조회: 파티션별로 새로 조회할 계정들을 bulkAcctCd 조회 하나로 묶음 ('accounts' 에 대상 계정)
+    if bulk:
+        bulk_params = base_params.copy()
+        bulk_params['acctCd'] = CONFIG['bulkAcctCd']
+        for partition in partitions:
+            targets = to_fetch[partition['month']]
+            if len(targets) < 2:
+                continue
+            bulk_months.add(partition['month'])
+            estimate = sum(estimates.get((acct_cd, partition['month']), 0) for acct_cd in targets)
+            for window in plan_windows(partition, estimate, target_rows=CONFIG['shardRows']):
+                units.append({'index': None, 'acctCd': bulk_params['acctCd'], 'accounts': targets,
+                              'params': bulk_params, 'partition': partition, 'window': window, 'cache': None})
+
+    # 이전 실행에서 shardRows 보다 많았던 파티션(estimates)과 대용량 계정은 일 단위 구간으로 나눠 동시 조회
+    for i, acct_cd in enumerate(accounts):
+        params = account_params[acct_cd]
+        min_parts = CONFIG['heavyShards'] if acct_cd in CONFIG['heavyAccounts'] else 1
+
+        for partition in partitions:
+            if acct_cd not in to_fetch[partition['month']]:
+                windows = [None]
+            elif partition['month'] in bulk_months:
+                continue
+            else:
+                windows = plan_windows(partition, estimates.get((acct_cd, partition['month'])),
+                                       target_rows=CONFIG['shardRows'], min_parts=min_parts)
+            for window in windows:
+                units.append({'index': i, 'acctCd': acct_cd, 'params': params, 'partition': partition,
+                              'window': window, 'cache': caches.get((acct_cd, partition['month']))})
+    return units
+
+# 필요한 컬럼 매핑 및 순서 정렬
+# GAS 코드의 headers 순서와 맞춤
+COLUMNS_MAP = {
+    'coCd': '회사코드', 'divCd': '사업장코드', 'acctCd': '계정과목', 'drcrFg': '차대구분',
+    'fillDt': '승인일', 'fillNb': '승인번호', 'rmkDc': '적요', 'trCd': '거래처코드',
+    'trNm': '거래처명', 'regNb': '사업자번호', 'drAm': '차변', 'crAm': '대변',
+    'restAm': '잔액', 'isuDt': '작성일', 'isuSq': '작성순번', 'dispSq': '화면순번',
+    'lnSq': '라인순번', 'ctDeptCd': '사용부서코드', 'ctDeptNm': '사용부서명',
+    'pjtCd': '프로젝트코드', 'pjtNm': '프로젝트명', 'ctEmpCd': '사용사원코드',
+    'ctEmpNm': '사용사원명'
+}
+NUMERIC_COLUMNS = ['승인번호', '차변', '대변', '잔액', '작성순번', '화면순번', '라인순번']
+SORT_COLUMNS = ['승인일', '승인번호']
+
+def prepare_ledger_frame(data_list):
+    """API 행 목록(또는 API 키 컬럼 DataFrame) -> 시트 업로드용 DataFrame (컬럼명 변경 / 포맷팅 / 숫자 변환)"""
+    df = data_list if isinstance(data_list, pd.DataFrame) else pd.DataFrame(data_list)
+
+    # 존재하는 컬럼만 선택하여 이름 변경
+    target_cols = [col for col in COLUMNS_MAP.keys() if col in df.columns]
+    df = df[target_cols].rename(columns=COLUMNS_MAP)
+
+    # 데이터 포맷팅 (컬럼 단위 벡터화: 차대구분 매핑 / 날짜 포맷 / 숫자 변환 / 반복 문자열 category)
+    return transform_ledger_frame(df, NUMERIC_COLUMNS)
+
+# 한 번의 batchUpdate 에 값까지 함께 보낼 최대 셀 수 (updateCells 는 셀당 JSON 이 커서 대용량은 values API 사용)
+INLINE_CELL_LIMIT = 50000
+
+# 컬럼별 표시 형식 (헤더명 기준)
+COLUMN_FORMATS = {
+    '승인일': {'type': 'DATE', 'pattern': 'yyyy-mm-dd'},
+    '작성일': {'type': 'DATE', 'pattern': 'yyyy-mm-dd'},
+    '거래처코드': {'type': 'TEXT'},     # 앞자리 0 보존
+    '사용부서코드': {'type': 'TEXT'}
+}
+
+def open_ledger_worksheet(rows=1000, tab_name=None):
+    """계정별원장 시트 탭 열기 (없으면 생성, tab_name 미지정 시 sheetTabName)
+
+    기존 내용은 지우지 않습니다. 새 데이터를 덮어쓴 뒤 finalize_ledger_sheet 가
+    남은 영역만 지우므로 시트가 비어 보이는 구간이 없습니다.
+    """
+    # 서비스 계정 인증 (공용 클라이언트: 토큰 / 스프레드시트 / 탭 핸들 재사용)
+    # service_account.json 파일이 같은 경로에 있어야 합니다.
+    sheets = get_sheets_client('service_account.json')
+    sh = sheets.spreadsheet(key=CONFIG['sheetId'])
+    return sheets.worksheet(sh, tab_name or CONFIG['sheetTabName'], rows=rows)
+
+def build_ledger_requests(sheet_id, headers, data_rows, update_time, values=None, grid_rows=None, grid_cols=None):
+    """
+    계정별원장 시트 마무리용 batchUpdate 요청 목록
+
+    (격자 확장) -> (values 가 있으면 헤더+데이터 기록) -> 이전 데이터 잔여 영역 삭제 -> 컬럼 형식 -> 업데이트 시간
+    updateCells 는 격자를 자동으로 늘리지 않으므로 grid_rows / grid_cols(현재 크기)가 부족하면 먼저 확장합니다.
+    """
+    requests_ = []
+    needed_rows = data_rows + 1 if values is not None else 2
+    needed_cols = len(headers) + 2
+    if grid_rows is not None and grid_rows < needed_rows:
+        requests_.append({'appendDimension': {'sheetId': sheet_id, 'dimension': 'ROWS', 'length': needed_rows - grid_rows}})
+    if grid_cols is not None and grid_cols < needed_cols:
+        requests_.append({'appendDimension': {'sheetId': sheet_id, 'dimension': 'COLUMNS', 'length': needed_cols - grid_cols}})
+
+    if values is not None:
+        requests_.append(string_rows_request(sheet_id, [headers] + values))
+
+    # 새 데이터 아래 행, 헤더 오른쪽 열의 이전 값 삭제 (업데이트 시간 칸은 아래에서 다시 기록)
+    requests_.append(clear_values_request(sheet_id, start_row=data_rows + 1))
+    requests_.append(clear_values_request(sheet_id, end_row=data_rows + 1, start_col=len(headers)))
+
+    if data_rows > 0:
+        for col_name, number_format in COLUMN_FORMATS.items():
+            if col_name in headers:
+                col = headers.index(col_name)
+                requests_.append(number_format_request(sheet_id, number_format, start_row=1, end_row=data_rows + 1,
+                                                       start_col=col, end_col=col + 1))
+
+    # 업데이트 시간 별도 표기 (헤더 옆)
+    stamp_col = len(headers) + 1
+    requests_.append(string_rows_request(sheet_id, [['업데이트']], start_row=0, start_col=stamp_col))
+    requests_.append(datetime_cell_request(sheet_id, 1, stamp_col, update_time))
+    return requests_
+
+def finalize_ledger_sheet(worksheet, headers, data_rows, values=None):
+    """잔여 영역 삭제 / 컬럼 형식 / 업데이트 시간(+작은 데이터는 값까지)을 한 번의 batchUpdate 로 처리"""
+    apply_batch_update(worksheet, build_ledger_requests(worksheet.id, headers, data_rows, datetime.now(), values,
+                                                       grid_rows=worksheet.row_count, grid_cols=worksheet.col_count))
+    if data_rows > 0:
+        logger.info("📋 컬럼 스타일 적용 완료 (승인일,작성일: 날짜 / 거래처코드,사용부서코드: 텍스트)")
+
+def new_ledger_summary(sort_columns):
+    """요약 집계 누적기 (정렬 기준 중 승인일 / 승인번호 앞의 컬럼은 요약에서도 기준으로 사용, 비활성 시 None)"""
+    if not CONFIG['summaryTabs']:
+        return None
+    return LedgerSummary(group_keys=[c for c in sort_columns if c not in SORT_COLUMNS])
+
+def summary_tab_name(tab_name, label):
+    """원장 탭 이름 -> 요약 탭 이름 (계정별원장_RAW -> 계정별원장_계정과목별_월합계)"""
+    base = tab_name[:-len('_RAW')] if tab_name.endswith('_RAW') else tab_name
+    return f'{base}_{label}별_월합계'
+
+def build_summary_requests(sheet_id, table, update_time, grid_rows=None, grid_cols=None):
+    """요약 탭 batchUpdate 요청 목록 (격자 확장 -> 전체 값 삭제 -> 숫자 값 기록 -> 금액 형식 -> 업데이트 시간)"""
+    headers = table.columns.tolist()
+    data_rows = len(table)
+    amount_start = sum(1 for col in headers if not pd.api.types.is_numeric_dtype(table[col]))  # 기준 컬럼 수
+    requests_ = []
+    if grid_rows is not None and grid_rows < data_rows + 1:
+        requests_.append({'appendDimension': {'sheetId': sheet_id, 'dimension': 'ROWS', 'length': data_rows + 1 - grid_rows}})
+    if grid_cols is not None and grid_cols < len(headers) + 2:
+        requests_.append({'appendDimension': {'sheetId': sheet_id, 'dimension': 'COLUMNS', 'length': len(headers) + 2 - grid_cols}})
+
+    requests_.append(clear_values_request(sheet_id))
+    requests_.append(value_rows_request(sheet_id, [headers] + table.values.tolist()))
+    if data_rows > 0:
+        requests_.append(number_format_request(sheet_id, {'type': 'NUMBER', 'pattern': '#,##0'}, start_row=1,
+                                               end_row=data_rows + 1, start_col=amount_start, end_col=len(headers)))
+    # 기준 코드 컬럼은 앞자리 0 보존
+    requests_.append(number_format_request(sheet_id, {'type': 'TEXT'}, start_row=1, end_row=data_rows + 1,
+                                           start_col=0, end_col=amount_start))
+
+    stamp_col = len(headers) + 1
+    requests_.append(string_rows_request(sheet_id, [['업데이트']], start_row=0, start_col=stamp_col))
+    requests_.append(datetime_cell_request(sheet_id, 1, stamp_col, update_time))
+    return requests_
+
+def upload_ledger_summaries(summary, tab_name=None):
+    """월별 요약 표를 원장 탭별 요약 탭에 기록 (탭마다 한 번의 batchUpdate)"""
+    if summary is None:
         return
+    tab_name = tab_name or CONFIG['sheetTabName']
+    try:
+        for label, table in summary.tables().items():
+            summary_tab = summary_tab_name(tab_name, label)
+            worksheet = open_ledger_worksheet(rows=len(table) + 1, tab_name=summary_tab)
+            apply_batch_update(worksheet, build_summary_requests(worksheet.id, table, datetime.now(),
+                                                                 grid_rows=worksheet.row_count, grid_cols=worksheet.col_count))
+            logger.info(f"🧮 요약 탭 업로드 완료: {summary_tab} ({len(table)}행)")
+    except Exception as e:
+        logger.error(f"❌ 요약 탭 업로드 실패: {e}")
+
+def upload_to_google_sheet(data_list, tab_name=None, sort_columns=SORT_COLUMNS, openings=None):
+    """데이터프레임을 구글 시트에 업로드 (data_list: API 행 목록 또는 LedgerColumns.to_frame() 결과)
+
+    잔액은 openings(계정 / 회계연도별 기초잔액)부터 정렬 순서대로 다시 누계합니다. (RunningBalance)
+    업로드에 실패하면 False 를 반환합니다.
+    """
+    if data_list is None or len(data_list) == 0:
+        logger.warning("업로드할 데이터가 없습니다.")
+        return True
 
     try:
         logger.info("📊 구글 시트 연결 중...")
-        
-        # 서비스 계정 인증
-        # service_account.json 파일이 같은 경로에 있어야 합니다.
-        gc = gspread.service_account(filename='service_account.json')
-        sh = gc.open_by_key(CONFIG['sheetId'])
-        
-        try:
-            worksheet = sh.worksheet(CONFIG['sheetTabName'])
-            worksheet.clear()
-        except gspread.WorksheetNotFound:
-            worksheet = sh.add_worksheet(title=CONFIG['sheetTabName'], rows=1000, cols=26)
-            
+        worksheet = open_ledger_worksheet(tab_name=tab_name)
+
         # Pandas로 데이터 가공
-        df = pd.DataFrame(data_list)
-        
-        # 필요한 컬럼 매핑 및 순서 정렬
-        # GAS 코드의 headers 순서와 맞춤
-        columns_map = {
-            'coCd': '회사코드', 'divCd': '사업장코드', 'acctCd': '계정과목', 'drcrFg': '차대구분',
-            'fillDt': '승인일', 'fillNb': '승인번호', 'rmkDc': '적요', 'trCd': '거래처코드',
-            'trNm': '거래처명', 'regNb': '사업자번호', 'drAm': '차변', 'crAm': '대변',
-            'restAm': '잔액', 'isuDt': '작성일', 'isuSq': '작성순번', 'dispSq': '화면순번',
-            'lnSq': '라인순번', 'ctDeptCd': '사용부서코드', 'ctDeptNm': '사용부서명',
-            'pjtCd': '프로젝트코드', 'pjtNm': '프로젝트명', 'ctEmpCd': '사용사원코드',
-            'ctEmpNm': '사용사원명'
-        }
-        
-        # 존재하는 컬럼만 선택하여 이름 변경
-        target_cols = [col for col in columns_map.keys() if col in df.columns]
-        df = df[target_cols].rename(columns=columns_map)
-        
-        # 데이터 포맷팅
-        if '차대구분' in df.columns:
-            df['차대구분'] = df['차대구분'].apply(convert_drcr_fg)
-        if '승인일' in df.columns:
-            df['승인일'] = df['승인일'].apply(format_date_str)
-        if '작성일' in df.columns:
-            df['작성일'] = df['작성일'].apply(format_date_str)
-            
-        # 숫자형 변환 (NaN -> 0)
-        numeric_cols = ['승인번호', '차변', '대변', '잔액', '작성순번', '화면순번', '라인순번']
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-
-        # 정렬 (승인일, 승인번호)
-        if '승인일' in df.columns and '승인번호' in df.columns:
-            df = df.sort_values(by=['승인일', '승인번호'])
-
-        # 업데이트 시간 컬럼 추가 (마지막 컬럼 뒤에)
-        update_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        df = prepare_ledger_frame(data_list)
+
+        # 정렬 (승인일, 승인번호 / 통합 탭은 회사코드 우선)
+        if all(col in df.columns for col in sort_columns):
+            df = df.sort_values(by=sort_columns)
+        df = RunningBalance(openings).apply(df)
+
         # 헤더 + 데이터 준비
         headers = df.columns.tolist()
         values = df.astype(str).values.tolist() # gspread 호환을 위해 string 변환
         
-        # 시트 업데이트
-        worksheet.update(range_name='A1', values=[headers] + values)
-        
-        # 컬럼별 스타일 적용
-        data_rows = len(values)
-        if data_rows > 0:
-            # E, N 컬럼: 날짜 형식 (승인일, 작성일)
-            worksheet.format(f'E2:E{data_rows + 1}', {'numberFormat': {'type': 'DATE', 'pattern': 'yyyy-mm-dd'}})
-            worksheet.format(f'N2:N{data_rows + 1}', {'numberFormat': {'type': 'DATE', 'pattern': 'yyyy-mm-dd'}})
-            
-            # H, R 컬럼: 텍스트 형식 (거래처코드, 사용부서코드 - 앞자리 0 보존)
-            worksheet.format(f'H2:H{data_rows + 1}', {'numberFormat': {'type': 'TEXT'}})
-            worksheet.format(f'R2:R{data_rows + 1}', {'numberFormat': {'type': 'TEXT'}})
-            
-            logger.info("📋 컬럼 스타일 적용 완료 (E,N: 날짜 / H,R: 텍스트)")
-        
-        # 업데이트 시간 별도 표기 (헤더 옆)
-        worksheet.update_cell(1, len(headers) + 2, "업데이트")
-        worksheet.update_cell(2, len(headers) + 2, update_time)
+        if (len(values) + 1) * len(headers) <= INLINE_CELL_LIMIT:
+            # 작은 데이터: 값 기록까지 한 번의 batchUpdate 로 처리
+            finalize_ledger_sheet(worksheet, headers, len(values), values=values)
+        else:
+            # 행 블록 단위 병렬 기록 후 형식 / 업데이트 시간을 한 번의 batchUpdate 로 처리
+            RangeWriter(worksheet).write([headers] + values)
+            finalize_ledger_sheet(worksheet, headers, len(values))
         
         logger.info(f"✅ 시트 업로드 완료: {len(values)}건")
+
+        # 월별 요약은 pandas 로 미리 집계하여 작은 탭에 기록 (원장 탭은 수식 없이 유지)
+        summary = new_ledger_summary(sort_columns)
+        if summary is not None:
+            summary.add(df)
+            upload_ledger_summaries(summary, tab_name)
+        return True
         
     except Exception as e:
         import traceback
         logger.error(f"❌ 시트 업로드 실패: {e}")
         logger.error(f"상세 오류: {traceback.format_exc()}")
+        return False
 
-def run_ledger_bot():
-    """메인 실행 함수"""
-    
-    base_params = {
-        'coCd': CONFIG['coCd'],
-        'divCds': '1000|',
+def upload_ledger_stream(buffer, tab_name=None, openings=None):
+    """스트리밍 버퍼를 블록 단위로 시트에 업로드 (전체 데이터를 한 번에 메모리에 올리지 않음)
+
+    잔액은 openings(계정 / 회계연도별 기초잔액)부터 정렬된 블록 순서대로 다시 누계합니다. (RunningBalance)
+    업로드에 실패하면 False 를 반환합니다.
+    """
+    if not len(buffer):
+        logger.warning("업로드할 데이터가 없습니다.")
+        return True
+
+    try:
+        logger.info("📊 구글 시트 연결 중...")
+        worksheet = open_ledger_worksheet(rows=len(buffer) + 1, tab_name=tab_name)
+        # 블록 단위 기록 전에 행 수를 미리 확보
+        if worksheet.row_count < len(buffer) + 1:
+            worksheet.resize(rows=len(buffer) + 1)
+
+        headers = buffer.columns
+        worksheet.update(range_name='A1', values=[headers])
+
+        # 정렬된 블록을 순서대로 받아 병렬 기록 (동시에 보관하는 블록 수는 제한됨, 요약은 블록별 부분 집계)
+        summary = new_ledger_summary(buffer.sort_by)
+        balance = RunningBalance(openings)
+
+        def blocks():
+            for block in buffer.iter_blocks():
+                block = balance.apply(block)
+                if summary is not None:
+                    summary.add(block)
+                yield block.astype(str).values.tolist() # gspread 호환을 위해 string 변환
+
+        written = RangeWriter(worksheet, block_rows=CONFIG['chunkRows']).write_blocks(blocks(), start_row=2, total_rows=len(buffer))
+
+        finalize_ledger_sheet(worksheet, headers, written)
+
+        logger.info(f"✅ 시트 업로드 완료: {written}건")
+        upload_ledger_summaries(summary, tab_name)
+        return True
+
+    except Exception as e:
+        import traceback
+        logger.error(f"❌ 시트 업로드 실패: {e}")
+        logger.error(f"상세 오류: {traceback.format_exc()}")
+        return False
+
+def sync_ledger_store(store, base_params, partition, rows):
+    """조회한 계정 x 월 파티션을 로컬 원장 저장소(SQLite)에 반영"""
+    try:
+        store.replace_range(base_params['coCd'], base_params['acctCd'], partition['fillDtFrom'],
+                            partition['fillDtTo'], rows)
+    except Exception as e:
+        logger.warning(f"⚠️ 로컬 원장 저장소 반영 실패 ({base_params['acctCd']} {partition['month']}): {e}")
+
+def save_partition(cache, base_params, partition, rows):
+    """조회한 계정 x 월 파티션을 마감월 캐시 / 체크포인트에 저장 (실패해도 수집은 계속)"""
+    try:
+        cache.save(base_params, partition['month'], rows)
+    except Exception as e:
+        logger.warning(f"⚠️ 파티션 캐시 저장 실패 ({base_params['acctCd']} {partition['month']}): {e}")
+
+def plan_account_skips(store, co_cd, accounts):
+    """오래 비어 있던 계정 중 재확인 시점이 아닌 계정 제외
+
+    Returns:
+        tuple: (조회할 계정 목록, 건너뛴 계정 목록)
+    """
+    if store is None or CONFIG['fullRefresh'] or CONFIG['refreshCache']:
+        return list(accounts), []
+    try:
+        status = {row['acctCd']: row['status'] for row in
+                  store.skip_list(co_cd, dormant_days=CONFIG['dormantDays'], recheck_hours=CONFIG['recheckHours'])}
+    except Exception as e:
+        logger.warning(f"⚠️ 빈 계정 목록 조회 실패: {e}")
+        return list(accounts), []
+    skipped = [acct_cd for acct_cd in accounts if status.get(acct_cd) == 'skip']
+    return [acct_cd for acct_cd in accounts if status.get(acct_cd) != 'skip'], skipped
+
+def collect_ledger(base_params, accounts, store=None, buffer=None, log_prefix=''):
+    """계정 x 월 파티션 단위 원장 수집 (buffer: 스트리밍 모드에서 여러 회사가 함께 쓰는 SpillBuffer)"""
+    total = len(accounts)
+    acct_index = {acct_cd: i for i, acct_cd in enumerate(accounts)}
+    # frame: 목록 모드 결과 (API 키 컬럼 DataFrame), buffer: 스트리밍 모드 SpillBuffer,
+    # openings: (회사코드, 계정과목, 연도) -> 기초잔액, failed: 실패 계정, checkpoint: 업로드 후 삭제할 체크포인트
+    summary = {'frame': None, 'buffer': None, 'openings': {}, 'count': 0, 'success': 0, 'empty': 0, 'cached': 0,
+               'failed': set(), 'checkpoint': None}
+    failed = summary['failed']
+    # 계정 / 회계연도별 기초잔액은 그 해 데이터가 있는 가장 이른 파티션의 첫 행에서 구함 (파티션별 restAm 은 업로드 시 누계로 재계산)
+    opening_months = {}
+
+    # 월 파티션 계획 (마감월은 캐시, 당월 및 재조회 기간 내 월은 새로 조회)
+    partitions = month_partitions(base_params['fillDtFrom'], base_params['fillDtTo'])
+    for partition in partitions:
+        partition['closed'] = is_closed_month(partition['month'], reopen_days=CONFIG['reopenDays'])
+    open_months = [p['month'] for p in partitions if not p['closed']]
+    logger.info(f"{log_prefix}📅 파티션 {len(partitions)}개 (새로 조회: {', '.join(open_months) or '없음'})")
+
+    # 행 목록(dict) 대신 필드별 배열로 누적 (스트리밍 모드가 아닐 때)
+    columns = LedgerColumns()
+    account_counts = {acct_cd: 0 for acct_cd in accounts}
+    pending = {acct_cd: len(partitions) for acct_cd in accounts}
+    # 스트리밍 모드: 계정의 모든 파티션이 성공할 때까지 변환한 파티션을 보관 (조회 중인 계정만큼만 메모리 사용)
+    held = {}
+
+    # 스트리밍 모드: 파티션 결과를 바로 변환하여 버퍼(메모리 상한 초과 시 임시 파일)로 흘려보냄
+    # (빈 SpillBuffer 는 len() == 0 이라 거짓으로 평가되므로 None 여부로 공유 버퍼를 판단)
+    stream_buffer = None
+    if CONFIG['streamMode']:
+        stream_buffer = buffer if buffer is not None else SpillBuffer(
+            list(COLUMNS_MAP.values()), SORT_COLUMNS, spill_rows=CONFIG['spillRows'], block_rows=CONFIG['chunkRows'])
+        summary['buffer'] = stream_buffer
+        logger.info(f"{log_prefix}🌊 스트리밍 모드 (메모리 상한 {CONFIG['spillRows']}행, 블록 {CONFIG['chunkRows']}행)")
+
+    estimates = {}
+    if store:
+        try:
+            estimates = store.partition_counts(base_params['coCd'])
+        except Exception as e:
+            logger.warning(f"{log_prefix}⚠️ 로컬 원장 저장소 행 수 조회 실패: {e}")
+
+    # 일괄 조회 모드: 지원 여부를 먼저 확인하고, 지원하지 않으면 계정별 조회로 대체
+    bulk = False
+    if CONFIG['bulkMode']:
+        bulk = supports_bulk_query(base_params)
+        if bulk:
+            logger.info(f"{log_prefix}📦 일괄 조회 모드 (파티션별로 여러 계정을 한 번에 조회)")
+        else:
+            logger.warning(f"{log_prefix}⚠️ 일괄 조회를 지원하지 않는 응답입니다. 계정별 조회로 진행합니다.")
+
+    # 실행 체크포인트 (같은 조회 조건 / 기간의 중단된 실행이 있으면 이어서 조회)
+    checkpoint = None
+    if CONFIG['resume']:
+        checkpoint = RunCheckpoint(CONFIG['checkpointDir'], base_params, max_age_hours=CONFIG['checkpointMaxAge'])
+        summary['checkpoint'] = checkpoint
+        expired = checkpoint.expire_stale()
+        if expired:
+            logger.info(f"{log_prefix}🗑️ 조회 기간이 바뀌었거나 {CONFIG['checkpointMaxAge']:g}시간이 지난 이전 체크포인트 {expired}개 삭제")
+        resumed = checkpoint.count()
+        if resumed:
+            logger.info(f"{log_prefix}♻️ 중단된 실행 이어서 조회 (체크포인트 파티션 {resumed}개)")
+
+    # 작업 계획 (대용량 파티션은 조회 구간으로 분할)
+    units = plan_fetch_units(base_params, accounts, partitions, estimates, bulk=bulk, checkpoint=checkpoint)
+    unit_counts = {}
+    for unit in units:
+        key = (unit['acctCd'], unit['partition']['month'])
+        unit_counts[key] = unit_counts.get(key, 0) + 1
+    sharded = sum(1 for n in unit_counts.values() if n > 1)
+    if sharded:
+        logger.info(f"{log_prefix}✂️ 구간 분할 파티션 {sharded}개 (작업 {len(units)}개)")
+
+    window_rows = {}   # (acctCd, month) -> {구간: 행 목록}
+    started = set()
+
+    def fetch_unit(unit):
+        if unit.get('accounts'):
+            if unit['partition']['month'] not in started:
+                started.add(unit['partition']['month'])
+                logger.info(f"{log_prefix}[일괄] {unit['partition']['month']} 조회 시작... ({len(unit['accounts'])}개 계정)")
+        elif unit['acctCd'] not in started:
+            started.add(unit['acctCd'])
+            logger.info(f"{log_prefix}[{unit['index']+1}/{total}] {unit['acctCd']} 조회 시작...") # 진행 상황 로그 추가
+        return fetch_window(unit['params'], unit['partition'], unit['window'], unit['cache'])
+
+    def finish_account_partition(acct_cd, partition, rows, from_cache):
+        """계정 x 월 파티션 하나 완료: 캐시 / 로컬 저장소 / 결과 반영 후 계정 진행 상황 로그"""
+        i = acct_index[acct_cd]
+        params = base_params.copy()
+        params['acctCd'] = acct_cd
+        if rows is None:
+            failed.add(acct_cd)
+            held.pop(acct_cd, None)
+        else:
+            if from_cache:
+                summary['cached'] += 1
+            else:
+                if partition['closed']:
+                    save_partition(_partition_cache, params, partition, rows)
+                if checkpoint and (not partition['closed'] or CONFIG['refreshCache']):
+                    # 마감월은 위 캐시에서 이어서 읽으므로 새로 조회하는 경우에만 체크포인트에도 저장
+                    save_partition(checkpoint, params, partition, rows)
+            account_counts[acct_cd] += len(rows)
+            year_key = (acct_cd, partition['month'][:4])
+            if rows and (year_key not in opening_months or partition['month'] < opening_months[year_key]):
+                opening_months[year_key] = partition['month']
+                summary['openings'][(base_params['coCd'],) + year_key] = opening_balance(rows)
+            if store:
+                sync_ledger_store(store, params, partition, rows)
+            if stream_buffer is not None:
+                if rows and acct_cd not in failed:
+                    held.setdefault(acct_cd, []).append(prepare_ledger_frame(rows))
+            else:
+                columns.extend(rows, key=(acct_cd, partition['month']))
+
+        pending[acct_cd] -= 1
+        if pending[acct_cd] > 0 or acct_cd in failed:
+            return
+
+        # 일부 월만 성공한 계정이 버퍼에 섞이지 않도록 계정 단위로 반영 (목록 모드와 같이 오류 계정은 제외)
+        for frame in held.pop(acct_cd, []):
+            stream_buffer.add(frame)
+
+        if store:
+            try:
+                store.record_account_check(base_params['coCd'], acct_cd, account_counts[acct_cd])
+            except Exception as e:
+                logger.warning(f"{log_prefix}⚠️ 계정 조회 기록 실패 ({acct_cd}): {e}")
+        if account_counts[acct_cd]:
+            logger.info(f"{log_prefix}[{i+1}/{total}] {acct_cd}: ✅ {account_counts[acct_cd]}건")
+            summary['success'] += 1
+        else:
+            logger.info(f"{log_prefix}[{i+1}/{total}] {acct_cd}: 데이터 없음") # 빈 것도 로그 출력
+            summary['empty'] += 1
+
+    # 작업 단위 동시 조회 (전체 호출 속도는 _rate_controller 로 제한)
+    with ThreadPoolExecutor(max_workers=CONFIG['maxWorkers']) as executor:
+        futures = {executor.submit(fetch_unit, unit): unit for unit in units}
+        for future in as_completed(futures):
+            unit = futures[future]
+            partition = unit['partition']
+            key = (unit['acctCd'], partition['month'])
+            label = '일괄' if unit.get('accounts') else f"{unit['index']+1}/{total}"
+            from_cache = False
+            try:
+                rows, from_cache = future.result()
+                window_rows.setdefault(key, {})[unit['window'] or ''] = rows
+            except Exception as e:
+                window_rows.setdefault(key, {})[unit['window'] or ''] = None
+                logger.error(f"{log_prefix}[{label}] {unit['acctCd']} ({partition['month']}): ❌ {e}")
+
+            # 파티션의 모든 구간이 끝나면 병합
+            parts = window_rows[key]
+            if len(parts) < unit_counts[key]:
+                continue
+            del window_rows[key]
+            rows = None
+            if all(chunk is not None for chunk in parts.values()):
+                rows = stitch_windows([parts[w] for w in sorted(parts)])
+
+            if not unit.get('accounts'):
+                finish_account_partition(unit['acctCd'], partition, rows, from_cache)
+                continue
+
+            # 일괄 조회 결과를 acctCd 별로 나눔 (대상 외 계정 행은 버림)
+            grouped = {acct_cd: [] for acct_cd in unit['accounts']}
+            for row in rows or []:
+                if row.get('acctCd') in grouped:
+                    grouped[row['acctCd']].append(row)
+            for acct_cd in unit['accounts']:
+                finish_account_partition(acct_cd, partition, grouped[acct_cd] if rows is not None else None, False)
+
+    # 계정 목록 / 월 순서대로 병합 (오류 계정은 제외)
+    if stream_buffer is None:
+        keys = [(acct_cd, partition['month']) for acct_cd in accounts if acct_cd not in failed for partition in partitions]
+        summary['frame'] = columns.to_frame(keys)
+    summary['count'] = len(summary['frame']) if stream_buffer is None else \
+        sum(count for acct_cd, count in account_counts.items() if acct_cd not in failed)
+
+    # 체크포인트는 시트 업로드가 끝난 뒤 삭제 (실패가 있으면 다음 실행에서 실패한 파티션만 조회)
+    if checkpoint and failed:
+        logger.info(f"{log_prefix}♻️ 체크포인트 유지: 다음 실행에서 실패한 파티션만 다시 조회합니다.")
+    return summary
+
+def build_base_params(company):
+    """회사별 조회 기본 파라미터"""
+    return {
+        'coCd': company['coCd'],
+        'divCds': company['divCds'],
         'fillDtFrom': '20250101',
         'fillDtTo': get_today_string(),
         'prtFg': '2',
@@ -259,43 +870,108 @@ def run_ledger_bot():
         'viewPage': 1,
         'viewCount': 100000  # Apps Script와 동일 (10만건)
     }
-    
-    logger.info(f"=== 판관비 계정별원장 조회 시작 ({base_params['fillDtFrom']} ~ {base_params['fillDtTo']}) ===")
-    
-    all_data = []
-    success_count = 0
-    empty_count = 0
-    
-    for i, acct_cd in enumerate(SGA_ACCOUNTS):
+
+def upload_ledger_result(result, tab_name, sort_columns=SORT_COLUMNS):
+    """수집 결과를 시트 탭에 업로드 (스트리밍 버퍼 또는 행 목록, 업로드 실패 시 False)"""
+    stream_buffer = result['buffer']
+    openings = result.get('openings')
+    if stream_buffer is not None:
         try:
-            logger.info(f"[{i+1}/{len(SGA_ACCOUNTS)}] {acct_cd} 조회 시작...") # 진행 상황 로그 추가
-            params = base_params.copy()
-            params['acctCd'] = acct_cd
-            
-            account_data = fetch_all_pages_for_account(params)
-            
-            if account_data:
-                all_data.extend(account_data)
-                logger.info(f"[{i+1}/{len(SGA_ACCOUNTS)}] {acct_cd}: ✅ {len(account_data)}건")
-                success_count += 1
-            else:
-                # logger.debug(f"[{i+1}/{len(SGA_ACCOUNTS)}] {acct_cd}: 데이터 없음")
-                logger.info(f"[{i+1}/{len(SGA_ACCOUNTS)}] {acct_cd}: 데이터 없음") # 빈 것도 로그 출력
-                empty_count += 1
-                
-            time.sleep(0.3)  # Apps Script와 동일 (300ms)
-            
-        except Exception as e:
-            logger.error(f"[{i+1}/{len(SGA_ACCOUNTS)}] {acct_cd}: ❌ {e}")
+            if len(stream_buffer):
+                if stream_buffer.spilled:
+                    logger.info(f"💽 임시 파일 분할 저장: {stream_buffer.spilled}개")
+                return upload_ledger_stream(stream_buffer, tab_name=tab_name, openings=openings)
+            logger.warning(f"⚠️ 조회된 데이터가 없어 시트({tab_name})를 업데이트하지 않았습니다.")
+        finally:
+            stream_buffer.close()
+    elif result['frame'] is not None and len(result['frame']):
+        return upload_to_google_sheet(result['frame'], tab_name=tab_name, sort_columns=sort_columns, openings=openings)
+    else:
+        logger.warning(f"⚠️ 조회된 데이터가 없어 시트({tab_name})를 업데이트하지 않았습니다.")
+    return True
+
+def clear_checkpoints(results):
+    """업로드가 끝난 회사들의 실행 체크포인트 삭제 (업로드 중 중단되면 다음 실행에서 체크포인트로 이어서 업로드)"""
+    for result in results:
+        if result.get('checkpoint'):
+            result['checkpoint'].clear()
+
+def run_ledger_bot():
+    """메인 실행 함수 (LEDGER_COMPANIES 회사 동시 조회, 실패 계정이 있으면 False)"""
+    companies = CONFIG['companies']
+    multi = len(companies) > 1
+    combined = CONFIG['combinedTab'] and multi
+    date_from, date_to = build_base_params(companies[0])['fillDtFrom'], get_today_string()
+
+    logger.info(f"=== 판관비 계정별원장 조회 시작 ({date_from} ~ {date_to}) ===")
+    if multi:
+        logger.info(f"🏢 회사 {len(companies)}개 동시 조회: {', '.join(c['coCd'] for c in companies)} "
+                    f"({'통합 탭 ' + CONFIG['sheetTabName'] if combined else '회사별 탭'})")
+
+    store = None
+    try:
+        store = LedgerStore(CONFIG['storePath'])
+    except Exception as e:
+        logger.warning(f"⚠️ 로컬 원장 저장소를 열 수 없습니다: {e}")
+
+    # 통합 탭 + 스트리밍 모드: 모든 회사가 하나의 버퍼를 공유 (회사코드 우선 정렬)
+    combined_sort = ['회사코드'] + SORT_COLUMNS
+    shared_buffer = None
+    if combined and CONFIG['streamMode']:
+        shared_buffer = SpillBuffer(list(COLUMNS_MAP.values()), combined_sort,
+                                    spill_rows=CONFIG['spillRows'], block_rows=CONFIG['chunkRows'])
+
+    def run_company(company):
+        base_params = build_base_params(company)
+        log_prefix = f"[{company['coCd']}] " if multi else ''
+
+        # 오래 비어 있던 계정은 재확인 주기마다만 조회
+        accounts, skipped = plan_account_skips(store, base_params['coCd'], SGA_ACCOUNTS)
+        if skipped:
+            logger.info(f"{log_prefix}💤 빈 계정 {len(skipped)}개 건너뜀 ({CONFIG['recheckHours']:g}시간마다 재확인, LEDGER_FULL_REFRESH=true 로 전체 조회)")
+        return collect_ledger(base_params, accounts, store, buffer=shared_buffer, log_prefix=log_prefix)
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(companies)) as executor:
+            results = list(executor.map(run_company, companies))
+    finally:
+        if store:
+            store.close()
 
     logger.info(f"\n=== 조회 완료 ===")
-    logger.info(f"총 데이터: {len(all_data)}건 (유효 계정: {success_count}개)")
-    
-    if all_data:
-        upload_to_google_sheet(all_data)
-    else:
-        logger.warning("⚠️ 조회된 데이터가 없어 시트를 업데이트하지 않았습니다.")
+    for company, result in zip(companies, results):
+        prefix = f"[{company['coCd']}] " if multi else ''
+        logger.info(f"{prefix}총 데이터: {result['count']}건 (유효 계정: {result['success']}개, 캐시 파티션: {result['cached']}개)")
+        if result['failed']:
+            logger.error(f"{prefix}❌ 조회 실패 계정 ({len(result['failed'])}개): {', '.join(sorted(result['failed']))}")
+    if _hedger and _hedger.hedges:
+        logger.info(f"🪁 헤지 요청 {_hedger.hedges}회 (전체 {_hedger.calls}회 중, 헤지 응답 사용 {_hedger.hedge_wins}회)")
 
-if __name__ == "__main__":
-    run_ledger_bot()
+    # 실패 계정이 있는 회사는 탭을 덮어쓰지 않음 (빠진 계정이 빈 계정처럼 보이지 않도록 이전 데이터 유지, 체크포인트는 남겨 다음 실행에서 이어서 조회)
+    failed_companies = [company['coCd'] for company, result in zip(companies, results) if result['failed']]
+    if combined:
+        if failed_companies:
+            logger.error(f"❌ 조회 실패 계정이 있어 통합 탭({CONFIG['sheetTabName']})을 업데이트하지 않았습니다.")
+            if shared_buffer is not None:
+                shared_buffer.close()
+            return False
+        frame = None if shared_buffer is not None else pd.concat([result['frame'] for result in results], ignore_index=True)
+        openings = {key: value for result in results for key, value in result['openings'].items()}
+        if upload_ledger_result({'buffer': shared_buffer, 'frame': frame, 'openings': openings}, CONFIG['sheetTabName'],
+                                sort_columns=combined_sort):
+            clear_checkpoints(results)
+        return True
 
+    for company, result in zip(companies, results):
+        if result['failed']:
+            logger.error(f"❌ 조회 실패 계정이 있어 시트({company['tabName']})를 업데이트하지 않았습니다.")
+            if result['buffer'] is not None:
+                result['buffer'].close()
+            continue
+        if upload_ledger_result(result, company['tabName']):
+            clear_checkpoints([result])
+    return not failed_companies
+
+if __name__ == "__main__":
+    # 조회 실패 계정이 있으면 0이 아닌 종료 코드 (스케줄 실행에서 실패로 표시)
+    sys.exit(0 if run_ledger_bot() else 1)
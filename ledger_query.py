@@ -0,0 +1,76 @@
+"""
+계정별원장 로컬 저장소 조회 CLI
+
+ledger_bot.py 실행 시 쌓이는 SQLite 저장소(LEDGER_STORE_PATH)를 조회합니다.
+
+사용 예:
+    python ledger_query.py totals --by acct,month --from 20250101 --to 20250630
+    python ledger_query.py totals --by dept --acct 8110000
+    python ledger_query.py vendor 쿠팡
+    python ledger_query.py skiplist --co 1000
+"""
+
+import argparse
+import os
+
+import pandas as pd
+
+from bot.ledger_store import LedgerStore, GROUP_COLUMNS
+
+
+def main():
+    parser = argparse.ArgumentParser(description='계정별원장 로컬 저장소 조회')
+    parser.add_argument('--db', default=os.getenv('LEDGER_STORE_PATH', './cache/ledger.sqlite3'),
+                        help='SQLite 저장소 경로')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    totals_parser = subparsers.add_parser('totals', help='기준별 차변/대변 합계')
+    totals_parser.add_argument('--by', default='acct,month',
+                               help=f"집계 기준 (쉼표 구분: {', '.join(GROUP_COLUMNS)})")
+    totals_parser.add_argument('--from', dest='date_from', help='승인일 시작 (yyyymmdd)')
+    totals_parser.add_argument('--to', dest='date_to', help='승인일 종료 (yyyymmdd)')
+    totals_parser.add_argument('--acct', help='계정과목 코드')
+    totals_parser.add_argument('--co', help='회사코드')
+
+    vendor_parser = subparsers.add_parser('vendor', help='거래처별 전표 라인 조회')
+    vendor_parser.add_argument('vendor', help='거래처코드 또는 거래처명 일부')
+    vendor_parser.add_argument('--from', dest='date_from', help='승인일 시작 (yyyymmdd)')
+    vendor_parser.add_argument('--to', dest='date_to', help='승인일 종료 (yyyymmdd)')
+    vendor_parser.add_argument('--co', help='회사코드')
+
+    skip_parser = subparsers.add_parser('skiplist', help='빈 계정 건너뛰기 상태')
+    skip_parser.add_argument('--co', help='회사코드')
+    skip_parser.add_argument('--dormant-days', type=int, default=int(os.getenv('LEDGER_DORMANT_DAYS', '7')),
+                             help='이 기간(일) 이상 데이터가 없으면 건너뛰기 대상')
+    skip_parser.add_argument('--recheck-hours', type=float, default=float(os.getenv('LEDGER_RECHECK_HOURS', '24')),
+                             help='건너뛰기 대상 계정 재확인 주기 (시간)')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        parser.error(f'저장소 파일이 없습니다: {args.db} (ledger_bot.py를 먼저 실행하세요)')
+
+    store = LedgerStore(args.db)
+    try:
+        if args.command == 'totals':
+            by = [b.strip() for b in args.by.split(',') if b.strip()]
+            rows = store.totals(by=by, fill_dt_from=args.date_from, fill_dt_to=args.date_to,
+                                acct_cd=args.acct, co_cd=args.co)
+        elif args.command == 'skiplist':
+            rows = store.skip_list(co_cd=args.co, dormant_days=args.dormant_days, recheck_hours=args.recheck_hours)
+        else:
+            rows = store.vendor_rows(args.vendor, fill_dt_from=args.date_from, fill_dt_to=args.date_to,
+                                     co_cd=args.co)
+    finally:
+        store.close()
+
+    if not rows:
+        print('조회 결과가 없습니다.')
+        return
+
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        print(pd.DataFrame(rows).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modules import each other from the repository root (from logger import logger, from bot.x import ...)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
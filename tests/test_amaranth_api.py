@@ -0,0 +1,97 @@
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+import requests
+from urllib3.response import HTTPResponse
+
+from bot.amaranth_api import AmaranthApiClient, _iter_items, _requests_response
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+ITEMS = 'resultData.datas.item'
+LEDGER_RESPONSE = {
+    'resultCode': 0,
+    'resultMsg': 'SUCCESS',
+    'resultData': {
+        'datas': [
+            {'acctCd': '8110000', 'drAm': 1000, 'restAm': 1000.5, 'tags': ['a', {'b': None}]},
+            {'acctCd': '8110000', 'drAm': 0, 'restAm': None, 'tags': []}
+        ],
+        'totalPage': 3
+    }
+}
+
+
+def fake_session(body, status_code=200):
+    """requests.Session stand-in returning one streamed response, like the proxy does."""
+    def post(url, headers=None, json=None, verify=True, timeout=None, stream=False):
+        response = requests.Response()
+        response.status_code = status_code
+        response.url = url
+        response.raw = HTTPResponse(body=io.BytesIO(body), status=status_code, preload_content=False)
+        return response
+    return SimpleNamespace(post=post, close=lambda: None)
+
+
+@pytest.fixture
+def client():
+    return AmaranthApiClient('https://example.test', 'token', 'hash-key', 'caller', 'group')
+
+
+def test_http2_error_response_keeps_status_code():
+    response = SimpleNamespace(status_code=401, reason_phrase='Unauthorized', headers={'Content-Type': 'application/json'},
+                               url='https://example.test/apiproxy/api11A30', content=b'{"resultCode": -1}')
+    error = requests.exceptions.HTTPError('401 Unauthorized', response=_requests_response(response))
+
+    # call_account_ledger_api reads the status from e.response to decide whether to retry
+    assert getattr(error.response, 'status_code', None) == 401
+    assert error.response.headers['content-type'] == 'application/json'
+    assert error.response.json() == {'resultCode': -1}
+
+
+@pytest.mark.skipif(ijson is None, reason='ijson is not installed')
+def test_iter_items_streams_items_and_fills_meta():
+    # totalPage after the array: meta is only complete once the items are consumed
+    body = b'{"resultData": {"datas": [{"acctCd": "1", "n": [1, 2]}, {"acctCd": "2"}], "totalPage": 2}, "resultCode": 0}'
+    meta = {}
+    items = _iter_items(ijson.parse(io.BytesIO(body), use_float=True), ITEMS, meta)
+
+    assert next(items) == {'acctCd': '1', 'n': [1, 2]}
+    assert list(items) == [{'acctCd': '2'}]
+    assert meta == {'resultData': {'totalPage': 2}, 'resultCode': 0}
+
+
+def test_post_with_items_prefix_matches_plain_decoding(client):
+    body = json.dumps(LEDGER_RESPONSE).encode()
+    client._session = fake_session(body)
+
+    assert client.post('/apiproxy/api11A30', {}, items_prefix=ITEMS) == LEDGER_RESPONSE
+
+
+def test_post_with_null_result_data(client):
+    body = b'{"resultCode": -1, "resultMsg": "invalid acctCd", "resultData": null}'
+    client._session = fake_session(body)
+
+    assert client.post('/apiproxy/api11A30', {}, items_prefix=ITEMS) == {
+        'resultCode': -1, 'resultMsg': 'invalid acctCd', 'resultData': None
+    }
+
+
+def test_post_with_items_prefix_raises_http_errors(client):
+    client._session = fake_session(b'<html>Service Unavailable</html>', status_code=503)
+
+    with pytest.raises(requests.exceptions.HTTPError) as error:
+        client.post('/apiproxy/api11A30', {}, items_prefix=ITEMS)
+    assert error.value.response.status_code == 503
+
+
+def test_post_with_items_prefix_rejects_truncated_json(client):
+    client._session = fake_session(b'{"resultCode": 0, "resultData": {"datas": [{"acctCd": "1"}')
+
+    with pytest.raises(requests.exceptions.RequestException, match='Invalid JSON response'):
+        client.post('/apiproxy/api11A30', {}, items_prefix=ITEMS)
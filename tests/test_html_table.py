@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+from bot.html_table import iter_html_table_rows, read_html_table
+
+CASES = {
+    'plain_td_header': '<table><tr><td>a</td><td>b</td></tr><tr><td>1,234</td><td>x</td></tr>'
+                       '<tr><td>2</td><td></td></tr></table>',
+    'th_header': '<table><tr><th>코드</th><th>금액</th><th>날짜</th></tr>'
+                 '<tr><td>001</td><td>1.50</td><td>2025-01-01</td></tr>'
+                 '<tr><td>002</td><td></td><td>2025-01-02</td></tr></table>',
+    'thead_tbody_tfoot': '<table><thead><tr><th>a</th><th>b</th></tr></thead>'
+                         '<tfoot><tr><td>합계</td><td>3</td></tr></tfoot>'
+                         '<tbody><tr><th>x</th><th>y</th></tr><tr><td>1</td><td>2</td></tr></tbody></table>',
+    'spans': '<table><tr><th colspan="2">그룹</th><th rowspan="2">c</th></tr><tr><th>a</th><th>b</th></tr>'
+             '<tr><td rowspan="3">1</td><td>2</td><td>3</td></tr><tr><td>4</td><td>5</td></tr></table>',
+    'hidden_rows_and_tables': '<p>title</p><table></table>'
+                              '<table style="display: none"><tr><td>hid</td></tr></table>'
+                              '<table><tr><td>k</td><td>v</td></tr><tr><td>1</td><td>  a \n b  </td></tr>'
+                              '<tr style="display:none"><td>9</td><td>9</td></tr>'
+                              '<tr><td>2</td><td>x<span style="display:none">hidden</span>y<br/>z</td></tr></table>'
+                              '<table><tr><td>second</td></tr></table>',
+    'nested': '<table><tr><td>a</td><td>b</td></tr>'
+              '<tr><td>1</td><td><table><tr><td>in</td></tr></table>after</td></tr></table>',
+    'ragged_nan': '<table><tr><th>a</th><th>b</th><th>c</th></tr><tr><td>NA</td><td>nan</td></tr>'
+                  '<tr><td>True</td><td>1e3</td><td>-5</td></tr></table>',
+}
+
+
+def write_html(tmp_path, name, html, encoding='utf-8'):
+    path = tmp_path / f'{name}.xls'
+    path.write_bytes(html.encode(encoding))
+    return str(path)
+
+
+@pytest.mark.parametrize('name', sorted(CASES))
+def test_matches_read_html(tmp_path, name):
+    path = write_html(tmp_path, name, CASES[name])
+    pd.testing.assert_frame_equal(read_html_table(path), pd.read_html(path)[0])
+
+
+def test_declared_encoding_matches_read_html(tmp_path):
+    html = ('<html><head><meta http-equiv="Content-Type" content="text/html; charset=euc-kr"></head>'
+            '<body><table><tr><th>거래처명</th><th>금액</th></tr>'
+            '<tr><td>주식회사 가나다</td><td>1,000</td></tr></table></body></html>')
+    path = write_html(tmp_path, 'euckr', html, encoding='euc-kr')
+    pd.testing.assert_frame_equal(read_html_table(path), pd.read_html(path)[0])
+
+
+def test_footer_rows_come_last(tmp_path):
+    path = write_html(tmp_path, 'foot', CASES['thead_tbody_tfoot'])
+    assert list(iter_html_table_rows(path, encoding='utf-8')) == [
+        ('head', ['a', 'b']), ('body', ['x', 'y']), ('body', ['1', '2']), ('foot', ['합계', '3'])
+    ]
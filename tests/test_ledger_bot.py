@@ -0,0 +1,281 @@
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+import requests
+
+import ledger_bot
+from bot.ledger_cache import PartitionCache, RunCheckpoint
+from bot.ledger_stream import SpillBuffer
+
+
+FETCH_ALL_PAGES = ledger_bot.fetch_all_pages_for_account
+
+
+def fake_rows(params):
+    """One 1000 debit per account x query window, dated on the window's first day (restAm restarts per query)."""
+    return [{
+        'coCd': params['coCd'], 'divCd': params['coCd'], 'acctCd': params['acctCd'], 'drcrFg': '1',
+        'fillDt': params['fillDtFrom'], 'fillNb': '1', 'drAm': '1000', 'crAm': '0', 'restAm': '1000'
+    }]
+
+
+class FakeWorksheet:
+    row_count = col_count = 1000
+
+    def __init__(self, tab_name):
+        self.tab_name = tab_name
+        self.headers = None
+
+    def resize(self, rows):
+        self.row_count = rows
+
+    def update(self, range_name, values):
+        self.headers = values[0]
+
+
+@pytest.fixture
+def ledger_run(tmp_path, monkeypatch):
+    """
+    Two companies x two accounts in streaming mode with a tiny spill limit.
+
+    The API fetch and the Sheets calls are replaced; returns a dict collecting
+    the uploaded tabs (tab name -> DataFrame of the written cell strings) and
+    every SpillBuffer the run created.
+    """
+    monkeypatch.setitem(ledger_bot.CONFIG, 'companies', [
+        {'coCd': '1000', 'divCds': '1000|', 'tabName': 'RAW_1000'},
+        {'coCd': '2000', 'divCds': '2000|', 'tabName': 'RAW_2000'}
+    ])
+    monkeypatch.setitem(ledger_bot.CONFIG, 'streamMode', True)
+    monkeypatch.setitem(ledger_bot.CONFIG, 'resume', False)
+    monkeypatch.setitem(ledger_bot.CONFIG, 'summaryTabs', False)
+    monkeypatch.setitem(ledger_bot.CONFIG, 'spillRows', 10)   # force temp file runs
+    monkeypatch.setitem(ledger_bot.CONFIG, 'chunkRows', 7)
+    monkeypatch.setitem(ledger_bot.CONFIG, 'heavyAccounts', [])
+    monkeypatch.setitem(ledger_bot.CONFIG, 'storePath', str(tmp_path / 'ledger.sqlite3'))
+    monkeypatch.setattr(ledger_bot, 'SGA_ACCOUNTS', ['8110000', '8120000'])
+    monkeypatch.setattr(ledger_bot, '_partition_cache', PartitionCache(str(tmp_path / 'cache')))
+    monkeypatch.setattr(ledger_bot, 'fetch_all_pages_for_account', fake_rows)
+
+    run = {'tabs': {}, 'buffers': []}
+
+    class FakeRangeWriter:
+        def __init__(self, worksheet, block_rows=None):
+            self.worksheet = worksheet
+
+        def write_blocks(self, blocks, start_row, total_rows):
+            rows = [row for block in blocks for row in block]
+            run['tabs'][self.worksheet.tab_name] = pd.DataFrame(rows, columns=self.worksheet.headers)
+            return len(rows)
+
+    def new_buffer(*args, **kwargs):
+        run['buffers'].append(SpillBuffer(*args, **kwargs))
+        return run['buffers'][-1]
+
+    monkeypatch.setattr(ledger_bot, 'open_ledger_worksheet', lambda rows=1000, tab_name=None: FakeWorksheet(tab_name))
+    monkeypatch.setattr(ledger_bot, 'upload_ledger_summaries', lambda summary, tab_name=None: None)
+    monkeypatch.setattr(ledger_bot, 'RangeWriter', FakeRangeWriter)
+    def finalize(worksheet, headers, data_rows, values=None):
+        if values is not None:
+            run['tabs'][worksheet.tab_name] = pd.DataFrame(values, columns=headers)
+
+    monkeypatch.setattr(ledger_bot, 'finalize_ledger_sheet', finalize)
+    monkeypatch.setattr(ledger_bot, 'SpillBuffer', new_buffer)
+    return run
+
+
+def partition_count():
+    return len(ledger_bot.month_partitions('20250101', ledger_bot.get_today_string()))
+
+
+def test_combined_stream_writes_every_company_to_one_tab(ledger_run, monkeypatch):
+    monkeypatch.setitem(ledger_bot.CONFIG, 'combinedTab', True)
+
+    ledger_bot.run_ledger_bot()
+
+    assert list(ledger_run['tabs']) == [ledger_bot.CONFIG['sheetTabName']]
+    frame = ledger_run['tabs'][ledger_bot.CONFIG['sheetTabName']]
+    assert len(frame) == 2 * 2 * partition_count()
+    assert frame['회사코드'].tolist() == sorted(frame['회사코드'].tolist())
+    assert set(frame['회사코드']) == {'1000', '2000'}
+
+    # one shared buffer, and its spill files are removed after the upload
+    assert len(ledger_run['buffers']) == 1
+    assert ledger_run['buffers'][0].spilled == 0
+
+
+def test_stream_balance_runs_across_month_queries(ledger_run, monkeypatch):
+    monkeypatch.setitem(ledger_bot.CONFIG, 'combinedTab', False)
+
+    ledger_bot.run_ledger_bot()
+
+    assert sorted(ledger_run['tabs']) == ['RAW_1000', 'RAW_2000']
+    for tab_name, frame in ledger_run['tabs'].items():
+        assert len(frame) == 2 * partition_count()
+        assert set(frame['회사코드']) == {tab_name[-4:]}
+        # every month query restarts restAm at 1000; the sheet keeps one running balance per account and fiscal year
+        running = frame['차변'].astype(int).groupby([frame['계정과목'], frame['승인일'].str[:4]]).cumsum()
+        assert frame['잔액'].astype(int).tolist() == running.tolist()
+    assert all(buffer.spilled == 0 for buffer in ledger_run['buffers'])
+
+
+def test_client_errors_are_not_retried(monkeypatch):
+    def reject(*args, **kwargs):
+        response = requests.Response()
+        response.status_code = 401
+        raise requests.exceptions.HTTPError('401 Unauthorized', response=response)
+
+    monkeypatch.setattr(ledger_bot.api_client, 'post', reject)
+    result = ledger_bot.call_account_ledger_api({'acctCd': '8110000'})
+
+    assert result['resultCode'] == -1
+    assert result['retryable'] is False
+
+
+def test_companies_accept_bare_codes():
+    companies = ledger_bot.parse_companies('1000, 2000::계정별원장_2000,3000:3000|3100|')
+
+    assert companies == [
+        {'coCd': '1000', 'divCds': '1000|', 'tabName': ledger_bot.CONFIG['sheetTabName']},
+        {'coCd': '2000', 'divCds': '2000|', 'tabName': '계정별원장_2000'},
+        {'coCd': '3000', 'divCds': '3000|3100|', 'tabName': f"{ledger_bot.CONFIG['sheetTabName']}_3000"},
+    ]
+
+
+def test_cache_write_errors_do_not_stop_the_upload(ledger_run, monkeypatch):
+    def disk_full(*args, **kwargs):
+        raise OSError(28, 'No space left on device')
+
+    monkeypatch.setitem(ledger_bot.CONFIG, 'combinedTab', False)
+    monkeypatch.setattr(ledger_bot._partition_cache, 'save', disk_full)
+
+    ledger_bot.run_ledger_bot()
+
+    assert sorted(ledger_run['tabs']) == ['RAW_1000', 'RAW_2000']
+    assert all(len(frame) == 2 * partition_count() for frame in ledger_run['tabs'].values())
+
+
+def test_company_with_a_failed_account_keeps_its_tab(ledger_run, tmp_path, monkeypatch):
+    def call_api(params):
+        if params['coCd'] == '2000' and params['acctCd'] == '8120000':
+            return {'resultCode': -1, 'resultMsg': '503 Service Unavailable', 'retryable': True}
+        return {'resultCode': 0, 'resultData': {'datas': fake_rows(params), 'totalPage': 1}}
+
+    monkeypatch.setitem(ledger_bot.CONFIG, 'streamMode', False)
+    monkeypatch.setitem(ledger_bot.CONFIG, 'combinedTab', False)
+    monkeypatch.setitem(ledger_bot.CONFIG, 'resume', True)
+    monkeypatch.setitem(ledger_bot.CONFIG, 'checkpointDir', str(tmp_path / 'checkpoints'))
+    monkeypatch.setitem(ledger_bot.CONFIG, 'maxRetries', 2)
+    monkeypatch.setitem(ledger_bot.CONFIG, 'retryBaseDelay', 0)
+    monkeypatch.setattr(ledger_bot, 'fetch_all_pages_for_account', FETCH_ALL_PAGES)
+    monkeypatch.setattr(ledger_bot, 'call_account_ledger_api', call_api)
+
+    assert ledger_bot.run_ledger_bot() is False
+
+    # the other company is uploaded; the failing one keeps its previous sheet and its checkpoint
+    assert list(ledger_run['tabs']) == ['RAW_1000']
+    assert len(ledger_run['tabs']['RAW_1000']) == 2 * partition_count()
+    failed = RunCheckpoint(str(tmp_path / 'checkpoints'), ledger_bot.build_base_params(ledger_bot.CONFIG['companies'][1]))
+    assert failed.count() > 0
+
+
+def test_stream_leaves_out_an_account_with_a_failed_month(ledger_run, monkeypatch):
+    def fetch(params):
+        if params['acctCd'] == '8110000' and params['fillDtFrom'].startswith('202503'):
+            raise RuntimeError('API Error for 8110000 (page 1, 5회 시도): 503 Service Unavailable')
+        return fake_rows(params)
+
+    monkeypatch.setattr(ledger_bot, 'fetch_all_pages_for_account', fetch)
+    base_params = ledger_bot.build_base_params(ledger_bot.CONFIG['companies'][0])
+
+    result = ledger_bot.collect_ledger(base_params, ['8110000', '8120000'])
+    frame = pd.concat(result['buffer'].iter_blocks(), ignore_index=True)
+    result['buffer'].close()
+
+    # like list mode: none of the failed account's months reach the upload, not even the ones that succeeded
+    assert result['failed'] == {'8110000'}
+    assert set(frame['계정과목']) == {'8120000'}
+    assert len(frame) == result['count'] == partition_count()
+
+
+def test_checkpoint_is_cleared_only_after_the_upload(ledger_run, tmp_path, monkeypatch):
+    class QuotaExceeded:
+        def __init__(self, worksheet, block_rows=None):
+            pass
+
+        def write_blocks(self, blocks, start_row, total_rows):
+            raise RuntimeError('429 Quota exceeded')
+
+    monkeypatch.setitem(ledger_bot.CONFIG, 'companies', ledger_bot.CONFIG['companies'][:1])
+    monkeypatch.setitem(ledger_bot.CONFIG, 'resume', True)
+    monkeypatch.setitem(ledger_bot.CONFIG, 'checkpointDir', str(tmp_path / 'checkpoints'))
+    checkpoint = RunCheckpoint(str(tmp_path / 'checkpoints'), ledger_bot.build_base_params(ledger_bot.CONFIG['companies'][0]))
+    writer = ledger_bot.RangeWriter
+
+    monkeypatch.setattr(ledger_bot, 'RangeWriter', QuotaExceeded)
+    ledger_bot.run_ledger_bot()
+    assert checkpoint.count() > 0
+
+    monkeypatch.setattr(ledger_bot, 'RangeWriter', writer)
+    ledger_bot.run_ledger_bot()
+    assert 'RAW_1000' in ledger_run['tabs']
+    assert checkpoint.count() == 0
+
+
+@pytest.fixture
+def page_calls(monkeypatch):
+    """Replaces the API call with queued results and records every call and backoff sleep."""
+    calls = {'results': [], 'params': [], 'sleeps': []}
+
+    def call_api(params):
+        calls['params'].append(params)
+        return calls['results'].pop(0)
+
+    monkeypatch.setitem(ledger_bot.CONFIG, 'maxRetries', 3)
+    monkeypatch.setitem(ledger_bot.CONFIG, 'retryBaseDelay', 1)
+    monkeypatch.setattr(ledger_bot, 'call_account_ledger_api', call_api)
+    monkeypatch.setattr(ledger_bot, 'time', SimpleNamespace(monotonic=time.monotonic, sleep=calls['sleeps'].append))
+    return calls
+
+
+OK_PAGE = {'resultCode': 0, 'resultData': {'datas': [{'fillDt': '20250102'}], 'totalPage': 1}}
+UNAVAILABLE = {'resultCode': -1, 'resultMsg': '503 Service Unavailable', 'retryable': True}
+
+
+def test_transient_page_errors_are_retried_with_backoff(page_calls):
+    page_calls['results'] += [dict(UNAVAILABLE), dict(UNAVAILABLE), OK_PAGE]
+
+    result = ledger_bot.fetch_page({'acctCd': '8110000', 'viewCount': 100}, 2)
+
+    assert result is OK_PAGE
+    assert [params['viewPage'] for params in page_calls['params']] == [2, 2, 2]
+    assert len(page_calls['sleeps']) == 2
+    assert 0.5 <= page_calls['sleeps'][0] <= 1 and 1 <= page_calls['sleeps'][1] <= 2
+
+
+def test_page_gives_up_after_max_retries(page_calls):
+    page_calls['results'] += [dict(UNAVAILABLE) for _ in range(4)]
+
+    result = ledger_bot.fetch_page({'acctCd': '8110000', 'viewCount': 100}, 1)
+
+    assert result['resultCode'] == -1
+    assert result['attempts'] == 4
+    assert len(page_calls['params']) == 4 and len(page_calls['sleeps']) == 3
+
+
+def test_open_circuit_waits_until_the_probe(page_calls, monkeypatch):
+    monkeypatch.setattr(ledger_bot._circuit_breaker, 'retry_after', lambda: 25.0)
+    page_calls['results'] += [dict(UNAVAILABLE, circuitOpen=True), OK_PAGE]
+
+    assert ledger_bot.fetch_page({'acctCd': '8110000', 'viewCount': 100}, 1) is OK_PAGE
+    assert page_calls['sleeps'] == [25.0]
+
+
+def test_failed_page_raises_instead_of_returning_no_rows(page_calls):
+    first_page = {'resultCode': 0, 'resultData': {'datas': [{'fillDt': '20250102'}], 'totalPage': 2}}
+    page_calls['results'] += [first_page] + [dict(UNAVAILABLE) for _ in range(4)]
+
+    with pytest.raises(RuntimeError, match='page 2, 4회 시도'):
+        ledger_bot.fetch_all_pages_for_account({'acctCd': '8110000', 'viewCount': 100})
@@ -0,0 +1,36 @@
+import time
+
+from bot.ledger_cache import RunCheckpoint
+
+PARAMS = {'coCd': '1000', 'divCds': '1000|', 'fillDtFrom': '20250101', 'fillDtTo': '20250131',
+          'prtFg': '2', 'zeroDisp': '0'}
+
+
+def test_checkpoint_is_resumed_within_max_age(tmp_path):
+    checkpoint = RunCheckpoint(str(tmp_path), PARAMS, max_age_hours=2)
+    checkpoint.save(dict(PARAMS, acctCd='8110000'), '202501', [{'fillDt': '20250102'}])
+
+    resumed = RunCheckpoint(str(tmp_path), PARAMS, max_age_hours=2)
+    assert resumed.expire_stale() == 0
+    assert resumed.load(dict(PARAMS, acctCd='8110000'), '202501') == [{'fillDt': '20250102'}]
+
+
+def test_checkpoint_expires_after_max_age_from_first_write(tmp_path):
+    checkpoint = RunCheckpoint(str(tmp_path), PARAMS, max_age_hours=2)
+    checkpoint.save(dict(PARAMS, acctCd='8110000'), '202501', [])
+    created_at = checkpoint.created_at()
+
+    # later saves (e.g. retried accounts) do not extend the checkpoint's life
+    checkpoint.save(dict(PARAMS, acctCd='8120000'), '202501', [])
+    assert checkpoint.created_at() == created_at
+    assert not checkpoint.is_expired(now=created_at + 3600)
+    assert checkpoint.is_expired(now=created_at + 3 * 3600)
+
+
+def test_expired_checkpoint_is_cleared(tmp_path):
+    checkpoint = RunCheckpoint(str(tmp_path), PARAMS, max_age_hours=0)
+    checkpoint.save(dict(PARAMS, acctCd='8110000'), '202501', [])
+    time.sleep(0.01)
+
+    assert checkpoint.expire_stale() == 1
+    assert checkpoint.count() == 0
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import ledger_bot
+from bot.ledger_store import LedgerStore
+
+START = datetime(2026, 1, 1, 9, 0)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LedgerStore(str(tmp_path / 'ledger.sqlite3'))
+    yield store
+    store.close()
+
+
+def status(store, acct_cd, now, co_cd='1000'):
+    rows = {row['acctCd']: row for row in store.skip_list(co_cd, dormant_days=7, recheck_hours=24, now=now)}
+    return rows[acct_cd]['status']
+
+
+def test_new_empty_account_stays_active_until_dormant(store):
+    store.record_account_check('1000', '8110000', 0, checked_at=START)
+
+    assert status(store, '8110000', START + timedelta(days=6)) == 'active'
+
+
+def test_dormant_account_is_skipped_until_its_recheck(store):
+    for day in range(8):
+        store.record_account_check('1000', '8110000', 0, checked_at=START + timedelta(days=day))
+    last_check = START + timedelta(days=7)
+
+    assert status(store, '8110000', last_check + timedelta(hours=1)) == 'skip'
+    assert status(store, '8110000', last_check + timedelta(hours=24)) == 'recheck'
+
+    # the recheck finds nothing: skipped for another recheck period
+    store.record_account_check('1000', '8110000', 0, checked_at=last_check + timedelta(hours=24))
+    assert status(store, '8110000', last_check + timedelta(hours=30)) == 'skip'
+
+
+def test_rows_make_a_skipped_account_active_again(store):
+    store.record_account_check('1000', '8110000', 0, checked_at=START)
+    store.record_account_check('1000', '8110000', 0, checked_at=START + timedelta(days=8))
+    assert status(store, '8110000', START + timedelta(days=8, hours=1)) == 'skip'
+
+    store.record_account_check('1000', '8110000', 3, checked_at=START + timedelta(days=9))
+    assert status(store, '8110000', START + timedelta(days=9, hours=1)) == 'active'
+    # dormancy now counts from the last time rows were seen
+    store.record_account_check('1000', '8110000', 0, checked_at=START + timedelta(days=10))
+    assert status(store, '8110000', START + timedelta(days=15)) == 'active'
+    assert status(store, '8110000', START + timedelta(days=16, hours=1)) == 'recheck'
+
+
+def test_skip_list_is_per_company(store):
+    store.record_account_check('1000', '8110000', 0, checked_at=START)
+    store.record_account_check('1000', '8110000', 0, checked_at=START + timedelta(days=8))
+    store.record_account_check('2000', '8110000', 5, checked_at=START + timedelta(days=8))
+
+    assert status(store, '8110000', START + timedelta(days=8, hours=1), co_cd='1000') == 'skip'
+    assert status(store, '8110000', START + timedelta(days=8, hours=1), co_cd='2000') == 'active'
+
+
+def test_plan_account_skips_leaves_out_only_skipped_accounts(store, monkeypatch):
+    monkeypatch.setitem(ledger_bot.CONFIG, 'fullRefresh', False)
+    monkeypatch.setitem(ledger_bot.CONFIG, 'refreshCache', False)
+    now = datetime.now()
+    store.record_account_check('1000', '8110000', 0, checked_at=now - timedelta(days=10))
+    store.record_account_check('1000', '8110000', 0, checked_at=now - timedelta(hours=1))
+    store.record_account_check('1000', '8120000', 0, checked_at=now - timedelta(days=10))
+    store.record_account_check('1000', '8120000', 0, checked_at=now - timedelta(days=2))
+
+    accounts, skipped = ledger_bot.plan_account_skips(store, '1000', ['8110000', '8120000', '8130000'])
+    assert (accounts, skipped) == (['8120000', '8130000'], ['8110000'])
+
+    monkeypatch.setitem(ledger_bot.CONFIG, 'fullRefresh', True)
+    assert ledger_bot.plan_account_skips(store, '1000', ['8110000']) == (['8110000'], [])
@@ -0,0 +1,72 @@
+import os
+import random
+
+import numpy as np
+import pandas as pd
+
+from bot.ledger_stream import SpillBuffer
+
+COLUMNS = ['회사코드', '회계일', '금액', '순번']
+SORT_BY = ['회사코드', '회계일']
+
+
+def random_chunks(seed, count=12):
+    """Unsorted chunks with repeated keys and missing dates; 순번 records the arrival order."""
+    rng = random.Random(seed)
+    chunks, seq = [], 0
+    for _ in range(count):
+        rows = []
+        for _ in range(rng.randint(1, 9)):
+            date = rng.choice(['20250101', '20250215', '20250301', np.nan])
+            rows.append([rng.choice(['1000', '2000']), date, rng.randint(-500, 500), seq])
+            seq += 1
+        chunks.append(pd.DataFrame(rows, columns=COLUMNS))
+    return chunks
+
+
+def collect(buffer):
+    blocks = list(buffer.iter_blocks())
+    return pd.concat(blocks, ignore_index=True), blocks
+
+
+def expected(chunks):
+    return pd.concat(chunks, ignore_index=True).sort_values(by=SORT_BY, kind='stable').reset_index(drop=True)
+
+
+def test_merged_spill_runs_come_out_sorted():
+    for seed in range(20):
+        chunks = random_chunks(seed)
+        buffer = SpillBuffer(COLUMNS, SORT_BY, spill_rows=8, block_rows=5)
+        for chunk in chunks:
+            buffer.add(chunk)
+        assert buffer.spilled > 1
+
+        result, blocks = collect(buffer)
+        assert all(len(block) <= 5 for block in blocks)
+        # equal keys keep their arrival order across runs, like a stable sort of everything
+        pd.testing.assert_frame_equal(result, expected(chunks), check_dtype=False)
+        buffer.close()
+
+
+def test_unspilled_buffer_sorts_in_memory():
+    chunks = random_chunks(3)
+    buffer = SpillBuffer(COLUMNS, SORT_BY, spill_rows=1000, block_rows=4)
+    for chunk in chunks:
+        buffer.add(chunk)
+
+    result, _ = collect(buffer)
+    assert buffer.spilled == 0
+    assert len(buffer) == len(result)
+    pd.testing.assert_frame_equal(result, expected(chunks))
+
+
+def test_close_removes_spill_files():
+    buffer = SpillBuffer(COLUMNS, SORT_BY, spill_rows=2)
+    for chunk in random_chunks(5, count=3):
+        buffer.add(chunk)
+    spill_dir = buffer._spill_dir
+    assert os.path.isdir(spill_dir)
+
+    buffer.close()
+    assert not os.path.exists(spill_dir)
+    assert buffer.spilled == 0
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from bot.ledger_transform import RunningBalance, opening_balance
+
+
+def ledger_frame(rows):
+    return pd.DataFrame(rows, columns=['회사코드', '계정과목', '승인일', '차변', '대변', '잔액'])
+
+
+def test_opening_balance_backs_out_the_first_row():
+    rows = [{'drAm': '300', 'crAm': '0', 'restAm': '1300'}, {'drAm': '0', 'crAm': '100', 'restAm': '1200'}]
+    assert opening_balance(rows) == 1000
+
+
+def test_running_balance_continues_across_blocks_and_accounts():
+    balance = RunningBalance({('1000', '8110000', '2025'): 1000})
+    first = balance.apply(ledger_frame([
+        ['1000', '8110000', '2025-01-02', 300, 0, 300],
+        ['1000', '8120000', '2025-01-03', 50, 0, 50],
+        ['1000', '8110000', '2025-01-10', 0, 100, 200],
+    ]))
+    # month query restarted its own restAm; the running balance does not
+    second = balance.apply(ledger_frame([
+        ['1000', '8110000', '2025-02-03', 200, 0, 200],
+        ['1000', '8120000', '2025-02-04', 25, 0, 25],
+    ]))
+
+    assert first['잔액'].tolist() == [1300, 50, 1200]
+    assert second['잔액'].tolist() == [1400, 75]
+    assert second['잔액'].dtype == 'int64'
+
+
+def test_running_balance_restarts_each_fiscal_year():
+    balance = RunningBalance({('1000', '8110000', '2025'): 50, ('1000', '8110000', '2026'): 0})
+    first = balance.apply(ledger_frame([['1000', '8110000', '2025-12-30', 50, 0, 100]]))
+    # the January query's first row is where the 2026 opening comes from
+    second = balance.apply(ledger_frame([
+        ['1000', '8110000', '2026-01-02', 50, 0, 50],
+        ['1000', '8110000', '2026-01-05', 10, 0, 60],
+    ]))
+
+    assert first['잔액'].tolist() == [100]
+    assert second['잔액'].tolist() == [50, 60]
@@ -0,0 +1,71 @@
+import pytest
+
+import bot.retry as retry
+from bot.retry import CircuitBreaker, backoff_delay
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(retry, 'time', clock)
+    return clock
+
+
+def test_backoff_delay_doubles_with_jitter_up_to_the_cap():
+    for attempt in range(8):
+        ceiling = min(30.0, 2 ** attempt)
+        assert ceiling / 2 <= backoff_delay(attempt) <= ceiling
+    assert backoff_delay(20, cap=5) <= 5
+
+
+def test_circuit_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()   # a success resets the streak
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.is_open
+    assert not breaker.allow()
+    clock.now += 10
+    assert breaker.retry_after() == pytest.approx(20)
+
+
+def test_half_open_allows_one_probe_and_closes_on_success(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+
+    clock.now += 30
+    assert breaker.allow()
+    assert not breaker.allow()   # only one probe at a time
+
+    breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure()
+
+    # blocked for another full reset_timeout from the probe failure
+    assert breaker.is_open
+    assert not breaker.allow()
+    assert breaker.retry_after() == pytest.approx(30)
+    clock.now += 30
+    assert breaker.allow()
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+import bot.sheet_diff as sheet_diff
+from bot.sheet_diff import diff_row_ops
+
+
+def apply_ops(rows, ops):
+    """Applies diff_row_ops() operations in order, the way the Sheets upload sends them."""
+    rows = list(rows)
+    for op in ops:
+        if op[0] == 'update':
+            rows[op[1]:op[1] + len(op[2])] = op[2]
+        elif op[0] == 'insert':
+            rows[op[1]:op[1]] = op[2]
+        else:
+            del rows[op[1]:op[2]]
+    return rows
+
+
+def random_rows(rng, count, values=50):
+    return [(str(rng.randrange(values)), f'r{rng.randrange(values)}') for _ in range(count)]
+
+
+def edited(rng, rows, edits):
+    rows = list(rows)
+    for _ in range(edits):
+        kind = rng.choice(['update', 'insert', 'delete'])
+        i = rng.randrange(len(rows) + 1)
+        if kind == 'insert' or not rows:
+            rows[i:i] = random_rows(rng, rng.randint(1, 3))
+        elif kind == 'update':
+            rows[min(i, len(rows) - 1)] = ('new', str(rng.random()))
+        else:
+            del rows[i:i + rng.randint(1, 3)]
+    return rows
+
+
+@pytest.mark.parametrize('old, new', [
+    ([], []),
+    ([], [('a',), ('b',)]),
+    ([('a',), ('b',)], []),
+    ([('a',), ('b',), ('c',)], [('a',), ('b',), ('c',)]),
+    ([('a',), ('b',), ('c',)], [('a',), ('x',), ('c',)]),
+    ([('a',), ('b',), ('c',)], [('c',), ('b',), ('a',)]),
+    ([('a',)] * 5, [('a',)] * 3 + [('b',)] + [('a',)] * 4),
+])
+def test_ops_turn_old_rows_into_new_rows(old, new):
+    assert apply_ops(old, diff_row_ops(old, new)) == new
+
+
+def test_ops_reproduce_random_edits_bottom_up():
+    rng = random.Random(7)
+    for _ in range(300):
+        old = random_rows(rng, rng.randint(0, 60), values=rng.choice([3, 50]))
+        new = edited(rng, old, rng.randint(0, 8))
+        ops = diff_row_ops(old, new)
+
+        assert apply_ops(old, ops) == new
+        # bottom-up: later operations never start below an earlier one
+        starts = [op[1] for op in ops]
+        assert starts == sorted(starts, reverse=True)
+
+
+def test_unchanged_rows_send_nothing():
+    rows = [('a', '1'), ('b', '2')]
+    assert diff_row_ops(rows, list(rows)) == []
+
+
+def test_single_change_is_one_update():
+    old = [(str(i),) for i in range(100)]
+    new = list(old)
+    new[40] = ('changed',)
+    assert diff_row_ops(old, new) == [('update', 40, [('changed',)])]
+
+
+def test_repeated_rows_fall_back_to_positional_rewrite(monkeypatch):
+    monkeypatch.setattr(sheet_diff, 'MAX_MATCH_PAIRS', 0)
+    old = [('a',)] * 10
+    new = [('a',), ('b',)] + [('a',)] * 6
+
+    assert apply_ops(old, diff_row_ops(old, new)) == new